@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry
+from cn.core.komodo.komodo_bwr_input_builder import KomodoInputBuilder, KomodoMode
+from cn.core.komodo.komodo_parser import komodo_out_3d_power_map
+from cn.utils.benchmark import Benchmark
+
+# Core sizes as (core size, axial nodes), the largest is a realistic BWR core
+CORE_SIZES = [(10, 10), (20, 25)]
+
+
+def get_core_geometry(core_size: int, axial_nodes: int) -> CoreGeometry:
+    """A roughly circular core with even rows"""
+    center = (core_size - 1) / 2
+    assembly_count_per_row = [
+        max(2, 2 * int(np.sqrt(max(0.0, (core_size / 2) ** 2 - (row - center) ** 2))))
+        for row in range(core_size)
+    ]
+    return CoreGeometry(core_size, axial_nodes, 15.0, 15.24, assembly_count_per_row)
+
+
+def get_material_maps(core_geometry: CoreGeometry, n_materials: int = 10) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    # A few distinct planes, as axial zones of a real core
+    planes = [core_map * rng.integers(1, n_materials + 1, core_map.shape) for _ in range(5)]
+    return [
+        planes[z * len(planes) // core_geometry.axial_nodes]
+        for z in range(core_geometry.axial_nodes)
+    ]
+
+
+def bench_get_core_map(core_size: int, axial_nodes: int):
+    core_geometry = get_core_geometry(core_size, axial_nodes)
+    return lambda: core_geometry.get_core_map(fill_value=1, empty_value=0)
+
+
+def bench_set_geom_build(core_size: int, axial_nodes: int):
+    core_geometry = get_core_geometry(core_size, axial_nodes)
+    material_maps = get_material_maps(core_geometry)
+
+    def set_geom_build():
+        komodo_input_builder = KomodoInputBuilder()
+        komodo_input_builder.set_mode(KomodoMode.FORWARD)
+        komodo_input_builder.set_geom(core_geometry, material_maps)
+        komodo_input_builder.set_outp()
+        return komodo_input_builder.build()
+
+    return set_geom_build
+
+
+def write_node_map_out(path: str, core_geometry: CoreGeometry, node_maps: np.ndarray):
+    """Write a node-wise output in the KOMODO layout, one block per axial node"""
+    with open(path, "w") as f:
+        f.write("  Output of a node-wise map\n")
+        for z_idx, node_map in enumerate(node_maps):
+            f.write(f"    z = {z_idx + 1}\n")
+            f.write("          " + " ".join(f"{i + 1:>7}" for i in range(node_map.shape[1])) + "\n")
+            for row_idx, row in enumerate(node_map):
+                values = " ".join(f"{value:7.4f}" for value in row if value != 0)
+                f.write(f"{row_idx + 1:>8} {values}\n")
+
+
+def bench_komodo_out_3d_power_map(core_size: int, axial_nodes: int):
+    core_geometry = get_core_geometry(core_size, axial_nodes)
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(float)
+    rng = np.random.default_rng(0)
+    power = np.array([core_map * rng.uniform(0.5, 1.5, core_map.shape) for _ in range(axial_nodes)])
+
+    # Overwritten by the next run, so runs do not pile up files
+    komodo_out_path = os.path.join(
+        tempfile.gettempdir(), f"cn_bench_{core_size}x{core_size}x{axial_nodes}_3d_power.out"
+    )
+    write_node_map_out(komodo_out_path, core_geometry, power)
+    return lambda: komodo_out_3d_power_map(core_geometry, komodo_out_path)
+
+
+def get_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for core_size, axial_nodes in CORE_SIZES:
+        params = {"core": f"{core_size}x{core_size}x{axial_nodes}"}
+        benchmarks += [
+            Benchmark(
+                "CoreGeometry.get_core_map",
+                lambda c=core_size, a=axial_nodes: bench_get_core_map(c, a),
+                params,
+            ),
+            Benchmark(
+                "KomodoInputBuilder.set_geom+build",
+                lambda c=core_size, a=axial_nodes: bench_set_geom_build(c, a),
+                params,
+            ),
+            Benchmark(
+                "komodo_out_3d_power_map",
+                lambda c=core_size, a=axial_nodes: bench_komodo_out_3d_power_map(c, a),
+                params,
+            ),
+        ]
+    return benchmarks
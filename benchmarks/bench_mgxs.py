@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+import h5py
+import numpy as np
+
+from cn.examples.mgxs.bwr import get_fuel_segment
+from cn.mgxs.openmc import openmc_geometries, openmc_materials
+from cn.mgxs.openmc.openmc_bwr_assembly_depletion import InputData, get_geometry
+from cn.mgxs.openmc.openmc_h5_to_komodo import (
+    MGXS_TYPES,
+    N_GROUPS,
+    construct_komodo_input_data,
+)
+from cn.models.fuel.fuel_type import FuelGeometry, FuelType
+from cn.models.mgxs.mgxs_run import MGXSRunBWR, TimeStepUnit
+from cn.models.mgxs.openmc import OpenMCSettings
+from cn.utils.benchmark import Benchmark
+
+LATTICE_SIZES = [8, 10, 12]
+# Depletion steps of the example sweep
+DT = [0.5] * 10 + [1] * 10 + [5] * 13 + [10] * 10
+
+
+def get_input_data(lattice_size: int) -> InputData:
+    """A case of the example segment with a lattice size, with paths in the temporary directory"""
+    fuel_type = FuelType("BENCH", FuelGeometry(lattice_size, 1.26, 0.475, 0.525, 0.4096))
+    case_path = os.path.join(tempfile.gettempdir(), f"cn_bench_{lattice_size}x{lattice_size}")
+    return InputData(
+        fuel_segment=get_fuel_segment(fuel_type, n_ba_pins=8, ba_enrichment=5.0),
+        openmc_settings=OpenMCSettings(
+            particles=100, active_batches=10, inactive_batches=10, chain_file="", cross_sections=""
+        ),
+        mgxs_run_bwr=MGXSRunBWR(
+            alpha=0.4,
+            power=1e4,
+            dt=DT,
+            dt_unit=TimeStepUnit.MWd_kg,
+            N_groups=N_GROUPS,
+            original_cwd_path=os.getcwd(),
+            cwd_path=f"{case_path}/cwd",
+            results_path=f"{case_path}/results",
+            img_path=f"{case_path}/img",
+        ),
+    )
+
+
+def bench_get_geometry(lattice_size: int):
+    inp = get_input_data(lattice_size)
+    return lambda: get_geometry(inp)
+
+
+def bench_rectangular_lattice(lattice_size: int):
+    inp = get_input_data(lattice_size)
+    geometry = inp.fuel_segment.fuel_type.geometry
+    fuel = openmc_materials.uo2(enrichment_pct=4.0)
+    zircaloy2 = openmc_materials.zircaloy2()
+    water = openmc_materials.water(0.4)
+    return lambda: openmc_geometries.rectangular_lattice(
+        lattice_size,
+        geometry.lattice_pitch,
+        geometry.fuel_or,
+        fuel,
+        geometry.clad_ir,
+        geometry.clad_or,
+        zircaloy2,
+        water,
+        boundary_type="reflective",
+    )
+
+
+def write_mgxs_stores(inp: InputData):
+    """Write synthetic MGXS stores of each step, in the layout of `Library.build_hdf5_store`"""
+    rng = np.random.default_rng(0)
+    mgxs_path = os.path.join(inp.mgxs_run_bwr.results_path, "mgxs")
+    os.makedirs(mgxs_path, exist_ok=True)
+    for i in range(len(inp.mgxs_run_bwr.dt) + 1):
+        with h5py.File(os.path.join(mgxs_path, f"mgxs_{i}.h5"), "w") as f:
+            universe = f.create_group("universe").create_group("1")
+            for mgxs_type in MGXS_TYPES:
+                shape = (N_GROUPS, N_GROUPS) if mgxs_type == "scatter matrix" else (N_GROUPS,)
+                universe.create_group(mgxs_type).create_dataset("average", data=rng.random(shape))
+
+
+def bench_construct_komodo_input_data():
+    inp = get_input_data(10)
+    write_mgxs_stores(inp)
+    return lambda: construct_komodo_input_data(inp, {"count": 0})
+
+
+def get_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for lattice_size in LATTICE_SIZES:
+        params = {"lattice": lattice_size}
+        benchmarks += [
+            Benchmark("get_geometry", lambda n=lattice_size: bench_get_geometry(n), params),
+            Benchmark(
+                "openmc_geometries.rectangular_lattice",
+                lambda n=lattice_size: bench_rectangular_lattice(n),
+                params,
+            ),
+        ]
+
+    benchmarks += [
+        Benchmark(
+            "openmc_materials.uo2",
+            lambda: lambda: openmc_materials.uo2(enrichment_pct=4.0, gd2o3_pct=5.0),
+        ),
+        Benchmark("openmc_materials.gd2o3", lambda: openmc_materials.gd2o3),
+        Benchmark("openmc_materials.zircaloy2", lambda: openmc_materials.zircaloy2),
+        Benchmark("openmc_materials.water", lambda: lambda: openmc_materials.water(0.4)),
+        Benchmark(
+            "construct_komodo_input_data",
+            bench_construct_komodo_input_data,
+            {"steps": len(DT) + 1},
+        ),
+    ]
+    return benchmarks
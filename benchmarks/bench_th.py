@@ -0,0 +1,20 @@
+from cn.utils.benchmark import Benchmark
+from cn.utils.th_tools import get_vapor_quality_from_void_fraction
+
+# Void fractions of the MGXS sweeps, at the BWR pressure of 7 MPa
+VOIDS = [0.0, 0.4, 0.8]
+
+
+def bench_get_vapor_quality_from_void_fraction(alpha: float):
+    return lambda: get_vapor_quality_from_void_fraction(alpha, T=None, P=7.0)
+
+
+def get_benchmarks() -> list[Benchmark]:
+    return [
+        Benchmark(
+            "get_vapor_quality_from_void_fraction",
+            lambda alpha=alpha: bench_get_vapor_quality_from_void_fraction(alpha),
+            {"alpha": alpha},
+        )
+        for alpha in VOIDS
+    ]
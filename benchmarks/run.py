@@ -0,0 +1,83 @@
+"""Run the micro-benchmarks and compare them to a baseline
+
+    python -m benchmarks.run                      # compare to benchmarks/baselines/baseline.json
+    python -m benchmarks.run --filter komodo      # only benchmarks with "komodo" in their key
+    python -m benchmarks.run --save-baseline      # run and save the results as the baseline
+
+Baselines are machine-specific. Save one on the reference machine and commit it, then compare on
+that machine. Benchmark modules whose dependencies are not installed (e.g. OpenMC) are skipped.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+from cn.log import logger
+from cn.utils.benchmark import (
+    Benchmark,
+    ComparisonStatus,
+    compare_results,
+    format_report,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+BENCHMARK_MODULES = ["benchmarks.bench_core", "benchmarks.bench_th", "benchmarks.bench_mgxs"]
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "baseline.json")
+
+
+def get_benchmarks(pattern: str | None = None) -> list[Benchmark]:
+    benchmarks = []
+    for module_name in BENCHMARK_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            logger.warning(f"Skipping '{module_name}', a dependency is missing: {e}")
+            continue
+        benchmarks += module.get_benchmarks()
+    return [benchmark for benchmark in benchmarks if pattern is None or pattern in benchmark.key]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="Only run benchmarks with this in their key")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Save the results as the baseline"
+    )
+    parser.add_argument("--report", help="Also write the comparison report to this file")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum time per repeat [s]")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change to flag a benchmark"
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit with 1 if a benchmark is slower"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(get_benchmarks(args.filter), args.repeats, args.min_time)
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        logger.info(f"Saved {len(results)} results as the baseline '{args.baseline}'")
+        return 0
+
+    baseline = load_results(args.baseline) if os.path.exists(args.baseline) else {}
+    if not baseline:
+        logger.warning(f"No baseline at '{args.baseline}', save one with --save-baseline")
+    comparisons = compare_results(results, baseline, args.threshold)
+    report = format_report(comparisons)
+    print(report)
+    if args.report is not None:
+        with open(args.report, "w") as f:
+            f.write(report + "\n")
+
+    slower = any(comparison.status is ComparisonStatus.SLOWER for comparison in comparisons)
+    return 1 if args.fail_on_regression and slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,19 @@ import numpy as np
 
 class CoreSymmetry(Enum):
     FULL = auto()
+    QUARTER = auto()
+    OCTANT = auto()
+
+
+def get_cartesian_symmetry(core_symmetry: CoreSymmetry) -> CoreSymmetry:
+    """Get the symmetry that can be modelled with a cartesian nodal code
+
+    Reflective boundaries can only be placed on the planes through the core center, so an octant
+    symmetric core is solved as a quarter core.
+    """
+    if core_symmetry is CoreSymmetry.OCTANT:
+        return CoreSymmetry.QUARTER
+    return core_symmetry
 
 
 @dataclass
@@ -55,7 +68,6 @@ class CoreGeometry:
 
         assembly_idx = 0
         for row_idx, row in enumerate(self.assembly_count_per_row):
-
             empty_values_for_row = self.core_size - row
             empty_values_per_side = empty_values_for_row // 2
 
@@ -71,3 +83,102 @@ class CoreGeometry:
             core_map[row_idx, empty_values_per_side + row :] = empty_value
 
         return core_map
+
+    def supports_symmetry(self, core_symmetry: CoreSymmetry) -> bool:
+        if core_symmetry is CoreSymmetry.FULL:
+            return True
+
+        # Rows are centered, so the core is always symmetric east-west
+        if self.assembly_count_per_row != self.assembly_count_per_row[::-1]:
+            return False
+
+        if core_symmetry is CoreSymmetry.OCTANT:
+            assembly_mask = self.get_core_map(fill_value=1, empty_value=0).astype(int)
+            return np.array_equal(assembly_mask, assembly_mask.T)
+
+        return True
+
+    def get_reduced_size(self, core_symmetry: CoreSymmetry) -> int:
+        if core_symmetry is CoreSymmetry.FULL:
+            return self.core_size
+        # For odd core sizes, the center row and column are included in the reduced map
+        return self.core_size - self.core_size // 2
+
+    def get_radial_node_sizes(self, core_symmetry: CoreSymmetry) -> np.ndarray:
+        """Get the node sizes along a row (or column) of the reduced core, from west to east"""
+        reduced_size = self.get_reduced_size(core_symmetry)
+        node_sizes = np.full(reduced_size, self.assembly_radial_size, dtype=float)
+        if reduced_size != self.core_size and self.core_size % 2 != 0:
+            # The center assemblies are cut in half by the symmetry planes
+            node_sizes[0] /= 2
+        return node_sizes
+
+    def reduce_map(
+        self, core_map: np.ndarray, core_symmetry: CoreSymmetry, empty_value: object = 0
+    ) -> np.ndarray:
+        """Reduce a full core map to the south-east quadrant (or octant) of the core
+
+        The octant is the part of the quadrant on and above the diagonal, the remaining nodes are
+        set to `empty_value`.
+        """
+        assert core_map.shape == (
+            self.core_size,
+            self.core_size,
+        ), f"Core map must match core size ({core_map.shape=}, {self.core_size=})"
+        assert self.supports_symmetry(
+            core_symmetry
+        ), f"Core geometry does not support {core_symmetry.name} symmetry ({self.assembly_count_per_row=})"
+
+        reduced_map = self._reduce_map(core_map, core_symmetry, empty_value)
+        assert np.array_equal(
+            self.unfold_map(reduced_map, core_symmetry), core_map
+        ), f"Core map is not {core_symmetry.name} symmetric"
+
+        return reduced_map
+
+    def _reduce_map(
+        self, core_map: np.ndarray, core_symmetry: CoreSymmetry, empty_value: object = 0
+    ) -> np.ndarray:
+        if core_symmetry is CoreSymmetry.FULL:
+            return core_map.copy()
+
+        center = self.core_size // 2
+        reduced_map = core_map[center:, center:].copy()
+
+        if core_symmetry is CoreSymmetry.OCTANT:
+            reduced_map[np.tril_indices(len(reduced_map), k=-1)] = empty_value
+
+        return reduced_map
+
+    def is_symmetric(self, core_map: np.ndarray, core_symmetry: CoreSymmetry) -> bool:
+        """Check if a full core map has a symmetry that the core geometry supports"""
+        if not self.supports_symmetry(core_symmetry):
+            return False
+        core_map = np.asarray(core_map)
+        return np.array_equal(
+            self.unfold_map(self._reduce_map(core_map, core_symmetry), core_symmetry), core_map
+        )
+
+    def unfold_map(self, reduced_map: np.ndarray, core_symmetry: CoreSymmetry) -> np.ndarray:
+        """Unfold a map from `reduce_map` back to the full core
+
+        The map may have leading axes (e.g. `[nz, ny, nx]`), the last two axes are unfolded.
+        """
+        reduced_size = self.get_reduced_size(core_symmetry)
+        assert reduced_map.shape[-2:] == (
+            reduced_size,
+            reduced_size,
+        ), f"Reduced map must match reduced core size ({reduced_map.shape=}, {reduced_size=})"
+
+        if core_symmetry is CoreSymmetry.FULL:
+            return reduced_map.copy()
+
+        quarter_map = reduced_map
+        if core_symmetry is CoreSymmetry.OCTANT:
+            upper = np.triu(np.ones((reduced_size, reduced_size), dtype=bool))
+            quarter_map = np.where(upper, reduced_map, np.swapaxes(reduced_map, -1, -2))
+
+        # The center row and column of odd sized cores are shared between the quadrants
+        shared = self.core_size % 2
+        south_map = np.concatenate([quarter_map[..., shared:][..., ::-1], quarter_map], axis=-1)
+        return np.concatenate([south_map[..., shared:, :][..., ::-1, :], south_map], axis=-2)
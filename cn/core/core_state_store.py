@@ -0,0 +1,102 @@
+import h5py
+import numpy as np
+
+from cn.core.core_models import CoreGeometry
+
+# Node-wise fields of a core state, stored as [step, nz, ny, nx]
+CORE_STATE_FIELDS = ["power", "exposure", "void"]
+# Scalar fields of a core state, stored as [step]
+CORE_STATE_SCALARS = ["keff", "cycle_burnup"]
+
+
+class CoreStateStore:
+    """Append-only history of core states in a chunked HDF5 file
+
+    Node-wise fields are `[step, nz, ny, nx]` datasets chunked over a few steps, so appending a
+    step only writes that step and slicing a dataset only reads the chunks it touches.
+
+    Parameters
+    ----------
+    path : str
+        Path to the HDF5 file, created with `CoreStateStore.create`
+    mode : str, optional
+        "r" to read, "a" to append
+    """
+
+    def __init__(self, path: str, mode: str = "r"):
+        assert mode in ["r", "a"], f"Mode must be 'r' or 'a' ({mode=})"
+        self.path = path
+        self._file = h5py.File(path, mode)
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        core_geometry: CoreGeometry,
+        dtype: str = "float64",
+        chunk_steps: int = 8,
+    ):
+        """Create an empty store for a core and open it for appending"""
+        assert chunk_steps > 0, "Chunk steps must be greater than 0."
+        shape = (core_geometry.axial_nodes, core_geometry.core_size, core_geometry.core_size)
+
+        with h5py.File(path, "w") as f:
+            for name in CORE_STATE_FIELDS:
+                f.create_dataset(
+                    name,
+                    shape=(0, *shape),
+                    maxshape=(None, *shape),
+                    chunks=(chunk_steps, *shape),
+                    dtype=dtype,
+                    compression="lzf",
+                )
+            for name in CORE_STATE_SCALARS:
+                f.create_dataset(name, shape=(0,), maxshape=(None,), chunks=(256,), dtype="float64")
+
+        return cls(path, "a")
+
+    def __len__(self) -> int:
+        return self._file[CORE_STATE_SCALARS[0]].shape[0]
+
+    def __getitem__(self, name: str) -> h5py.Dataset:
+        """The dataset of a field, sliced lazily (e.g. `store["power"][step, z]`)"""
+        return self._file[name]
+
+    def append(self, **state: float | np.ndarray):
+        """Append a step with a value for every field in `CORE_STATE_FIELDS` and `CORE_STATE_SCALARS`"""
+        names = CORE_STATE_FIELDS + CORE_STATE_SCALARS
+        assert set(state) == set(names), f"State must have the fields {names} ({list(state)=})"
+
+        step = len(self)
+        for name in names:
+            dataset = self._file[name]
+            dataset.resize(step + 1, axis=0)
+            dataset[step] = state[name]
+
+    def get_axial(self, name: str, step: int, y: int, x: int) -> np.ndarray:
+        """The axial distribution of a field in an assembly, [nz]"""
+        return self._file[name][step, :, y, x]
+
+    def get_radial(self, name: str, step: int, z: int) -> np.ndarray:
+        """The radial distribution of a field in an axial node, [ny, nx]"""
+        return self._file[name][step, z]
+
+    def get_history(
+        self, name: str, z: int | None = None, y: int | None = None, x: int | None = None
+    ) -> np.ndarray:
+        """The history of a field over all steps, of a node or of a scalar field, [step]"""
+        if name in CORE_STATE_SCALARS:
+            return self._file[name][:]
+        return self._file[name][:, z, y, x]
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry
+from cn.utils.th_tools import (
+    get_saturation_properties,
+    get_void_fraction_drift_flux,
+    get_void_fraction_from_vapor_quality,
+)
+
+
+class VoidModel(Enum):
+    SLIP = auto()
+    DRIFT_FLUX = auto()
+
+
+@dataclass
+class CoreThConditions:
+    """Operating conditions of a BWR core for the channel thermal-hydraulics
+
+    Parameters
+    ----------
+    core_power : float
+        Thermal power of the core [W]
+    core_flow : float
+        Coolant flow through the fuel channels of the core [kg/s], split evenly over the channels
+    pressure : float, optional
+        System pressure [MPa]
+    inlet_subcooling : float, optional
+        Enthalpy below saturated liquid at the core inlet [kJ/kg]
+    channel_flow_area : float, optional
+        Coolant flow area of one fuel channel [m2]
+    void_model : VoidModel, optional
+        Model for the void fraction as a function of the quality
+    slip_ratio : float, optional
+        Slip ratio of the SLIP void model
+    drift_flux_C0 : float, optional
+        Distribution parameter of the DRIFT_FLUX void model
+    drift_flux_V_gj : float, optional
+        Drift velocity of the DRIFT_FLUX void model [m/s]
+    """
+
+    core_power: float
+    core_flow: float
+    pressure: float = 7.0
+    inlet_subcooling: float = 50.0
+    channel_flow_area: float = 0.0095
+    void_model: VoidModel = VoidModel.DRIFT_FLUX
+    slip_ratio: float = 1.0
+    drift_flux_C0: float = 1.13
+    drift_flux_V_gj: float = 0.24
+
+    def __post_init__(self):
+        assert self.core_power >= 0, "Core power must be non-negative."
+        assert self.core_flow > 0, "Core flow must be greater than 0."
+        assert self.pressure > 0, "Pressure must be greater than 0."
+        assert self.channel_flow_area > 0, "Channel flow area must be greater than 0."
+
+
+@dataclass
+class CoreThResult:
+    """Node-averaged channel thermal-hydraulics as [nz, ny, nx], 0 outside the core"""
+
+    enthalpy: np.ndarray  # [kJ/kg]
+    quality: np.ndarray  # Equilibrium quality, clipped to [0, 1]
+    void: np.ndarray
+    channel_flow: np.ndarray  # [ny, nx], [kg/s]
+
+
+def solve_core_th(
+    core_geometry: CoreGeometry,
+    power_3d: np.ndarray | list[np.ndarray],
+    conditions: CoreThConditions,
+) -> CoreThResult:
+    """Compute the axial enthalpy, quality and void of all fuel channels at once
+
+    Each assembly is a closed channel with the same flow. The power is heated up along the channel
+    from the bottom (z index 0, as in the KOMODO input) to the top, and the quality is the
+    equilibrium quality, so there is no subcooled boiling.
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry
+    power_3d : np.ndarray | list[np.ndarray]
+        Relative node power as [nz, ny, nx] (e.g. from `komodo_out_3d_power_map`), it is scaled
+        to the core power
+    conditions : CoreThConditions
+        The operating conditions
+
+    Returns
+    -------
+    CoreThResult
+        The node-averaged thermal-hydraulic state
+    """
+    power_3d = np.asarray(power_3d, dtype=float)
+    assert power_3d.shape == (
+        core_geometry.axial_nodes,
+        core_geometry.core_size,
+        core_geometry.core_size,
+    ), f"Power must be [nz, ny, nx] ({power_3d.shape=}, {core_geometry.axial_nodes=}, {core_geometry.core_size=})"
+
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    node_power = np.where(assembly_mask, power_3d, 0.0)
+    assert node_power.min() >= 0, "Power must be non-negative"
+    total_power = node_power.sum()
+    if total_power > 0:
+        # [kW]
+        node_power = node_power * conditions.core_power / total_power / 1000
+
+    saturation = get_saturation_properties(conditions.pressure)
+
+    channel_flow = np.where(
+        assembly_mask, conditions.core_flow / core_geometry.get_assembly_count(), 0.0
+    )
+    # Avoid dividing by zero outside the core, the power is zero there
+    flow = np.where(assembly_mask, channel_flow, 1.0)
+
+    # Enthalpy rise up to the middle of each node
+    enthalpy_rise = (np.cumsum(node_power, axis=0) - node_power / 2) / flow
+    enthalpy = saturation.h_l - conditions.inlet_subcooling + enthalpy_rise
+
+    quality = np.clip((enthalpy - saturation.h_l) / saturation.h_fg, 0.0, 1.0)
+
+    if conditions.void_model is VoidModel.SLIP:
+        void = get_void_fraction_from_vapor_quality(
+            quality, saturation.rho_l, saturation.rho_g, conditions.slip_ratio
+        )
+    else:
+        void = get_void_fraction_drift_flux(
+            quality,
+            saturation.rho_l,
+            saturation.rho_g,
+            G=flow / conditions.channel_flow_area,
+            C0=conditions.drift_flux_C0,
+            V_gj=conditions.drift_flux_V_gj,
+        )
+
+    return CoreThResult(
+        enthalpy=np.where(assembly_mask, enthalpy, 0.0),
+        quality=np.where(assembly_mask, quality, 0.0),
+        void=np.where(assembly_mask, void, 0.0),
+        channel_flow=channel_flow,
+    )
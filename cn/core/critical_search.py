@@ -0,0 +1,202 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.komodo.komodo_bwr_deplete_cycle import komodo_void_iteration, solve_komodo
+from cn.core.komodo.komodo_bwr_input_builder import KomodoInputBuilder
+from cn.core.komodo.komodo_cache import KomodoCache
+from cn.log import logger
+
+# Solves the core for a value of the control parameter (e.g. a rod bank position) and returns k-eff
+KeffSolver = Callable[[float], float]
+
+
+@dataclass
+class CriticalSearchStep:
+    parameter: float
+    keff: float
+    method: str
+
+
+@dataclass
+class CriticalSearchResult:
+    parameter: float
+    keff: float
+    converged: bool
+    # Change of k-eff per unit of the parameter at the end of the search, to seed the next search
+    slope: float | None
+    steps: list[CriticalSearchStep] = field(default_factory=list)
+
+    @property
+    def n_solves(self) -> int:
+        return len(self.steps)
+
+
+def critical_search(
+    keff_solver: KeffSolver,
+    initial_parameter: float,
+    target_keff: float = 1.0,
+    initial_slope: float | None = None,
+    initial_step: float = 1.0,
+    bounds: tuple[float, float] | None = None,
+    keff_tolerance: float = 1.0e-5,
+    max_solves: int = 10,
+) -> CriticalSearchResult:
+    """Find the control parameter that gives the target k-eff with as few core solves as possible
+
+    Secant steps are taken, and once the target is bracketed a secant step that leaves the
+    bracket is replaced by bisection (Dekker's method). This keeps the superlinear convergence of
+    the secant method on the smooth k-eff curves of control parameters, with the safety of a
+    bracket. Seed the search with the critical parameter and
+    the slope of the previous state point (see `CriticalSearchResult.slope`), so the first secant
+    step is usually close.
+
+    Parameters
+    ----------
+    keff_solver : KeffSolver
+        Solves the core for a parameter value, e.g. from `get_komodo_keff_solver`
+    initial_parameter : float
+        The first parameter value to solve
+    target_keff : float, optional
+        The k-eff to search for
+    initial_slope : float, optional
+        Estimate of the change of k-eff per unit of the parameter, e.g. from the previous state
+        point. The second parameter value is `initial_parameter + initial_step` without it
+    initial_step : float, optional
+        Step to the second parameter value, if there is no slope estimate
+    bounds : tuple[float, float], optional
+        The range of the parameter, e.g. (0, max_steps) for a rod bank
+    keff_tolerance : float, optional
+        Converged when k-eff is within this of the target
+    max_solves : int, optional
+        Maximum number of core solves
+
+    Returns
+    -------
+    CriticalSearchResult
+        The parameter, the k-eff and every step of the search
+    """
+    assert max_solves > 0, "Max solves must be greater than 0."
+    steps: list[CriticalSearchStep] = []
+    # Solves of the search by parameter, so no parameter is solved twice
+    solved: dict[float, float] = {}
+
+    def clip(parameter: float) -> float:
+        if bounds is None:
+            return parameter
+        return float(np.clip(parameter, *bounds))
+
+    def solve(parameter: float, method: str) -> float:
+        if parameter not in solved:
+            solved[parameter] = keff_solver(parameter)
+            steps.append(CriticalSearchStep(parameter, solved[parameter], method))
+            logger.debug(f"Critical search {method} step: {parameter=}, keff={solved[parameter]}")
+        return solved[parameter]
+
+    def residual(parameter: float) -> float:
+        return solved[parameter] - target_keff
+
+    def result(parameter: float, converged: bool, slope: float | None) -> CriticalSearchResult:
+        if not converged:
+            logger.warning(
+                f"Critical search did not converge in {len(steps)} solves ({parameter=}, keff={solved[parameter]})"
+            )
+        return CriticalSearchResult(parameter, solved[parameter], converged, slope, steps)
+
+    parameter = clip(initial_parameter)
+    solve(parameter, "initial")
+    if abs(residual(parameter)) < keff_tolerance:
+        return result(parameter, True, initial_slope)
+
+    if initial_slope:
+        next_parameter = clip(parameter - residual(parameter) / initial_slope)
+        method = "slope"
+    else:
+        next_parameter = clip(parameter + initial_step)
+        method = "step"
+    if next_parameter == parameter:
+        return result(parameter, False, initial_slope)
+
+    previous, parameter = parameter, next_parameter
+    solve(parameter, method)
+    slope = initial_slope
+    # Bracket of the target as (low, high) parameters with residuals of opposite sign
+    bracket: tuple[float, float] | None = None
+
+    while abs(residual(parameter)) >= keff_tolerance and len(steps) < max_solves:
+        if residual(parameter) != residual(previous):
+            slope = (residual(parameter) - residual(previous)) / (parameter - previous)
+
+        if bracket is None:
+            if np.sign(residual(parameter)) != np.sign(residual(previous)):
+                bracket = (min(previous, parameter), max(previous, parameter))
+        else:
+            low, high = bracket
+            if np.sign(residual(parameter)) == np.sign(residual(low)):
+                bracket = (parameter, high)
+            else:
+                bracket = (low, parameter)
+
+        next_parameter = parameter if not slope else clip(parameter - residual(parameter) / slope)
+        method = "secant"
+        if bracket is not None and not bracket[0] < next_parameter < bracket[1]:
+            # The secant step left the bracket, bisect it instead
+            next_parameter = (bracket[0] + bracket[1]) / 2
+            method = "bisection"
+
+        if next_parameter == parameter or next_parameter in solved:
+            break
+
+        previous, parameter = parameter, next_parameter
+        solve(parameter, method)
+
+    best = min(solved, key=lambda solved_parameter: abs(residual(solved_parameter)))
+    return result(best, abs(residual(best)) < keff_tolerance, slope)
+
+
+def get_komodo_keff_solver(
+    core_geometry: CoreGeometry,
+    xsec_path: str,
+    case_name: str,
+    case_step: int,
+    material_maps: list[np.ndarray],
+    add_parameter_cards: Callable[[KomodoInputBuilder, float], None],
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    komodo_cache: KomodoCache | None = None,
+    timeout: float | None = None,
+) -> KeffSolver:
+    """Get a `KeffSolver` that solves each parameter value with a forward KOMODO run
+
+    `add_parameter_cards` adds the cards of a parameter value, e.g. `set_crod` with the bank
+    positions. Each solve is an iteration of the case step, and solves of inputs that were solved
+    before come from the cache.
+    """
+    case_iterations = itertools.count()
+
+    def keff_solver(parameter: float) -> float:
+        komodo_input_path = komodo_void_iteration(
+            core_geometry,
+            xsec_path,
+            case_name,
+            case_step,
+            next(case_iterations),
+            core_symmetry=core_symmetry,
+            material_maps=material_maps,
+            add_cards=lambda komodo_input_builder: add_parameter_cards(
+                komodo_input_builder, parameter
+            ),
+        )
+        komodo_output = solve_komodo(
+            core_geometry,
+            komodo_input_path,
+            core_symmetry=core_symmetry,
+            komodo_cache=komodo_cache,
+            timeout=timeout,
+        )
+        assert komodo_output.keff is not None, f"No k-eff in the output of '{komodo_input_path}'"
+        return komodo_output.keff
+
+    return keff_solver
@@ -0,0 +1,415 @@
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry, get_cartesian_symmetry
+from cn.core.komodo.komodo_bwr_input_builder import (
+    KomodoBoundaries,
+    KomodoBoundaryCondition,
+)
+from cn.core.komodo.komodo_parser import KomodoOutput
+from cn.core.komodo.komodo_xsec import KomodoXsec
+from cn.core.komodo.komodo_xsec_library import KomodoXsecLibrary, quantize_node_xsec
+from cn.core.power_void_coupling import CoreSolver
+from cn.log import logger
+
+
+@dataclass
+class DiffusionFaces:
+    """The faces of all nodes in one direction along one axis"""
+
+    area: np.ndarray  # [n_nodes]
+    d: np.ndarray  # [n_nodes], distance from the node point to the face
+    d_neighbor: np.ndarray  # [n_nodes], distance from the face to the neighbor node point
+    neighbors: np.ndarray  # [n_nodes], node index of the neighbor, -1 without a neighbor
+    internal: np.ndarray  # [n_nodes], faces between two nodes of the core
+    at_edge: np.ndarray  # [n_nodes], faces at the edge of the modelled core
+    outside: np.ndarray  # [n_nodes], faces towards nodes that are not part of the core
+    edge_boundary: KomodoBoundaryCondition
+
+
+@dataclass
+class DiffusionProblem:
+    """Discretized multigroup diffusion eigenvalue problem, M phi = 1/k F phi
+
+    Unknowns are ordered by group, then by node (in the order of `np.nonzero(inside)`).
+    """
+
+    core_geometry: CoreGeometry
+    core_symmetry: CoreSymmetry
+    inside: np.ndarray  # [nz, ny, nx], nodes that are part of the core
+    volumes: np.ndarray  # [n_nodes]
+    materials: np.ndarray  # [n_nodes], 0-based material index
+    xsec: KomodoXsec
+    faces: list[DiffusionFaces]
+    M: sp.csc_matrix  # Leakage, removal and in-scattering
+    F: sp.csc_matrix  # Fission production
+    sigf: np.ndarray  # [n_groups, n_nodes]
+
+    @property
+    def n_groups(self) -> int:
+        return self.sigf.shape[0]
+
+    @property
+    def n_nodes(self) -> int:
+        return self.sigf.shape[1]
+
+    def unfold(self, node_values: np.ndarray) -> np.ndarray:
+        """Put node values in [nz, ny, nx] and unfold them to the full core"""
+        reduced_maps = np.zeros(self.inside.shape)
+        reduced_maps[self.inside] = node_values
+        return self.core_geometry.unfold_map(
+            reduced_maps, get_cartesian_symmetry(self.core_symmetry)
+        )
+
+
+def _get_boundary_coefficient(
+    boundary_condition: KomodoBoundaryCondition, D: np.ndarray, d: np.ndarray
+) -> np.ndarray:
+    """Leakage coefficient from a node point to an outer face at distance d"""
+    if boundary_condition is KomodoBoundaryCondition.ZERO_FLUX:
+        return D / d
+    if boundary_condition is KomodoBoundaryCondition.ZERO_INCOMING_CURRENT:
+        # Marshak vacuum boundary, J = phi_surface / 2
+        return D / (d + 2 * D)
+    return np.zeros_like(D)
+
+
+def _get_faces(
+    inside: np.ndarray,
+    node_indices: np.ndarray,
+    node_coords: tuple[np.ndarray, ...],
+    h: list[np.ndarray],
+    d: list[np.ndarray],
+    face_distances: list[np.ndarray],
+    boundaries: KomodoBoundaries,
+) -> list[DiffusionFaces]:
+    # (axis, direction) -> boundary condition at the edge of the modelled core
+    edge_boundaries = {
+        (0, -1): boundaries.bottom,
+        (0, 1): boundaries.top,
+        (1, -1): boundaries.north,
+        (1, 1): boundaries.south,
+        (2, -1): boundaries.west,
+        (2, 1): boundaries.east,
+    }
+    volumes = h[0] * h[1] * h[2]
+
+    faces = []
+    for (axis, direction), edge_boundary in edge_boundaries.items():
+        neighbor_coords = list(node_coords)
+        neighbor_coords[axis] = node_coords[axis] + direction
+        at_edge = (neighbor_coords[axis] < 0) | (neighbor_coords[axis] >= inside.shape[axis])
+        neighbor_coords[axis] = np.clip(neighbor_coords[axis], 0, inside.shape[axis] - 1)
+        neighbors = np.where(at_edge, -1, node_indices[tuple(neighbor_coords)])
+
+        faces.append(
+            DiffusionFaces(
+                area=volumes / h[axis],
+                d=d[axis],
+                d_neighbor=face_distances[axis][neighbor_coords[axis]],
+                neighbors=neighbors,
+                internal=neighbors >= 0,
+                at_edge=at_edge,
+                outside=~at_edge & (neighbors < 0),
+                edge_boundary=edge_boundary,
+            )
+        )
+    return faces
+
+
+def get_face_coefficients(
+    face: DiffusionFaces, D: np.ndarray, D_neighbor: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Leakage coefficients of the faces, per unit area
+
+    Parameters
+    ----------
+    face : DiffusionFaces
+        The faces
+    D : np.ndarray
+        Diffusion coefficients of the nodes, [..., n_nodes]
+    D_neighbor : np.ndarray
+        Diffusion coefficients of all nodes, indexed with the neighbors, [..., n_nodes]
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The coefficient of the node on the diagonal, and the coupling to the neighbor (zero for
+        faces without a neighbor)
+    """
+    D_j = D_neighbor[..., np.maximum(face.neighbors, 0)]
+    coupling = np.where(face.internal, D * D_j / (D * face.d_neighbor + D_j * face.d), 0.0)
+    coefficient = np.where(
+        face.at_edge, _get_boundary_coefficient(face.edge_boundary, D, face.d), coupling
+    )
+    coefficient = np.where(
+        face.outside,
+        _get_boundary_coefficient(KomodoBoundaryCondition.ZERO_INCOMING_CURRENT, D, face.d),
+        coefficient,
+    )
+    return coefficient, coupling
+
+
+def reduce_material_maps(
+    core_geometry: CoreGeometry,
+    material_maps: list[np.ndarray],
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+) -> np.ndarray:
+    """Reduce the material maps to the modelled part of the core, [nz, ny, nx]
+
+    Octant symmetric cores are modelled as a quarter, after validating the octant symmetry.
+    """
+    assert (
+        len(material_maps) == core_geometry.axial_nodes
+    ), f"Material maps must match axial nodes ({len(material_maps)=}, {core_geometry.axial_nodes=})"
+
+    cartesian_symmetry = get_cartesian_symmetry(core_symmetry)
+    if core_symmetry is not cartesian_symmetry:
+        # Validate the maps against the requested symmetry before reducing them
+        for material_map in material_maps:
+            core_geometry.reduce_map(material_map, core_symmetry)
+
+    return np.stack(
+        [
+            np.asarray(core_geometry.reduce_map(material_map, cartesian_symmetry), dtype=int)
+            for material_map in material_maps
+        ]
+    )
+
+
+def build_diffusion_problem(
+    core_geometry: CoreGeometry,
+    material_maps: list[np.ndarray],
+    xsec: KomodoXsec,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    boundaries: KomodoBoundaries | None = None,
+) -> DiffusionProblem:
+    """Discretize the core with a mesh-centered finite difference scheme, one mesh per node
+
+    The material maps and boundaries are the same as for `KomodoInputBuilder.set_geom`. Nodes
+    with material 0 are not part of the core, and faces towards them are treated as zero incoming
+    current boundaries.
+    """
+    cartesian_symmetry = get_cartesian_symmetry(core_symmetry)
+    if boundaries is None:
+        boundaries = KomodoBoundaries.for_symmetry(core_symmetry)
+
+    material_map_3d = reduce_material_maps(core_geometry, material_maps, core_symmetry)
+
+    assert (
+        material_map_3d.max() <= xsec.n_materials
+    ), f"Material maps use materials that are not in the XSEC data ({material_map_3d.max()=}, {xsec.n_materials=})"
+
+    inside = material_map_3d > 0
+    node_coords = np.nonzero(inside)
+    n_nodes = len(node_coords[0])
+    n_groups = xsec.n_groups
+
+    node_indices = np.full(inside.shape, -1)
+    node_indices[inside] = np.arange(n_nodes)
+    materials = material_map_3d[inside] - 1
+
+    # Node sizes along z, y and x
+    radial_node_sizes = core_geometry.get_radial_node_sizes(cartesian_symmetry)
+    node_sizes = [
+        np.full(core_geometry.axial_nodes, core_geometry.assembly_node_size, dtype=float),
+        radial_node_sizes,
+        radial_node_sizes,
+    ]
+    # Distance from the node point to the faces of the node. The center assemblies of odd sized
+    # cores are cut in half by the symmetry planes, their node point is put on the symmetry plane
+    # (the center of the full assembly) so that the reduced core reproduces the full core.
+    face_distances = [node_size / 2 for node_size in node_sizes]
+    for axis in [1, 2]:
+        half_nodes = node_sizes[axis] < core_geometry.assembly_radial_size
+        face_distances[axis][half_nodes] = node_sizes[axis][half_nodes]
+
+    h = [node_sizes[axis][node_coords[axis]] for axis in range(3)]
+    d = [face_distances[axis][node_coords[axis]] for axis in range(3)]
+    volumes = h[0] * h[1] * h[2]
+
+    D = xsec.get_diffusion_coefficient()[materials].T  # [n_groups, n_nodes]
+    sigr = xsec.get_sigr()[materials].T
+
+    faces = _get_faces(inside, node_indices, node_coords, h, d, face_distances, boundaries)
+
+    rows: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    values: list[np.ndarray] = []
+    diagonal = sigr * volumes
+
+    nodes = np.arange(n_nodes)
+    for face in faces:
+        coefficient, coupling = get_face_coefficients(face, D, D)
+        diagonal += face.area * coefficient
+        for group in range(n_groups):
+            rows.append(group * n_nodes + nodes[face.internal])
+            cols.append(group * n_nodes + face.neighbors[face.internal])
+            values.append(-(face.area * coupling[group])[face.internal])
+
+    # In-scattering from the other groups
+    sigs = xsec.sigs[materials]  # [n_nodes, n_groups (from), n_groups (to)]
+    for group_from in range(n_groups):
+        for group_to in range(n_groups):
+            if group_from == group_to:
+                continue
+            rows.append(group_to * n_nodes + nodes)
+            cols.append(group_from * n_nodes + nodes)
+            values.append(-sigs[:, group_from, group_to] * volumes)
+
+    rows.append(np.arange(n_groups * n_nodes))
+    cols.append(np.arange(n_groups * n_nodes))
+    values.append(diagonal.ravel())
+
+    M = sp.csc_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_groups * n_nodes, n_groups * n_nodes),
+    )
+
+    # F = chi x (nu*sigf * V)
+    chi = xsec.chi[materials].T
+    nu_sigf_volume = xsec.nu_sigf[materials].T * volumes
+    F = sp.kron(np.ones((n_groups, n_groups)), sp.identity(n_nodes), format="csc")
+    F = sp.diags(chi.ravel()) @ F @ sp.diags(nu_sigf_volume.ravel())
+
+    return DiffusionProblem(
+        core_geometry=core_geometry,
+        core_symmetry=core_symmetry,
+        inside=inside,
+        volumes=volumes,
+        materials=materials,
+        xsec=xsec,
+        faces=faces,
+        M=M.tocsc(),
+        F=sp.csc_matrix(F),
+        sigf=xsec.sigf[materials].T,
+    )
+
+
+def solve_diffusion_problem(
+    problem: DiffusionProblem,
+    keff_tolerance: float = 1e-6,
+    fission_source_tolerance: float = 1e-5,
+    max_iterations: int = 500,
+    wielandt_shift: float | None = 0.1,
+    n_unshifted_iterations: int = 3,
+    adjoint: bool = False,
+) -> tuple[float, np.ndarray, np.ndarray]:
+    """Solve the eigenvalue problem with Wielandt shifted power iteration
+
+    After `n_unshifted_iterations` plain power iterations, the shift is fixed at
+    k_shift = k + `wielandt_shift` and the shifted operator is factorized once. The shift moves
+    the dominance ratio away from 1, so only a few iterations are needed.
+
+    Returns
+    -------
+    tuple[float, np.ndarray, np.ndarray]
+        k-eff, the flux [n_groups, n_nodes] and the iteration history as rows of
+        (iteration, k-eff, fission source error, flux error)
+    """
+    M, F = problem.M, problem.F
+    if adjoint:
+        M, F = M.T.tocsc(), F.T.tocsc()
+
+    phi = np.ones(M.shape[0])
+    keff = 1.0
+    fission_source = F @ phi
+
+    lu = spla.splu(M)
+    inverse_keff_shift = 0.0
+
+    iterations = []
+    for iteration in range(1, max_iterations + 1):
+        if wielandt_shift is not None and iteration == n_unshifted_iterations + 1:
+            inverse_keff_shift = 1 / (keff + wielandt_shift)
+            lu = spla.splu((M - inverse_keff_shift * F).tocsc())
+
+        phi_new = lu.solve(fission_source)
+        fission_source_new = F @ phi_new
+
+        # Eigenvalue of the (shifted) operator, 1/k = 1/k_shift + 1/mu
+        mu = fission_source_new.sum() / fission_source.sum()
+        keff_new = 1 / (inverse_keff_shift + 1 / mu)
+
+        # Normalize to the previous fission source to compare the iterates
+        scale = fission_source.sum() / fission_source_new.sum()
+        phi_new *= scale
+        fission_source_new *= scale
+
+        fission_source_error = np.max(np.abs(fission_source_new - fission_source)) / np.max(
+            np.abs(fission_source_new)
+        )
+        flux_error = np.max(np.abs(phi_new - phi)) / np.max(np.abs(phi_new))
+        keff_error = abs(keff_new - keff)
+
+        phi, fission_source, keff = phi_new, fission_source_new, keff_new
+        iterations.append((iteration, keff, fission_source_error, flux_error))
+
+        if keff_error < keff_tolerance and fission_source_error < fission_source_tolerance:
+            break
+    else:
+        logger.warning(f"Diffusion solve did not converge in {max_iterations} iterations")
+
+    return keff, phi.reshape(problem.n_groups, problem.n_nodes), np.array(iterations)
+
+
+def solve_diffusion(
+    core_geometry: CoreGeometry,
+    material_maps: list[np.ndarray],
+    xsec: KomodoXsec,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    boundaries: KomodoBoundaries | None = None,
+    **solver_kwargs,
+) -> KomodoOutput:
+    """In-process alternative to a forward KOMODO solve of the same input
+
+    Returns the same `KomodoOutput` as `read_komodo_output`, with the relative power density
+    normalized to an average of 1 over the core in `node_maps["3d_power"]` and the flux of each
+    group in `node_maps["3d_flux_g<group>"]`.
+    """
+    problem = build_diffusion_problem(core_geometry, material_maps, xsec, core_symmetry, boundaries)
+    keff, phi, iterations = solve_diffusion_problem(problem, **solver_kwargs)
+
+    power = (problem.sigf * phi).sum(axis=0)
+    power /= np.sum(power * problem.volumes) / np.sum(problem.volumes)
+
+    komodo_output = KomodoOutput(keff=keff, iterations=iterations)
+    komodo_output.node_maps["3d_power"] = problem.unfold(power)
+    for group in range(problem.n_groups):
+        komodo_output.node_maps[f"3d_flux_g{group + 1}"] = problem.unfold(phi[group])
+
+    return komodo_output
+
+
+def get_diffusion_core_solver(
+    core_geometry: CoreGeometry,
+    libraries: list[KomodoXsecLibrary],
+    segment: np.ndarray,
+    exposure: np.ndarray,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    boundaries: KomodoBoundaries | None = None,
+    xs_tolerance: float = 1.0e-4,
+) -> CoreSolver:
+    """Get a `CoreSolver` for `couple_power_void` that solves each iteration with `solve_diffusion`
+
+    The cross sections are interpolated for the void of the iteration and the node exposures, and
+    quantized with `quantize_node_xsec`.
+    """
+
+    def core_solver(void: np.ndarray, case_iteration: int, solver_tolerance: float):
+        xsec, material_maps = quantize_node_xsec(
+            core_geometry, libraries, segment, void, exposure, xs_tolerance
+        )
+        return solve_diffusion(
+            core_geometry,
+            material_maps,
+            xsec,
+            core_symmetry,
+            boundaries,
+            fission_source_tolerance=solver_tolerance,
+        )
+
+    return core_solver
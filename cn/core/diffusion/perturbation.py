@@ -0,0 +1,248 @@
+import hashlib
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.diffusion.diffusion_solver import (
+    DiffusionProblem,
+    build_diffusion_problem,
+    get_face_coefficients,
+    reduce_material_maps,
+    solve_diffusion_problem,
+)
+from cn.core.komodo.komodo_bwr_input_builder import KomodoBoundaries
+from cn.core.komodo.komodo_parser import KomodoOutput
+from cn.core.komodo.komodo_xsec import KomodoXsec
+from cn.log import logger
+
+# Solves the core for material maps, as for `KomodoInputBuilder.set_geom`
+MaterialMapsSolver = Callable[[list[np.ndarray]], KomodoOutput]
+
+
+def get_reference_hash(
+    core_geometry: CoreGeometry,
+    material_maps: list[np.ndarray],
+    xsec: KomodoXsec,
+    core_symmetry: CoreSymmetry,
+    boundaries: KomodoBoundaries | None,
+) -> str:
+    """Hash of the inputs of a reference core, to tell if a saved reference state belongs to it"""
+    if boundaries is None:
+        boundaries = KomodoBoundaries.for_symmetry(core_symmetry)
+    reference_hash = hashlib.sha256(f"{core_geometry}\n{core_symmetry}\n{boundaries}\n".encode())
+    for material_map in material_maps:
+        reference_hash.update(np.ascontiguousarray(material_map, dtype=np.int64).tobytes())
+    for xs in [xsec.sigtr, xsec.siga, xsec.nu_sigf, xsec.sigf, xsec.chi, xsec.sigs]:
+        reference_hash.update(np.ascontiguousarray(xs, dtype=np.float64).tobytes())
+    return reference_hash.hexdigest()
+
+
+@dataclass
+class ReferenceState:
+    """Forward and adjoint solution of a reference core, for first-order perturbation estimates
+
+    The eigenvalue problem is M phi = lambda F phi with lambda = 1/k. For a perturbation of the
+    operators, first-order perturbation theory gives
+
+        d_lambda = <phi_adj, (dM - lambda dF) phi> / <phi_adj, F phi>
+
+    A perturbation here puts other materials in some nodes. The change of lambda for putting a
+    material in a node only depends on that node, so it is computed once for every node and
+    material (`material_worths`) and the estimate of a candidate is a sum over its changed nodes.
+    """
+
+    problem: DiffusionProblem
+    keff: float
+    flux: np.ndarray  # [n_groups, n_nodes]
+    adjoint_flux: np.ndarray  # [n_groups, n_nodes]
+
+    @cached_property
+    def material_worths(self) -> np.ndarray:
+        """Change of 1/k for putting each material in each node, [n_nodes, n_materials]"""
+        problem, xsec = self.problem, self.problem.xsec
+        phi, phi_adj = self.flux, self.adjoint_flux
+        inverse_keff = 1 / self.keff
+
+        # Removal, in-scattering and fission of every material in every node
+        sigs_in = xsec.sigs * (1 - np.eye(xsec.n_groups))  # [material, from, to]
+        fission = np.einsum("gn,mg->nm", phi_adj, xsec.chi) * np.einsum(
+            "mh,hn->nm", xsec.nu_sigf, phi
+        )
+        worths = problem.volumes[:, None] * (
+            np.einsum("gn,mg,gn->nm", phi_adj, xsec.get_sigr(), phi)
+            - np.einsum("gn,mhg,hn->nm", phi_adj, sigs_in, phi)
+            - inverse_keff * fission
+        )
+
+        # Leakage through the faces of the node. A face between two nodes adds
+        # coupling * (phi_adj_i - phi_adj_j) * (phi_i - phi_j) to <phi_adj, M phi>
+        D = xsec.get_diffusion_coefficient()  # [material, group]
+        D_nodes = D[problem.materials].T
+        for face in problem.faces:
+            coefficient, coupling = get_face_coefficients(face, D[:, :, None], D_nodes)
+            neighbors = np.maximum(face.neighbors, 0)
+            phi_j, phi_adj_j = phi[:, neighbors], phi_adj[:, neighbors]
+            worths += face.area[:, None] * (
+                np.einsum("mgn,gn->nm", coefficient, phi_adj * phi)
+                - np.einsum(
+                    "mgn,gn->nm", coupling, phi_adj * phi_j + phi_adj_j * phi - phi_adj_j * phi_j
+                )
+            )
+
+        worths -= worths[np.arange(problem.n_nodes), problem.materials][:, None]
+        return worths / np.sum(phi_adj.ravel() * (problem.F @ phi.ravel()))
+
+    def get_candidate_materials(self, candidates: list[list[np.ndarray]]) -> np.ndarray:
+        """The 0-based node materials of candidate material maps, [n_candidates, n_nodes]
+
+        Candidates must have the symmetry of the reference and the same nodes in the core.
+        """
+        candidate_materials = np.zeros((len(candidates), self.problem.n_nodes), dtype=int)
+        for i, material_maps in enumerate(candidates):
+            material_map_3d = reduce_material_maps(
+                self.problem.core_geometry, material_maps, self.problem.core_symmetry
+            )
+            assert np.array_equal(
+                material_map_3d > 0, self.problem.inside
+            ), f"Candidate {i} must have the same nodes in the core as the reference"
+            candidate_materials[i] = material_map_3d[self.problem.inside] - 1
+        return candidate_materials
+
+    def estimate_keffs(self, candidates: list[list[np.ndarray]]) -> np.ndarray:
+        """First-order k-eff of each candidate material maps, [n_candidates]"""
+        candidate_materials = self.get_candidate_materials(candidates)
+        nodes = np.arange(self.problem.n_nodes)
+        delta_inverse_keff = self.material_worths[nodes, candidate_materials].sum(axis=1)
+        return 1 / (1 / self.keff + delta_inverse_keff)
+
+    def save(self, path: str, reference_hash: str = ""):
+        """Save the solution, the problem is rebuilt from the reference core on load
+
+        The `reference_hash` (`get_reference_hash`) of the reference core is saved with it.
+        """
+        np.savez(
+            path,
+            keff=self.keff,
+            flux=self.flux,
+            adjoint_flux=self.adjoint_flux,
+            reference_hash=reference_hash,
+        )
+
+    @classmethod
+    def load(cls, path: str, problem: DiffusionProblem, reference_hash: str = ""):
+        """Load a solution saved with `save` for the problem of the reference core
+
+        Raises a `ValueError` if the solution was saved with another `reference_hash`.
+        """
+        with np.load(path) as data:
+            saved_hash = str(data["reference_hash"]) if "reference_hash" in data.files else None
+            if saved_hash != reference_hash:
+                raise ValueError(f"Saved reference state '{path}' is of another reference core")
+            flux, adjoint_flux = data["flux"], data["adjoint_flux"]
+            assert flux.shape == (
+                problem.n_groups,
+                problem.n_nodes,
+            ), f"Saved flux does not match the problem ({flux.shape=}, {problem.n_groups=}, {problem.n_nodes=})"
+            return cls(problem, float(data["keff"]), flux, adjoint_flux)
+
+
+def get_reference_state(
+    core_geometry: CoreGeometry,
+    material_maps: list[np.ndarray],
+    xsec: KomodoXsec,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    boundaries: KomodoBoundaries | None = None,
+    reference_path: str | None = None,
+    **solver_kwargs,
+) -> ReferenceState:
+    """Solve the forward and adjoint problem of a reference core
+
+    With `reference_path`, a solution saved there is loaded instead of solving, and a new solution
+    is saved there, so the adjoint is computed once per reference state. A saved solution of other
+    material maps, cross sections or boundaries is solved again.
+    """
+    problem = build_diffusion_problem(core_geometry, material_maps, xsec, core_symmetry, boundaries)
+
+    reference_hash = ""
+    if reference_path is not None:
+        reference_hash = get_reference_hash(
+            core_geometry, material_maps, xsec, core_symmetry, boundaries
+        )
+        try:
+            reference_state = ReferenceState.load(reference_path, problem, reference_hash)
+            logger.debug(f"Loaded reference state from '{reference_path}'")
+            return reference_state
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.info(f"{e}, solving it again")
+
+    keff, flux, _ = solve_diffusion_problem(problem, **solver_kwargs)
+    adjoint_keff, adjoint_flux, _ = solve_diffusion_problem(problem, adjoint=True, **solver_kwargs)
+    if abs(adjoint_keff - keff) > 1e-5:
+        logger.warning(f"Adjoint k-eff differs from the forward k-eff ({keff=}, {adjoint_keff=})")
+
+    reference_state = ReferenceState(problem, keff, flux, adjoint_flux)
+    if reference_path is not None:
+        reference_state.save(reference_path, reference_hash)
+    return reference_state
+
+
+@dataclass
+class PerturbationScreening:
+    estimated_keffs: np.ndarray  # [n_candidates]
+    # Candidate index -> forward solution, for the candidates that were solved
+    solutions: dict[int, KomodoOutput] = field(default_factory=dict)
+
+    @property
+    def n_forward_solves(self) -> int:
+        return len(self.solutions)
+
+
+def screen_perturbations(
+    reference_state: ReferenceState,
+    candidates: list[list[np.ndarray]],
+    forward_solver: MaterialMapsSolver,
+    n_forward_solves: int,
+    target_keff: float | None = None,
+) -> PerturbationScreening:
+    """Estimate k-eff of all candidates and solve only the most promising ones
+
+    Parameters
+    ----------
+    reference_state : ReferenceState
+        The reference core, e.g. from `get_reference_state`
+    candidates : list[list[np.ndarray]]
+        Material maps of the candidates, e.g. the reference with two assemblies swapped
+    forward_solver : MaterialMapsSolver
+        Solves a candidate, e.g. with `solve_diffusion` or KOMODO
+    n_forward_solves : int
+        Number of candidates to solve
+    target_keff : float, optional
+        Rank the candidates by the distance of the estimated k-eff to this, highest k-eff first
+        without it
+
+    Returns
+    -------
+    PerturbationScreening
+        The estimates of all candidates and the solutions of the solved ones
+    """
+    assert n_forward_solves >= 0, "Number of forward solves must be non-negative."
+    estimated_keffs = reference_state.estimate_keffs(candidates)
+
+    if target_keff is None:
+        ranking = np.argsort(-estimated_keffs, kind="stable")
+    else:
+        ranking = np.argsort(np.abs(estimated_keffs - target_keff), kind="stable")
+
+    screening = PerturbationScreening(estimated_keffs)
+    for candidate in ranking[:n_forward_solves]:
+        screening.solutions[int(candidate)] = forward_solver(candidates[candidate])
+
+    logger.info(
+        f"Screened {len(candidates)} perturbations with {screening.n_forward_solves} forward solves"
+    )
+    return screening
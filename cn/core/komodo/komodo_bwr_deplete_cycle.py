@@ -1,52 +1,351 @@
 import os
 import subprocess
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
 
 from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.core_state_store import CoreStateStore
+from cn.core.core_th import CoreThConditions
 from cn.core.komodo.komodo_bwr_input_builder import KomodoInputBuilder, KomodoMode
+from cn.core.komodo.komodo_cache import KomodoCache
+from cn.core.komodo.komodo_parser import KomodoOutput, read_komodo_output
+from cn.core.komodo.komodo_runner import KOMODO_EXIT_NORMALLY, RESOURCE_SAMPLE_INTERVAL
+from cn.core.komodo.komodo_xsec_library import KomodoXsecLibrary, quantize_node_xsec
+from cn.core.power_void_coupling import (
+    CoreSolver,
+    PowerVoidSettings,
+    couple_power_void,
+    get_void_material_maps,
+)
 from cn.examples.config import config
+from cn.log import logger
+from cn.utils.profiling import PhaseProfiler, phase
+from cn.utils.resources import ResourceSampler, ResourceUsage
 
 
 def komodo_void_iteration(
-    core_geometry: CoreGeometry, xsec_path: str, case_name: str, case_step: int, case_iteration: int
+    core_geometry: CoreGeometry,
+    xsec_path: str,
+    case_name: str,
+    case_step: int,
+    case_iteration: int,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    material_maps: list[np.ndarray] | None = None,
+    fission_err_criteria: float = 1.0e-5,
+    flux_err_criteria: float = 1.0e-5,
+    add_cards: Callable[[KomodoInputBuilder], None] | None = None,
 ):
+    """Write the KOMODO input of one power-void iteration of a case step
+
+    The material maps select the cross sections of each node for the void of the iteration, by
+    default all assemblies get material 1. `add_cards` can add cards such as `set_crod` after the
+    geometry card.
+    """
+    if material_maps is None:
+        material_maps = [
+            core_geometry.get_core_map(fill_value=1, empty_value=0)
+        ] * core_geometry.axial_nodes
+
     komodo_input_builder = KomodoInputBuilder()
 
     komodo_input_builder.set_mode(KomodoMode.FORWARD)
     komodo_input_builder.set_case(
         f"{case_name}", f"CASE {case_name}, STEP {case_step}, ITERATION {case_iteration}"
     )
-    komodo_input_builder.set_xsec_file(xsec_path)
+    # The XSEC path must not depend on the directory KOMODO is run from
+    komodo_input_builder.set_xsec_file(os.path.abspath(xsec_path))
 
     komodo_input_builder.set_geom(
-        core_geometry,
-        material_maps=[core_geometry.get_core_map(fill_value=1, empty_value=0)]
-        * core_geometry.axial_nodes,
+        core_geometry, material_maps=material_maps, core_symmetry=core_symmetry
     )
+    if add_cards is not None:
+        add_cards(komodo_input_builder)
 
-    komodo_input_builder.set_iter(1200, 5, 1.0e-5, 1.0e-5, 15, 40, 20, 80)
+    komodo_input_builder.set_iter(1200, 5, fission_err_criteria, flux_err_criteria, 15, 40, 20, 80)
     komodo_input_builder.set_outp()
     # komodo_input_builder.set_vtk()
 
-    komodo_input = komodo_input_builder.build()
     output_path = os.path.join(config.core_dir, case_name)
     output_file_name = f"komodo_{case_name}_{case_step}_{case_iteration}.inp"
     komodo_input_path = os.path.join(output_path, output_file_name)
 
     os.makedirs(output_path, exist_ok=True)
 
-    with open(komodo_input_path, "w") as f:
-        f.write(komodo_input)
+    komodo_input_builder.write(komodo_input_path)
 
     return komodo_input_path
 
 
-def run_komodo(komodo_input_path: str):
+def run_komodo(
+    komodo_input_path: str, timeout: float | None = None, sample_resources: bool = False
+) -> ResourceUsage | None:
+    """Run KOMODO on an input, returning the sampled memory and CPU use with `sample_resources`"""
     p = subprocess.Popen(
         ["komodo", komodo_input_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
     )
-    out, err = p.communicate()
+    sampler = ResourceSampler(p.pid, RESOURCE_SAMPLE_INTERVAL).start() if sample_resources else None
+    try:
+        out, err = p.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        p.kill()
+        p.communicate()
+        raise Exception(f"KOMODO was killed after {timeout} s")
+    finally:
+        resources = None if sampler is None else sampler.stop()
     if err:
-        raise Exception(err.decode())
+        logger.warning(f"KOMODO wrote to stderr:\n{err.decode()}")
     out_decoded = out.decode()
-    if not "KOMODO EXIT NORMALLY" in out_decoded:
+    if p.returncode != 0 or not KOMODO_EXIT_NORMALLY in out_decoded:
         raise Exception(f"KOMODO did not exit properly:\n{out_decoded}")
+    if resources is not None:
+        logger.debug(
+            f"KOMODO run of '{komodo_input_path}': peak RSS {resources.peak_rss / 2**20:.1f} MiB,"
+            f" {resources.cpu_utilization:.2f} cores"
+        )
+    return resources
+
+
+def solve_komodo(
+    core_geometry: CoreGeometry,
+    komodo_input_path: str,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    komodo_cache: KomodoCache | None = None,
+    timeout: float | None = None,
+    profiler: PhaseProfiler | None = None,
+) -> KomodoOutput:
+    """Run KOMODO and read its outputs, or get them from the cache if the input was solved before
+
+    With a `profiler`, the KOMODO run and the parsing of its outputs are timed.
+    """
+    if komodo_cache is not None:
+        with open(komodo_input_path, "r") as f:
+            komodo_input = f.read()
+        komodo_output = komodo_cache.get(komodo_input)
+        if komodo_output is not None:
+            return komodo_output
+
+    with phase(profiler, "komodo_run"):
+        run_komodo(komodo_input_path, timeout=timeout)
+    with phase(profiler, "komodo_parse"):
+        komodo_output = read_komodo_output(core_geometry, komodo_input_path, core_symmetry)
+
+    if komodo_cache is not None:
+        komodo_cache.put(komodo_input, komodo_output)
+
+    return komodo_output
+
+
+def get_komodo_core_solver(
+    core_geometry: CoreGeometry,
+    xsec_path: str,
+    case_name: str,
+    case_step: int,
+    void_levels: list[float],
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    komodo_cache: KomodoCache | None = None,
+    timeout: float | None = None,
+    profiler: PhaseProfiler | None = None,
+) -> CoreSolver:
+    """Get a `CoreSolver` for `couple_power_void` that solves each iteration with KOMODO
+
+    Material `i` of the XSEC file holds the cross sections at `void_levels[i - 1]`, each node gets
+    the material of the void level closest to its void. With a `profiler`, the input build, the
+    KOMODO run and the parsing of each iteration are timed.
+    """
+
+    def core_solver(void: np.ndarray, case_iteration: int, solver_tolerance: float):
+        with phase(profiler, "komodo_input", step=case_step, iteration=case_iteration):
+            komodo_input_path = komodo_void_iteration(
+                core_geometry,
+                xsec_path,
+                case_name,
+                case_step,
+                case_iteration,
+                core_symmetry=core_symmetry,
+                material_maps=get_void_material_maps(core_geometry, void, void_levels),
+                fission_err_criteria=solver_tolerance,
+                flux_err_criteria=solver_tolerance,
+            )
+        return solve_komodo(
+            core_geometry,
+            komodo_input_path,
+            core_symmetry=core_symmetry,
+            komodo_cache=komodo_cache,
+            timeout=timeout,
+            profiler=profiler,
+        )
+
+    return core_solver
+
+
+def get_komodo_depletion_core_solver(
+    core_geometry: CoreGeometry,
+    libraries: list[KomodoXsecLibrary],
+    segment: np.ndarray,
+    exposure: np.ndarray,
+    case_name: str,
+    case_step: int,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+    xs_tolerance: float = 1.0e-3,
+    max_materials: int | None = None,
+    komodo_cache: KomodoCache | None = None,
+    timeout: float | None = None,
+    profiler: PhaseProfiler | None = None,
+) -> CoreSolver:
+    """Get a `CoreSolver` that solves each iteration of a depletion step with KOMODO
+
+    The cross sections of each iteration are interpolated for the void of the iteration and the
+    exposure of the step, quantized with `quantize_node_xsec` and written to an XSEC file next to
+    the KOMODO input. With a `profiler`, the input build (cross sections included), the KOMODO
+    run and the parsing of each iteration are timed.
+    """
+
+    def core_solver(void: np.ndarray, case_iteration: int, solver_tolerance: float):
+        with phase(profiler, "komodo_input", step=case_step, iteration=case_iteration):
+            xsec, material_maps = quantize_node_xsec(
+                core_geometry, libraries, segment, void, exposure, xs_tolerance, max_materials
+            )
+            xsec_path = os.path.join(
+                config.core_dir,
+                case_name,
+                f"komodo_{case_name}_{case_step}_{case_iteration}_XSEC.txt",
+            )
+            xsec.write(xsec_path)
+
+            komodo_input_path = komodo_void_iteration(
+                core_geometry,
+                xsec_path,
+                case_name,
+                case_step,
+                case_iteration,
+                core_symmetry=core_symmetry,
+                material_maps=material_maps,
+                fission_err_criteria=solver_tolerance,
+                flux_err_criteria=solver_tolerance,
+            )
+        return solve_komodo(
+            core_geometry,
+            komodo_input_path,
+            core_symmetry=core_symmetry,
+            komodo_cache=komodo_cache,
+            timeout=timeout,
+            profiler=profiler,
+        )
+
+    return core_solver
+
+
+# Gets the core solver of a depletion step from the step index and the node exposures
+CoreSolverFactory = Callable[[int, np.ndarray], CoreSolver]
+
+
+@dataclass
+class CycleDepletionResult:
+    # Core average burnup at the start of each step
+    cycle_burnups: np.ndarray
+    keffs: np.ndarray
+    # Number of core solves of the power-void iteration of each step
+    n_core_solves: np.ndarray
+    final_exposure: np.ndarray = field(repr=False)
+
+
+def get_node_burnup_increment(
+    core_geometry: CoreGeometry, power_3d: np.ndarray, cycle_burnup_increment: float
+) -> np.ndarray:
+    """Distribute a core average burnup increment over the nodes in proportion to their power
+
+    All nodes are assumed to hold the same heavy metal mass.
+    """
+    assembly_mask = np.broadcast_to(
+        core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool), np.shape(power_3d)
+    )
+    relative_power = np.where(assembly_mask, power_3d, 0.0)
+    relative_power /= relative_power[assembly_mask].mean()
+    return cycle_burnup_increment * relative_power
+
+
+def deplete_cycle(
+    core_geometry: CoreGeometry,
+    core_solver_factory: CoreSolverFactory,
+    th_conditions: CoreThConditions,
+    cycle_burnups: list[float],
+    initial_exposure: np.ndarray,
+    core_state_store: CoreStateStore,
+    power_void_settings: PowerVoidSettings | None = None,
+    profiler: PhaseProfiler | None = None,
+) -> CycleDepletionResult:
+    """Deplete the core over the cycle burnup steps
+
+    Each step solves the power and void at the node exposures of the start of the step with
+    `couple_power_void`, and adds the burnup of the step to the nodes in proportion to their power.
+    The void of a step is the starting point of the next one. The state of each step is appended to
+    the core state store as it is solved instead of being kept in memory.
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry
+    core_solver_factory : CoreSolverFactory
+        Gets the core solver of a step, e.g. wrapping `get_komodo_depletion_core_solver`
+    th_conditions : CoreThConditions
+        The operating conditions of the thermal-hydraulics
+    cycle_burnups : list[float]
+        Core average cycle burnups of the steps, ascending and in the exposure unit of the
+        cross section libraries
+    initial_exposure : np.ndarray
+        Node exposures at the start of the cycle as [nz, ny, nx]
+    core_state_store : CoreStateStore
+        Store to append the core state of each step to, opened for appending
+    power_void_settings : PowerVoidSettings, optional
+        Settings of the power-void iteration of each step
+    profiler : PhaseProfiler, optional
+        Times each step, give the same profiler to the core solvers to time their phases
+
+    Returns
+    -------
+    CycleDepletionResult
+        k-eff and the number of core solves of each step, and the final exposures
+    """
+    assert len(cycle_burnups) > 0, "There must be at least one cycle burnup step"
+    assert np.all(np.diff(cycle_burnups) >= 0), "Cycle burnups must be ascending"
+
+    exposure = np.array(initial_exposure, dtype=float)
+    void = None
+    keffs = []
+    n_core_solves = []
+
+    for case_step, cycle_burnup in enumerate(cycle_burnups):
+        with phase(profiler, "cycle_step", step=case_step):
+            core_solver = core_solver_factory(case_step, exposure)
+            power_void = couple_power_void(
+                core_geometry, core_solver, th_conditions, void, power_void_settings
+            )
+        void = power_void.void
+        keffs.append(np.nan if power_void.keff is None else power_void.keff)
+        n_core_solves.append(power_void.n_core_solves)
+
+        core_state_store.append(
+            power=power_void.power_3d,
+            exposure=exposure,
+            void=power_void.void,
+            keff=keffs[-1],
+            cycle_burnup=cycle_burnup,
+        )
+        core_state_store.flush()
+        logger.info(
+            f"Depletion step {case_step} at {cycle_burnup} cycle burnup: keff={keffs[-1]:.5f} ({power_void.n_core_solves} core solves)"
+        )
+
+        if case_step + 1 < len(cycle_burnups):
+            exposure = exposure + get_node_burnup_increment(
+                core_geometry, power_void.power_3d, cycle_burnups[case_step + 1] - cycle_burnup
+            )
+
+    return CycleDepletionResult(
+        cycle_burnups=np.array(cycle_burnups, dtype=float),
+        keffs=np.array(keffs),
+        n_core_solves=np.array(n_core_solves),
+        final_exposure=exposure,
+    )
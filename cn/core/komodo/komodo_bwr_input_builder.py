@@ -1,10 +1,11 @@
+import io
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from typing import Callable, TextIO
 
 import numpy as np
-import pandas as pd
 
-from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.core_models import CoreGeometry, CoreSymmetry, get_cartesian_symmetry
 
 
 class KomodoMode(Enum):
@@ -30,10 +31,50 @@ class KomodoBoundaries:
     bottom: KomodoBoundaryCondition
     top: KomodoBoundaryCondition
 
+    @classmethod
+    def for_symmetry(
+        cls,
+        core_symmetry: CoreSymmetry,
+        outer: KomodoBoundaryCondition = KomodoBoundaryCondition.ZERO_INCOMING_CURRENT,
+    ):
+        """Get the boundaries of a (reduced) core, where the symmetry planes are reflective
+
+        The reduced core is the south-east quadrant of the core, see `CoreGeometry.reduce_map`.
+        """
+        symmetry_plane = outer
+        if get_cartesian_symmetry(core_symmetry) is CoreSymmetry.QUARTER:
+            symmetry_plane = KomodoBoundaryCondition.REFLECTIVE
+
+        return cls(
+            east=outer,
+            west=symmetry_plane,
+            north=symmetry_plane,
+            south=outer,
+            bottom=outer,
+            top=outer,
+        )
+
+
+# Cards are kept as strings, except for large cards (such as the geometry card with its material
+# maps) that are kept as writers, so that they can be written straight to the input file
+KomodoInputPart = str | Callable[[TextIO], None]
+
+
+def run_length_encode(values: list) -> list[str]:
+    """Encode values with the KOMODO repetition syntax, e.g. [1, 1, 1, 2] -> ["3*1", "1*2"]"""
+    encoded_values: list[str] = []
+    count = 0
+    for value_idx, value in enumerate(values):
+        count += 1
+        if value_idx == len(values) - 1 or values[value_idx + 1] != value:
+            encoded_values.append(f"{count}*{value}")
+            count = 0
+    return encoded_values
+
 
 @dataclass
 class KomodoInputBuilder:
-    komodo_input_parts: list[str] = field(default_factory=list)
+    komodo_input_parts: list[KomodoInputPart] = field(default_factory=list)
 
     def set_mode(self, mode: KomodoMode):
         self.komodo_input_parts.append(
@@ -65,13 +106,10 @@ FILE {xsec_file_path}
 """
         )
 
-    def _get_material_map(self, material_map: np.ndarray, material_map_idx: int):
-        df = pd.DataFrame(material_map)
-        material_map_str = df.to_string(header=False, index=False)
-        return f"""\
-! Material map (planar type) {material_map_idx}
-{material_map_str}\
-"""
+    def _write_material_map(self, f: TextIO, material_map: np.ndarray, material_map_idx: int):
+        width = len(str(material_map.max()))
+        f.write(f"! Material map (planar type) {material_map_idx}\n")
+        np.savetxt(f, material_map, fmt=f"%{width}d")
 
     def set_geom(
         self,
@@ -79,10 +117,10 @@ FILE {xsec_file_path}
         material_maps: list[np.ndarray],
         core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
     ):
-        assert core_symmetry is CoreSymmetry.FULL, f"Only full core symmetry is supported"
+        cartesian_symmetry = get_cartesian_symmetry(core_symmetry)
 
-        nx = core_geometry.core_size
-        ny = core_geometry.core_size
+        nx = core_geometry.get_reduced_size(cartesian_symmetry)
+        ny = nx
         nz = core_geometry.axial_nodes
 
         assert (
@@ -91,32 +129,45 @@ FILE {xsec_file_path}
 
         for material_map in material_maps:
             assert material_map.shape == (
-                nx,
-                ny,
-            ), f"Material map must match core size ({material_map.shape=}, {nx=}, {ny=})"
-
-        assembly_size_x = [f"{nx}*{core_geometry.assembly_radial_size}"]
-        assembly_size_y = [f"{ny}*{core_geometry.assembly_radial_size}"]
+                core_geometry.core_size,
+                core_geometry.core_size,
+            ), f"Material map must match core size ({material_map.shape=}, {core_geometry.core_size=})"
+
+        if core_symmetry is not cartesian_symmetry:
+            # Validate the maps against the requested symmetry before reducing them
+            for material_map in material_maps:
+                core_geometry.reduce_map(material_map, core_symmetry)
+
+        # Write each unique plane once and assign the planar types to the axial nodes
+        planar_types: dict[bytes, int] = {}
+        planar_maps: list[np.ndarray] = []
+        planar_type_per_node: list[int] = []
+        for material_map in material_maps:
+            planar_map = np.asarray(
+                core_geometry.reduce_map(material_map, cartesian_symmetry), dtype=int
+            )
+            planar_key = planar_map.tobytes()
+            if planar_key not in planar_types:
+                planar_maps.append(planar_map)
+                planar_types[planar_key] = len(planar_maps)
+            planar_type_per_node.append(planar_types[planar_key])
+
+        radial_node_sizes = run_length_encode(
+            core_geometry.get_radial_node_sizes(cartesian_symmetry).tolist()
+        )
+        assembly_size_x = radial_node_sizes
+        assembly_size_y = radial_node_sizes
         assembly_size_z = [f"{nz}*{core_geometry.assembly_node_size}"]
 
         assembly_div_x = [f"{nx}*1"]
         assembly_div_y = [f"{ny}*1"]
         assembly_div_z = [f"{nz}*1"]
 
-        n_planar = nz
-
-        planar_assignment = [f"{nz}*1"]
+        n_planar = len(planar_maps)
 
-        bc = KomodoBoundaryCondition.ZERO_INCOMING_CURRENT
+        planar_assignment = run_length_encode(planar_type_per_node)
 
-        boundary_conditions = KomodoBoundaries(
-            east=bc,
-            west=bc,
-            north=bc,
-            south=bc,
-            bottom=bc,
-            top=bc,
-        )
+        boundary_conditions = KomodoBoundaries.for_symmetry(core_symmetry)
 
         boundary_str_list = [
             boundary_conditions.east.value,
@@ -130,10 +181,9 @@ FILE {xsec_file_path}
         boundary_str_list = [str(b).ljust(10) for b in boundary_str_list]
         bounadry_str = "".join(boundary_str_list)
 
-        NEW_LINE = "\n"
-
-        self.komodo_input_parts.append(
-            f"""\
+        def write_geom(f: TextIO):
+            f.write(
+                f"""\
 ! Geometry control card
 %GEOM
 {nx} {ny} {nz}
@@ -145,13 +195,160 @@ FILE {xsec_file_path}
 {" ".join(map(str, assembly_div_z))}
 {n_planar}
 {" ".join(map(str, planar_assignment))}
-{NEW_LINE.join([self._get_material_map(material_map, material_map_idx) for material_map_idx, material_map in enumerate(material_maps)])}
+"""
+            )
+            for planar_map_idx, planar_map in enumerate(planar_maps):
+                self._write_material_map(f, planar_map, planar_map_idx + 1)
+            f.write(
+                f"""\
 ! Boundary conditions
 ! 0 = zero-flux
 ! 1 = zero-incoming current
 ! 2 = reflective
 ! (east),   (west),  (north),  (south),   (bottom), (top)
   {bounadry_str}
+"""
+            )
+
+        self.komodo_input_parts.append(write_geom)
+
+    def _format_xsec_changes(self, xsec_changes: np.ndarray) -> str:
+        """Format [n_materials, n_groups, 4 + n_groups] changes of (sigtr, siga, nu*sigf, sigf, sigs)"""
+        xsec_changes = np.asarray(xsec_changes, dtype=float)
+        n_groups = xsec_changes.shape[1]
+        assert (
+            xsec_changes.shape[2] == 4 + n_groups
+        ), f"Cross section changes must be [n_materials, n_groups, 4 + n_groups] ({xsec_changes.shape=})"
+        lines = []
+        for material_idx, material_changes in enumerate(xsec_changes):
+            for group_idx, row in enumerate(material_changes):
+                line = " ".join(f"{value:.6e}" for value in row)
+                if group_idx == n_groups - 1:
+                    line = f"{line} ! MAT {material_idx + 1}"
+                lines.append(line)
+        return "\n".join(lines)
+
+    def set_bcon(
+        self,
+        boron_concentration: float,
+        reference_boron_concentration: float,
+        xsec_changes: np.ndarray,
+    ):
+        """Boron concentration card
+
+        The cross section changes are per ppm of boron from the reference concentration. In the
+        BCSEARCH mode, KOMODO searches the critical boron concentration starting from
+        `boron_concentration`.
+        """
+        self.komodo_input_parts.append(
+            f"""\
+! Boron concentration card
+%BCON
+! Boron concentration (ppm), reference boron concentration (ppm)
+{boron_concentration} {reference_boron_concentration}
+! Cross section changes per ppm: sigtr, siga, nu*sigf, sigf, sigs
+{self._format_xsec_changes(xsec_changes)}
+"""
+        )
+
+    def set_crod(
+        self,
+        core_geometry: CoreGeometry,
+        bank_map: np.ndarray,
+        bank_positions: list[float],
+        zero_step_position: float,
+        step_size: float,
+        max_steps: int,
+        xsec_changes: np.ndarray,
+        core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+        insert_from_bottom: bool = True,
+    ):
+        """Control rod card
+
+        Parameters
+        ----------
+        core_geometry : CoreGeometry
+            The core geometry
+        bank_map : np.ndarray
+            Control rod bank of each assembly as [ny, nx], 0 for assemblies without a rod
+        bank_positions : list[float]
+            Position of each bank in steps withdrawn
+        zero_step_position : float
+            Position of the rod tips at step 0 [cm]
+        step_size : float
+            Length of a step [cm]
+        max_steps : int
+            Number of steps of a fully withdrawn bank
+        xsec_changes : np.ndarray
+            Cross section changes of the rodded materials, as for `set_bcon`
+        core_symmetry : CoreSymmetry, optional
+            The symmetry of the geometry card
+        insert_from_bottom : bool, optional
+            Rods are inserted from the bottom (BWR) or from the top (PWR)
+        """
+        n_banks = len(bank_positions)
+        bank_map = np.asarray(
+            core_geometry.reduce_map(np.asarray(bank_map), get_cartesian_symmetry(core_symmetry)),
+            dtype=int,
+        )
+        assert (
+            bank_map.max() <= n_banks
+        ), f"Bank map must use the banks that have positions ({bank_map.max()=}, {n_banks=})"
+        for bank_idx, bank_position in enumerate(bank_positions):
+            assert (
+                0 <= bank_position <= max_steps
+            ), f"Bank positions must be within the steps ({bank_idx=}, {bank_position=}, {max_steps=})"
+
+        bank_map_str = "\n".join(" ".join(map(str, row)) for row in bank_map)
+        self.komodo_input_parts.append(
+            f"""\
+! Control rod card
+%CROD
+! Number of control rod banks, number of steps
+{n_banks} {max_steps}
+! Zero step position (cm), step size (cm)
+{zero_step_position} {step_size}
+! Control rod bank positions (steps withdrawn)
+{" ".join(map(str, bank_positions))}
+! Control rod bank map
+{bank_map_str}
+! Control rod insertion (1 = from the top, 2 = from the bottom)
+{2 if insert_from_bottom else 1}
+! Cross section changes of rodded materials: sigtr, siga, nu*sigf, sigf, sigs
+{self._format_xsec_changes(xsec_changes)}
+"""
+        )
+
+    def set_ejct(
+        self,
+        final_bank_positions: list[float],
+        move_start_times: list[float],
+        move_speeds: list[float],
+        total_time: float,
+        time_step: float,
+        time_step_switch: float,
+        second_time_step: float,
+    ):
+        """Rod ejection card of the RODEJECT mode, used with `set_crod`
+
+        Each bank moves from its `set_crod` position to its final position (steps withdrawn) with
+        its speed (steps/s) from its start time (s).
+        """
+        assert (
+            len(final_bank_positions) == len(move_start_times) == len(move_speeds)
+        ), "Every bank must have a final position, start time and speed"
+        self.komodo_input_parts.append(
+            f"""\
+! Rod ejection card
+%EJCT
+! Final bank positions (steps withdrawn)
+{" ".join(map(str, final_bank_positions))}
+! Bank move start times (s)
+{" ".join(map(str, move_start_times))}
+! Bank move speeds (steps/s)
+{" ".join(map(str, move_speeds))}
+! Total time (s), time step (s), time the second time step starts (s), second time step (s)
+{total_time} {time_step} {time_step_switch} {second_time_step}
 """
         )
 
@@ -190,5 +387,20 @@ FILE {xsec_file_path}
 """
         )
 
+    def write_to(self, f: TextIO):
+        for part_idx, part in enumerate(self.komodo_input_parts):
+            if part_idx > 0:
+                f.write("\n")
+            if isinstance(part, str):
+                f.write(part)
+            else:
+                part(f)
+
+    def write(self, file_path: str):
+        with open(file_path, "w") as f:
+            self.write_to(f)
+
     def build(self):
-        return "\n".join(self.komodo_input_parts)
+        f = io.StringIO()
+        self.write_to(f)
+        return f.getvalue()
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+
+from cn.core.komodo.komodo_parser import KomodoOutput
+from cn.log import logger
+
+CACHE_FILE_SUFFIX = ".pkl"
+# Part of every key, bump it when KomodoOutput or the parsing changes so stale entries are missed
+CACHE_FORMAT_VERSION = "1"
+
+
+def get_hashable_komodo_input(komodo_input: str) -> tuple[str, list[str]]:
+    """Split a KOMODO input into the text that determines the solution and its XSEC files
+
+    The case card only names the case and the XSEC file is referenced by path, so the case card
+    and the XSEC paths are left out of the text. The XSEC file contents are hashed instead.
+
+    Returns
+    -------
+    tuple[str, list[str]]
+        The input text without the case card and XSEC paths, and the XSEC paths
+    """
+    lines = komodo_input.splitlines()
+    hashable_lines = []
+    xsec_paths = []
+
+    line_idx = 0
+    while line_idx < len(lines):
+        line = lines[line_idx]
+        card = line.strip().upper()
+        if card == "%CASE":
+            # Case name and description
+            line_idx += 3
+            continue
+        if card == "%XSEC" and line_idx + 1 < len(lines):
+            xsec_line = lines[line_idx + 1].split()
+            if len(xsec_line) == 2 and xsec_line[0].upper() == "FILE":
+                xsec_paths.append(xsec_line[1])
+                hashable_lines.append(card)
+                line_idx += 2
+                continue
+        hashable_lines.append(line)
+        line_idx += 1
+
+    return "\n".join(hashable_lines), xsec_paths
+
+
+@dataclass
+class KomodoCache:
+    """On-disk cache of parsed KOMODO outputs, keyed on the content of the input
+
+    Entries are evicted least recently used first when the cache grows beyond `max_entries` or
+    `max_bytes`.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory to store the cache entries in
+    max_entries : int, optional
+        Maximum number of entries
+    max_bytes : int, optional
+        Maximum total size of the entries [bytes]
+    """
+
+    cache_dir: str
+    max_entries: int | None = None
+    max_bytes: int | None = None
+    # XSEC file hashes, keyed on (path, modification time, size)
+    _xsec_hashes: dict[tuple[str, float, int], str] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        assert self.max_entries is None or self.max_entries > 0, "Max entries must be positive."
+        assert self.max_bytes is None or self.max_bytes > 0, "Max bytes must be positive."
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_xsec_hash(self, xsec_path: str) -> str:
+        stat = os.stat(xsec_path)
+        xsec_key = (os.path.abspath(xsec_path), stat.st_mtime, stat.st_size)
+        if xsec_key not in self._xsec_hashes:
+            with open(xsec_path, "rb") as f:
+                self._xsec_hashes[xsec_key] = hashlib.sha256(f.read()).hexdigest()
+        return self._xsec_hashes[xsec_key]
+
+    def get_key(self, komodo_input: str) -> str:
+        hashable_input, xsec_paths = get_hashable_komodo_input(komodo_input)
+        input_hash = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}\n".encode("utf-8"))
+        input_hash.update(hashable_input.encode("utf-8"))
+        for xsec_path in xsec_paths:
+            input_hash.update(self._get_xsec_hash(xsec_path).encode("utf-8"))
+        return input_hash.hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_FILE_SUFFIX}")
+
+    def get(self, komodo_input: str) -> KomodoOutput | None:
+        entry_path = self._get_entry_path(self.get_key(komodo_input))
+        try:
+            with open(entry_path, "rb") as f:
+                komodo_output = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.warning(f"Removing unreadable KOMODO cache entry '{entry_path}': {e!r}")
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            return None
+
+        # Mark the entry as recently used
+        os.utime(entry_path)
+        logger.debug(f"KOMODO cache hit: '{entry_path}'")
+
+        return komodo_output
+
+    def put(self, komodo_input: str, komodo_output: KomodoOutput):
+        entry_path = self._get_entry_path(self.get_key(komodo_input))
+
+        # Write to a temporary file first, so that concurrent readers never see partial entries
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            pickle.dump(komodo_output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, entry_path)
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry_name in os.listdir(self.cache_dir):
+            if not entry_name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            entry_path = os.path.join(self.cache_dir, entry_name)
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        # Most recently used first
+        entries.sort(reverse=True)
+
+        total_bytes = 0
+        for entry_idx, (_, size, entry_path) in enumerate(entries):
+            total_bytes += size
+            too_many = self.max_entries is not None and entry_idx >= self.max_entries
+            too_large = self.max_bytes is not None and total_bytes > self.max_bytes
+            if too_many or too_large:
+                logger.debug(f"Evicting KOMODO cache entry '{entry_path}'")
+                try:
+                    os.remove(entry_path)
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        for entry_name in os.listdir(self.cache_dir):
+            if entry_name.endswith(CACHE_FILE_SUFFIX):
+                os.remove(os.path.join(self.cache_dir, entry_name))
@@ -1,39 +1,196 @@
+import glob
+import os
 import re
+from dataclasses import dataclass, field
 
 import numpy as np
 
-from cn.core.core_models import CoreGeometry
+from cn.core.core_models import CoreGeometry, CoreSymmetry, get_cartesian_symmetry
+from cn.log import logger
 
+Z_BLOCK_PATTERN = re.compile(r"\s*z\s*=\s*(\d+)")
+KEFF_PATTERN = re.compile(r"K-EFF\s*\)?\s*=\s*([-+0-9.Ee]+)", re.IGNORECASE)
+ITERATION_HEADER_PATTERN = re.compile(r"^\s*itr\s+k-eff", re.IGNORECASE)
+ITERATION_PATTERN = re.compile(r"^\s*(\d+)\s+([-+0-9.Ee]+)\s+([-+0-9.Ee]+)\s+([-+0-9.Ee]+)\s*$")
+NUMERIC_LINE_PATTERN = re.compile(r"^[-+0-9.Ee\s]*\d[-+0-9.Ee\s]*$")
 
-def flatten(xss):
-    return [x for xs in xss for x in xs]
 
+@dataclass
+class KomodoOutput:
+    """Results of a KOMODO run, unfolded to the full core"""
+
+    keff: float | None
+    # Outer iterations as rows of (iteration, k-eff, fission source error, flux error)
+    iterations: np.ndarray
+    # Node-wise outputs from the `<input>_<name>.out` files as [nz, ny, nx], keyed on name
+    node_maps: dict[str, np.ndarray] = field(default_factory=dict)
+    # Other numeric outputs from the `<input>_<name>.out` files, flattened in file order
+    other_outputs: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def power_3d(self) -> np.ndarray:
+        return self.node_maps["3d_power"]
+
+
+def _get_assembly_mask(core_geometry: CoreGeometry, cartesian_symmetry: CoreSymmetry):
+    return (
+        core_geometry.reduce_map(
+            core_geometry.get_core_map(fill_value=1, empty_value=0), cartesian_symmetry
+        )
+        != 0
+    )
+
+
+def read_komodo_node_map(
+    core_geometry: CoreGeometry,
+    komodo_out_path: str,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+) -> np.ndarray | None:
+    """Read a node-wise KOMODO output, written as one block per axial node
+
+    The file is streamed once and all values are converted in bulk. Returns None if the file has
+    no z-blocks, and raises a ValueError if the blocks do not match the core geometry (e.g. a
+    flux output with one block per group and axial node).
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry of the KOMODO input
+    komodo_out_path : str
+        Path to the output file
+    core_symmetry : CoreSymmetry, optional
+        The symmetry the KOMODO input was built with
+
+    Returns
+    -------
+    np.ndarray | None
+        The values as [nz, ny, nx], unfolded to the full core, with 0 outside the core
+    """
+    cartesian_symmetry = get_cartesian_symmetry(core_symmetry)
+    sz = core_geometry.get_reduced_size(cartesian_symmetry)
+
+    n_blocks = 0
+    block_values: list[str] = []
+
+    with open(komodo_out_path, "r") as f:
+        for line in f:
+            if not Z_BLOCK_PATTERN.match(line):
+                continue
+            n_blocks += 1
+            try:
+                next(f)  # Column header
+                for _ in range(sz):
+                    # Drop the row label
+                    block_values.extend(next(f).split()[1:])
+            except StopIteration:
+                raise ValueError(f"Block {n_blocks} in '{komodo_out_path}' is truncated")
+
+    if n_blocks == 0:
+        return None
 
-def komodo_out_3d_power_map(core_geometry: CoreGeometry, komodo_out_path: str):
     nz = core_geometry.axial_nodes
-    sz = core_geometry.core_size
+    if n_blocks != nz:
+        raise ValueError(f"Number of data_blocks must match nz ({n_blocks=}, {nz=})")
+
+    assembly_mask = _get_assembly_mask(core_geometry, cartesian_symmetry)
+    values = np.array(block_values, dtype=float)
+    if values.size != nz * np.count_nonzero(assembly_mask):
+        raise ValueError(
+            f"Number of values must match assembly count ({values.size=}, {nz=}, {np.count_nonzero(assembly_mask)=})"
+        )
 
+    reduced_maps = np.zeros((nz, sz, sz))
+    reduced_maps[:, assembly_mask] = values.reshape(nz, -1)
+
+    return core_geometry.unfold_map(reduced_maps, cartesian_symmetry)
+
+
+def read_komodo_main_output(komodo_out_path: str) -> tuple[float | None, np.ndarray]:
+    """Read k-eff and the outer iteration history from the main KOMODO output"""
+    keff = None
+    iteration_lines: list[str] = []
+    in_iterations = False
+
+    with open(komodo_out_path, "r") as f:
+        for line in f:
+            keff_match = KEFF_PATTERN.search(line)
+            if keff_match:
+                keff = float(keff_match.group(1))
+            if ITERATION_HEADER_PATTERN.match(line):
+                in_iterations = True
+                continue
+            if in_iterations:
+                if ITERATION_PATTERN.match(line):
+                    iteration_lines.append(line)
+                elif line.strip() and not line.strip().startswith("-"):
+                    in_iterations = False
+
+    iterations = np.array(" ".join(iteration_lines).split(), dtype=float).reshape(-1, 4)
+
+    if keff is None and len(iterations):
+        keff = float(iterations[-1, 1])
+
+    return keff, iterations
+
+
+def _read_numeric_values(komodo_out_path: str) -> np.ndarray:
+    values: list[str] = []
     with open(komodo_out_path, "r") as f:
-        lines = f.readlines()
+        for line in f:
+            if NUMERIC_LINE_PATTERN.match(line):
+                values.extend(line.split())
+    return np.array(values, dtype=float)
+
+
+def read_komodo_output(
+    core_geometry: CoreGeometry,
+    komodo_input_path: str,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+) -> KomodoOutput:
+    """Read all outputs KOMODO wrote for an input into one result
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry of the KOMODO input
+    komodo_input_path : str
+        Path to the KOMODO input, the outputs are found next to it
+    core_symmetry : CoreSymmetry, optional
+        The symmetry the KOMODO input was built with
+
+    Returns
+    -------
+    KomodoOutput
+        The parsed outputs
+    """
+    keff, iterations = None, np.zeros((0, 4))
+    if os.path.exists(f"{komodo_input_path}.out"):
+        keff, iterations = read_komodo_main_output(f"{komodo_input_path}.out")
 
-    data_blocks = []
+    komodo_output = KomodoOutput(keff=keff, iterations=iterations)
 
-    for line_idx, line in enumerate(lines):
-        z_match = re.match(r"\s*z\s*=\s*(\d+)", line)
-        if z_match:
-            data_lines = lines[line_idx + 2 : line_idx + 2 + sz]
-            data_lines = [x[8:].strip(f"\n").strip() for x in data_lines]
-            data_lines = [[float(x) for x in xs.split()] for xs in data_lines]
-            data_blocks.append(data_lines)
+    prefix = f"{komodo_input_path}_"
+    for komodo_out_path in sorted(glob.glob(f"{glob.escape(prefix)}*.out")):
+        name = komodo_out_path[len(prefix) : -len(".out")]
+        try:
+            node_map = read_komodo_node_map(core_geometry, komodo_out_path, core_symmetry)
+        except ValueError as e:
+            logger.debug(f"Reading '{komodo_out_path}' as other output: {e}")
+            node_map = None
+        if node_map is not None:
+            komodo_output.node_maps[name] = node_map
+        else:
+            komodo_output.other_outputs[name] = _read_numeric_values(komodo_out_path)
 
-    assert (
-        len(data_blocks) == nz
-    ), f"Number of data_blocks must match nz ({len(data_blocks)=}, {nz=})"
+    return komodo_output
 
-    arrays = []
 
-    for data_block in data_blocks:
-        data_for_node = flatten(data_block)
-        arrays.append(core_geometry.get_core_map(fill_value=data_for_node, empty_value=0.0))
+def komodo_out_3d_power_map(
+    core_geometry: CoreGeometry,
+    komodo_out_path: str,
+    core_symmetry: CoreSymmetry = CoreSymmetry.FULL,
+):
+    power_map = read_komodo_node_map(core_geometry, komodo_out_path, core_symmetry)
+    assert power_map is not None, f"No power data found in '{komodo_out_path}'"
 
-    return arrays
+    return list(power_map)
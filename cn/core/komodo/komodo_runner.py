@@ -0,0 +1,178 @@
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum, auto
+
+from cn.log import logger
+from cn.utils.resources import ResourceSampler, ResourceUsage
+
+KOMODO_EXIT_NORMALLY = "KOMODO EXIT NORMALLY"
+# Marks working directories created by KomodoRunPool, which are the only ones it may delete
+WORK_DIR_MARKER = ".komodo_run_pool"
+# Time between resource samples of a KOMODO run [s], the runs take seconds
+RESOURCE_SAMPLE_INTERVAL = 0.1
+
+
+class KomodoRunStatus(Enum):
+    SUCCESS = auto()
+    FAILED = auto()
+    TIMEOUT = auto()
+
+
+@dataclass
+class KomodoRunResult:
+    komodo_input_path: str
+    # The copy of the input in the working directory, KOMODO writes its outputs next to it
+    run_input_path: str
+    work_dir: str
+    status: KomodoRunStatus
+    returncode: int | None
+    runtime: float
+    stdout_path: str
+    stderr_path: str
+    message: str = ""
+    # Sampled with `KomodoRunPool.sample_resources`
+    resources: ResourceUsage | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.status is KomodoRunStatus.SUCCESS
+
+
+@dataclass
+class KomodoRunPool:
+    """Run many KOMODO inputs concurrently, each in its own working directory
+
+    The solves run as subprocesses, so a thread pool is enough to keep `max_workers` of them
+    running at once.
+
+    Parameters
+    ----------
+    max_workers : int
+        Maximum number of concurrent KOMODO runs
+    timeout : float, optional
+        Timeout per run [s], after which the run is killed
+    komodo_executable : str
+        The KOMODO executable
+    work_dir : str, optional
+        Directory for the working directories of the runs. By default, each run gets a directory
+        next to its input, named after the input
+    sample_resources : bool
+        Sample the memory and CPU use of each run into its result
+    """
+
+    max_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    timeout: float | None = None
+    komodo_executable: str = "komodo"
+    work_dir: str | None = None
+    sample_resources: bool = False
+
+    def __post_init__(self):
+        assert self.max_workers > 0, "Max workers must be greater than 0."
+        assert self.timeout is None or self.timeout > 0, "Timeout must be greater than 0."
+
+    def get_work_dir(self, komodo_input_path: str) -> str:
+        input_name = os.path.splitext(os.path.basename(komodo_input_path))[0]
+        if self.work_dir is None:
+            return os.path.join(os.path.dirname(komodo_input_path), input_name)
+        return os.path.join(self.work_dir, input_name)
+
+    def run_one(self, komodo_input_path: str) -> KomodoRunResult:
+        work_dir = self.get_work_dir(komodo_input_path)
+        if os.path.exists(work_dir):
+            if os.path.exists(os.path.join(work_dir, WORK_DIR_MARKER)):
+                shutil.rmtree(work_dir)
+            elif os.listdir(work_dir):
+                raise FileExistsError(
+                    f"Working directory '{work_dir}' exists and was not created by KomodoRunPool, refusing to delete it"
+                )
+        os.makedirs(work_dir, exist_ok=True)
+        open(os.path.join(work_dir, WORK_DIR_MARKER), "w").close()
+
+        run_input_path = os.path.join(work_dir, os.path.basename(komodo_input_path))
+        shutil.copyfile(komodo_input_path, run_input_path)
+
+        stdout_path = os.path.join(work_dir, "komodo.stdout")
+        stderr_path = os.path.join(work_dir, "komodo.stderr")
+
+        returncode = None
+        resources = None
+        start_time = time.perf_counter()
+        with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+            try:
+                with subprocess.Popen(
+                    [self.komodo_executable, os.path.basename(run_input_path)],
+                    cwd=work_dir,
+                    stdout=stdout,
+                    stderr=stderr,
+                ) as p:
+                    sampler = None
+                    if self.sample_resources:
+                        sampler = ResourceSampler(p.pid, RESOURCE_SAMPLE_INTERVAL).start()
+                    try:
+                        returncode = p.wait(timeout=self.timeout)
+                    except subprocess.TimeoutExpired:
+                        p.kill()
+                        p.wait()
+                        raise
+                    finally:
+                        if sampler is not None:
+                            resources = sampler.stop()
+            except subprocess.TimeoutExpired:
+                status = KomodoRunStatus.TIMEOUT
+                message = f"KOMODO was killed after {self.timeout} s"
+            except OSError as e:
+                status = KomodoRunStatus.FAILED
+                message = f"KOMODO could not be started: {e}"
+        runtime = time.perf_counter() - start_time
+
+        if returncode is not None:
+            with open(stdout_path, "r") as f:
+                exited_normally = KOMODO_EXIT_NORMALLY in f.read()
+            if returncode == 0 and exited_normally:
+                status = KomodoRunStatus.SUCCESS
+                message = ""
+            else:
+                status = KomodoRunStatus.FAILED
+                message = f"KOMODO did not exit properly ({returncode=}, see '{stdout_path}' and '{stderr_path}')"
+
+        result = KomodoRunResult(
+            komodo_input_path=komodo_input_path,
+            run_input_path=run_input_path,
+            work_dir=work_dir,
+            status=status,
+            returncode=returncode,
+            runtime=runtime,
+            stdout_path=stdout_path,
+            stderr_path=stderr_path,
+            message=message,
+            resources=resources,
+        )
+
+        if result.success:
+            logger.debug(f"KOMODO run of '{komodo_input_path}' finished in {runtime:.2f} s")
+        else:
+            logger.warning(f"KOMODO run of '{komodo_input_path}' {status.name}: {message}")
+
+        return result
+
+    def run(self, komodo_input_paths: list[str]) -> list[KomodoRunResult]:
+        """Run the inputs and return the results in the order of the inputs"""
+        work_dirs = [self.get_work_dir(path) for path in komodo_input_paths]
+        assert len(set(work_dirs)) == len(
+            work_dirs
+        ), "Inputs must have unique names to get separate working directories"
+
+        logger.info(
+            f"Running {len(komodo_input_paths)} KOMODO inputs with {self.max_workers} workers"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.run_one, komodo_input_paths))
+
+        n_success = sum(result.success for result in results)
+        logger.info(f"{n_success} of {len(results)} KOMODO runs succeeded")
+
+        return results
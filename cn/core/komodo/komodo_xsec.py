@@ -0,0 +1,126 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+XSEC_COLUMNS = ["sigtr", "siga", "nu*sigf", "sigf", "chi"]
+# Decimals of the values in the XSEC file
+XSEC_DECIMALS = 6
+
+
+@dataclass
+class KomodoXsec:
+    """Macroscopic cross sections in the format of the `komodo_XSEC.txt` file
+
+    All arrays are indexed by material (0-based, i.e. KOMODO material number - 1) and group.
+    """
+
+    sigtr: np.ndarray  # [n_materials, n_groups]
+    siga: np.ndarray  # [n_materials, n_groups]
+    nu_sigf: np.ndarray  # [n_materials, n_groups]
+    sigf: np.ndarray  # [n_materials, n_groups]
+    chi: np.ndarray  # [n_materials, n_groups]
+    sigs: np.ndarray  # [n_materials, n_groups (from), n_groups (to)]
+    material_comments: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        n_materials, n_groups = self.sigtr.shape
+        for name in ["siga", "nu_sigf", "sigf", "chi"]:
+            assert getattr(self, name).shape == (
+                n_materials,
+                n_groups,
+            ), f"{name} must be [n_materials, n_groups] ({getattr(self, name).shape=}, {n_materials=}, {n_groups=})"
+        assert self.sigs.shape == (
+            n_materials,
+            n_groups,
+            n_groups,
+        ), f"sigs must be [n_materials, n_groups, n_groups] ({self.sigs.shape=}, {n_materials=}, {n_groups=})"
+
+    @property
+    def n_materials(self) -> int:
+        return self.sigtr.shape[0]
+
+    @property
+    def n_groups(self) -> int:
+        return self.sigtr.shape[1]
+
+    def get_diffusion_coefficient(self) -> np.ndarray:
+        return 1 / (3 * self.sigtr)
+
+    def get_sigr(self) -> np.ndarray:
+        """Removal cross section, absorption plus out-scattering"""
+        out_scattering = self.sigs.sum(axis=2) - np.diagonal(self.sigs, axis1=1, axis2=2)
+        return self.siga + out_scattering
+
+    def to_table(self) -> np.ndarray:
+        """Get the cross sections as the rows of the XSEC file, [n_materials, n_groups, 5 + n_groups]"""
+        return np.concatenate(
+            [
+                np.stack([self.sigtr, self.siga, self.nu_sigf, self.sigf, self.chi], axis=-1),
+                self.sigs,
+            ],
+            axis=-1,
+        )
+
+    @classmethod
+    def from_table(cls, table: np.ndarray, material_comments: list[str] | None = None):
+        """Inverse of `to_table`"""
+        return cls(
+            sigtr=table[..., 0],
+            siga=table[..., 1],
+            nu_sigf=table[..., 2],
+            sigf=table[..., 3],
+            chi=table[..., 4],
+            sigs=table[..., 5:],
+            material_comments=material_comments or [],
+        )
+
+    @classmethod
+    def read(cls, xsec_path: str):
+        values: list[str] = []
+        material_comments: list[str] = []
+        with open(xsec_path, "r") as f:
+            for line in f:
+                data, _, comment = line.partition("!")
+                tokens = data.split()
+                if not tokens:
+                    continue
+                if values and comment.strip():
+                    material_comments.append(comment.strip())
+                values.extend(tokens)
+
+        n_groups, n_materials = int(values[0]), int(values[1])
+        table = np.array(values[2:], dtype=float)
+        assert table.size == n_materials * n_groups * (
+            5 + n_groups
+        ), f"Number of values must match the number of materials and groups ({table.size=}, {n_materials=}, {n_groups=})"
+
+        return cls.from_table(table.reshape(n_materials, n_groups, 5 + n_groups), material_comments)
+
+    def write(self, xsec_path: str):
+        xsec_dirname = os.path.dirname(xsec_path)
+        if xsec_dirname:
+            os.makedirs(xsec_dirname, exist_ok=True)
+
+        columns = XSEC_COLUMNS + [f"sigs_g{group + 1}" for group in range(self.n_groups)]
+        table = self.to_table()
+
+        with open(xsec_path, "w") as f:
+            f.write(
+                f"""\
+{self.n_groups}  {self.n_materials}    ! Number of groups and number of materials
+! {"    ".join(columns)}
+"""
+            )
+            for material_idx in range(self.n_materials):
+                lines = [
+                    " ".join(f"{value:.{XSEC_DECIMALS}f}" for value in row)
+                    for row in table[material_idx]
+                ]
+                comment = (
+                    self.material_comments[material_idx]
+                    if material_idx < len(self.material_comments)
+                    else f"MAT {material_idx + 1}"
+                )
+                lines[-1] = f"{lines[-1]} ! {comment}"
+                f.write("\n".join(lines) + "\n")
@@ -0,0 +1,313 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry
+from cn.core.komodo.komodo_xsec import XSEC_DECIMALS, KomodoXsec
+from cn.log import logger
+
+# Material comment written by `get_komodo_XSEC`
+MATERIAL_COMMENT_PATTERN = re.compile(
+    r"MAT\s+\d+:\s*([-+0-9.Ee]+)\s+void,\s*exposure:\s*([-+0-9.Ee]+)", re.IGNORECASE
+)
+
+
+def _get_interpolation_indices(grid: np.ndarray, values: np.ndarray):
+    """Lower grid index and weight of the upper grid point, values outside the grid are clamped"""
+    values = np.clip(values, grid[0], grid[-1])
+    lower = np.clip(np.searchsorted(grid, values, side="right") - 1, 0, max(len(grid) - 2, 0))
+    upper = np.minimum(lower + 1, len(grid) - 1)
+    spacing = grid[upper] - grid[lower]
+    weight = np.divide(values - grid[lower], spacing, out=np.zeros_like(values), where=spacing > 0)
+    return lower, upper, weight
+
+
+@dataclass
+class KomodoXsecLibrary:
+    """Cross sections of a fuel on a (void, exposure) grid, as rows of the XSEC file
+
+    Parameters
+    ----------
+    voids : np.ndarray
+        Void fractions of the grid, ascending
+    exposures : np.ndarray
+        Exposures of the grid, ascending
+    table : np.ndarray
+        Cross sections as [n_voids, n_exposures, n_groups, 5 + n_groups], in the layout of
+        `KomodoXsec.to_table`
+    """
+
+    voids: np.ndarray
+    exposures: np.ndarray
+    table: np.ndarray
+
+    def __post_init__(self):
+        self.voids = np.asarray(self.voids, dtype=float)
+        self.exposures = np.asarray(self.exposures, dtype=float)
+        assert np.all(np.diff(self.voids) > 0), "Voids must be ascending."
+        assert np.all(np.diff(self.exposures) > 0), "Exposures must be ascending."
+        assert self.table.shape[:2] == (
+            len(self.voids),
+            len(self.exposures),
+        ), f"Table must be [n_voids, n_exposures, ...] ({self.table.shape=}, {len(self.voids)=}, {len(self.exposures)=})"
+        assert (
+            self.table.shape[3] == 5 + self.table.shape[2]
+        ), f"Table rows must have 5 + n_groups values ({self.table.shape=})"
+
+    @property
+    def n_groups(self) -> int:
+        return self.table.shape[2]
+
+    @classmethod
+    def from_xsec(cls, xsec: KomodoXsec):
+        """Build the library from an XSEC file written by `get_komodo_XSEC`
+
+        The void and exposure of each material are read from the material comments, and the
+        materials must cover every (void, exposure) combination.
+        """
+        states = []
+        for material_idx, comment in enumerate(xsec.material_comments):
+            match = MATERIAL_COMMENT_PATTERN.search(comment)
+            assert match, f"Material comment has no void and exposure ({material_idx=}, {comment=})"
+            states.append((float(match.group(1)), float(match.group(2))))
+        assert (
+            len(states) == xsec.n_materials
+        ), f"Every material must have a comment ({len(states)=}, {xsec.n_materials=})"
+
+        voids = np.unique([void for void, _ in states])
+        exposures = np.unique([exposure for _, exposure in states])
+        assert (
+            len(set(states)) == len(states) == len(voids) * len(exposures)
+        ), f"Materials must cover a (void, exposure) grid once ({len(states)=}, {len(voids)=}, {len(exposures)=})"
+
+        xsec_table = xsec.to_table()
+        table = np.zeros((len(voids), len(exposures), *xsec_table.shape[1:]))
+        for material_idx, (void, exposure) in enumerate(states):
+            table[np.searchsorted(voids, void), np.searchsorted(exposures, exposure)] = xsec_table[
+                material_idx
+            ]
+
+        return cls(voids, exposures, table)
+
+    def interpolate(self, void: np.ndarray, exposure: np.ndarray) -> np.ndarray:
+        """Bilinear interpolation of the cross sections, clamped to the grid
+
+        Parameters
+        ----------
+        void : np.ndarray
+            Void fractions of any shape
+        exposure : np.ndarray
+            Exposures, broadcastable to the shape of `void`
+
+        Returns
+        -------
+        np.ndarray
+            The cross sections as [..., n_groups, 5 + n_groups]
+        """
+        void, exposure = np.broadcast_arrays(
+            np.asarray(void, dtype=float), np.asarray(exposure, dtype=float)
+        )
+        void_lower, void_upper, void_weight = _get_interpolation_indices(self.voids, void)
+        exposure_lower, exposure_upper, exposure_weight = _get_interpolation_indices(
+            self.exposures, exposure
+        )
+        void_weight = void_weight[..., None, None]
+        exposure_weight = exposure_weight[..., None, None]
+
+        return (1 - void_weight) * (
+            (1 - exposure_weight) * self.table[void_lower, exposure_lower]
+            + exposure_weight * self.table[void_lower, exposure_upper]
+        ) + void_weight * (
+            (1 - exposure_weight) * self.table[void_upper, exposure_lower]
+            + exposure_weight * self.table[void_upper, exposure_upper]
+        )
+
+    def get_node_xsec(
+        self, core_geometry: CoreGeometry, void: np.ndarray, exposure: np.ndarray
+    ) -> tuple[KomodoXsec, list[np.ndarray]]:
+        """Interpolate the cross sections of every node of the core
+
+        Nodes with the same cross sections (to the precision of the XSEC file) share a material,
+        so symmetric cores keep symmetric material maps.
+
+        Parameters
+        ----------
+        core_geometry : CoreGeometry
+            The core geometry
+        void : np.ndarray
+            Void fraction of each node as [nz, ny, nx]
+        exposure : np.ndarray
+            Exposure of each node as [nz, ny, nx]
+
+        Returns
+        -------
+        tuple[KomodoXsec, list[np.ndarray]]
+            The XSEC with one material per unique node state, and the material maps for
+            `KomodoInputBuilder.set_geom`
+        """
+        shape = (core_geometry.axial_nodes, core_geometry.core_size, core_geometry.core_size)
+        assert (
+            np.shape(void) == np.shape(exposure) == shape
+        ), f"Void and exposure must be [nz, ny, nx] ({np.shape(void)=}, {np.shape(exposure)=}, {shape=})"
+
+        assembly_mask = np.broadcast_to(
+            core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool), shape
+        )
+        # States that are equal in the XSEC file share a material
+        node_table = np.round(
+            self.interpolate(void[assembly_mask], exposure[assembly_mask]), XSEC_DECIMALS
+        )
+
+        unique_table, first_nodes, node_materials = np.unique(
+            node_table.reshape(len(node_table), -1), axis=0, return_index=True, return_inverse=True
+        )
+        material_comments = [
+            f"void: {void[assembly_mask][node]:.4f}, exposure: {exposure[assembly_mask][node]:.4f}"
+            for node in first_nodes
+        ]
+        xsec = KomodoXsec.from_table(
+            unique_table.reshape(len(unique_table), *node_table.shape[1:]), material_comments
+        )
+
+        material_map_3d = np.zeros(shape, dtype=int)
+        material_map_3d[assembly_mask] = node_materials.ravel() + 1
+
+        return xsec, list(material_map_3d)
+
+
+def _get_node_table(
+    core_geometry: CoreGeometry,
+    libraries: list[KomodoXsecLibrary],
+    segment: np.ndarray,
+    void: np.ndarray,
+    exposure: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolate the cross sections of the nodes in the core, from the library of their segment"""
+    shape = (core_geometry.axial_nodes, core_geometry.core_size, core_geometry.core_size)
+    assert (
+        np.shape(segment) == np.shape(void) == np.shape(exposure) == shape
+    ), f"Segment, void and exposure must be [nz, ny, nx] ({np.shape(segment)=}, {np.shape(void)=}, {np.shape(exposure)=}, {shape=})"
+
+    assembly_mask = np.broadcast_to(
+        core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool), shape
+    )
+    node_segment = np.asarray(segment)[assembly_mask]
+    assert node_segment.min() >= 0 and node_segment.max() < len(
+        libraries
+    ), f"Segments must index the libraries ({node_segment.min()=}, {node_segment.max()=}, {len(libraries)=})"
+
+    n_groups = libraries[0].n_groups
+    assert all(
+        library.n_groups == n_groups for library in libraries
+    ), "Libraries must have the same number of groups"
+
+    node_table = np.zeros((len(node_segment), n_groups, 5 + n_groups))
+    for segment_idx, library in enumerate(libraries):
+        in_segment = node_segment == segment_idx
+        node_table[in_segment] = library.interpolate(
+            void[assembly_mask][in_segment], exposure[assembly_mask][in_segment]
+        )
+
+    return node_table, assembly_mask
+
+
+def _group_within_tolerance(values: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray]:
+    """Greedily group the rows of `values` around leader rows, within `tolerance` in every column
+
+    Returns the leader row of each group and the group of each row.
+    """
+    groups = np.full(len(values), -1)
+    leaders = []
+    while True:
+        ungrouped = np.flatnonzero(groups < 0)
+        if len(ungrouped) == 0:
+            break
+        leader = ungrouped[0]
+        within = np.abs(values[ungrouped] - values[leader]).max(axis=1) <= tolerance
+        groups[ungrouped[within]] = len(leaders)
+        leaders.append(leader)
+
+    return np.array(leaders, dtype=int), groups
+
+
+def quantize_node_xsec(
+    core_geometry: CoreGeometry,
+    libraries: list[KomodoXsecLibrary],
+    segment: np.ndarray,
+    void: np.ndarray,
+    exposure: np.ndarray,
+    xs_tolerance: float = 1.0e-3,
+    max_materials: int | None = None,
+) -> tuple[KomodoXsec, list[np.ndarray]]:
+    """Group the node states of the core into a bounded number of materials
+
+    Each cross section is scaled by its largest value in the core. The first node that is not
+    grouped yet becomes the material of all other nodes within `xs_tolerance` of it, until all
+    nodes are grouped. No cross section of a node is then more than `xs_tolerance` (relative to the
+    largest value in the core) from its material. If there are more than `max_materials`
+    materials, the tolerance is doubled until there are not.
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry
+    libraries : list[KomodoXsecLibrary]
+        The library of each fuel segment
+    segment : np.ndarray
+        Index of the library of each node as [nz, ny, nx]
+    void : np.ndarray
+        Void fraction of each node as [nz, ny, nx]
+    exposure : np.ndarray
+        Exposure of each node as [nz, ny, nx]
+    xs_tolerance : float, optional
+        Relative tolerance of the cross sections of the nodes
+    max_materials : int, optional
+        Maximum number of materials
+
+    Returns
+    -------
+    tuple[KomodoXsec, list[np.ndarray]]
+        The XSEC with one material per group of node states, and the material maps for
+        `KomodoInputBuilder.set_geom`
+    """
+    assert xs_tolerance > 0, "XS tolerance must be greater than 0."
+    assert max_materials is None or max_materials > 0, "Max materials must be greater than 0."
+
+    node_table, assembly_mask = _get_node_table(core_geometry, libraries, segment, void, exposure)
+    node_values = node_table.reshape(len(node_table), -1)
+    scale = np.abs(node_values).max(axis=0)
+    scaled_values = np.divide(node_values, scale, out=np.zeros_like(node_values), where=scale > 0)
+
+    tolerance = xs_tolerance
+    while True:
+        leaders, node_materials = _group_within_tolerance(scaled_values, tolerance)
+        if max_materials is None or len(leaders) <= max_materials:
+            break
+        tolerance *= 2
+
+    if tolerance != xs_tolerance:
+        logger.warning(
+            f"Increased the XS tolerance from {xs_tolerance} to {tolerance} to keep the materials below {max_materials=}"
+        )
+
+    n_materials = len(leaders)
+    counts = np.bincount(node_materials, minlength=n_materials)
+    material_values = node_values[leaders]
+
+    material_void = np.bincount(node_materials, void[assembly_mask]) / counts
+    material_exposure = np.bincount(node_materials, exposure[assembly_mask]) / counts
+    material_comments = [
+        f"{count} nodes, void: {material_void:.4f}, exposure: {material_exposure:.4f}"
+        for count, material_void, material_exposure in zip(counts, material_void, material_exposure)
+    ]
+    xsec = KomodoXsec.from_table(
+        material_values.reshape(n_materials, *node_table.shape[1:]), material_comments
+    )
+
+    material_map_3d = np.zeros(assembly_mask.shape, dtype=int)
+    material_map_3d[assembly_mask] = node_materials + 1
+
+    logger.debug(f"Quantized {len(node_table)} node states into {n_materials} materials")
+
+    return xsec, list(material_map_3d)
@@ -0,0 +1,217 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.komodo.komodo_bwr_deplete_cycle import komodo_void_iteration, solve_komodo
+from cn.core.komodo.komodo_cache import KomodoCache
+from cn.core.komodo.komodo_parser import KomodoOutput
+from cn.log import logger
+
+# Solves the core for a loading pattern, [ny, nx] fuel types with 0 outside the core
+LoadingPatternSolver = Callable[[np.ndarray], KomodoOutput]
+
+
+@dataclass
+class LoadingPatternResult:
+    # The canonical loading pattern, see `canonicalize_loading_pattern`
+    loading_pattern: np.ndarray
+    keff: float | None
+    # Maximum node power over the average node power
+    power_peaking: float
+
+
+def get_loading_pattern(core_geometry: CoreGeometry, fuel_types: list[int]) -> np.ndarray:
+    """Get the loading pattern with the fuel types of the assemblies, row by row"""
+    return core_geometry.get_core_map(fill_value=fuel_types, empty_value=0).astype(np.int64)
+
+
+def get_symmetry_transforms(
+    core_geometry: CoreGeometry,
+) -> list[Callable[[np.ndarray], np.ndarray]]:
+    """Get the rotations and reflections of the D4 group that map the core onto itself"""
+    transforms: list[Callable[[np.ndarray], np.ndarray]] = []
+    for transpose in [False, True]:
+        for k in range(4):
+            transforms.append(
+                lambda core_map, k=k, transpose=transpose: np.rot90(
+                    core_map.T if transpose else core_map, k
+                )
+            )
+
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(int)
+    return [
+        transform
+        for transform in transforms
+        if np.array_equal(transform(assembly_mask), assembly_mask)
+    ]
+
+
+def canonicalize_loading_pattern(
+    loading_pattern: np.ndarray, transforms: list[Callable[[np.ndarray], np.ndarray]]
+) -> np.ndarray:
+    """Get the same pattern for all rotations and reflections of a loading pattern
+
+    The canonical pattern is the transformed pattern with the smallest bytes.
+    """
+    loading_pattern = np.ascontiguousarray(loading_pattern, dtype=np.int64)
+    return min(
+        (np.ascontiguousarray(transform(loading_pattern)) for transform in transforms),
+        key=lambda transformed: transformed.tobytes(),
+    )
+
+
+def get_power_peaking(core_geometry: CoreGeometry, power_3d: np.ndarray) -> float:
+    assembly_mask = np.broadcast_to(
+        core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool), np.shape(power_3d)
+    )
+    node_power = np.asarray(power_3d)[assembly_mask]
+    return float(node_power.max() / node_power.mean())
+
+
+def rank_loading_patterns(
+    results: list[LoadingPatternResult], min_keff: float | None = None
+) -> list[LoadingPatternResult]:
+    """Rank the patterns by power peaking, the patterns below `min_keff` last by k-eff"""
+
+    def is_critical(result: LoadingPatternResult) -> bool:
+        return min_keff is None or (result.keff is not None and result.keff >= min_keff)
+
+    critical = sorted(filter(is_critical, results), key=lambda result: result.power_peaking)
+    subcritical = sorted(
+        (result for result in results if not is_critical(result)),
+        key=lambda result: -np.inf if result.keff is None else result.keff,
+        reverse=True,
+    )
+    return critical + subcritical
+
+
+@dataclass
+class LoadingPatternEvaluator:
+    """Evaluate loading patterns in a worker pool, solving every distinct pattern once
+
+    Patterns are canonicalized under the rotations and reflections that map the core onto itself,
+    so symmetric duplicates share a solve. Results are cached on the evaluator, so later
+    generations of a search only solve new patterns.
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry
+    loading_pattern_solver : LoadingPatternSolver
+        Solves the core for a loading pattern, e.g. from `get_komodo_loading_pattern_solver`
+    max_workers : int, optional
+        Maximum number of concurrent solves. Threads are used, KOMODO runs in subprocesses
+    """
+
+    core_geometry: CoreGeometry
+    loading_pattern_solver: LoadingPatternSolver
+    max_workers: int = 1
+    _cache: dict[bytes, LoadingPatternResult] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        assert self.max_workers > 0, "Max workers must be greater than 0."
+        self._transforms = get_symmetry_transforms(self.core_geometry)
+
+    @property
+    def n_solved(self) -> int:
+        return len(self._cache)
+
+    def _solve(self, loading_pattern: np.ndarray) -> LoadingPatternResult:
+        komodo_output = self.loading_pattern_solver(loading_pattern)
+        result = LoadingPatternResult(
+            loading_pattern=loading_pattern,
+            keff=komodo_output.keff,
+            power_peaking=get_power_peaking(self.core_geometry, komodo_output.power_3d),
+        )
+        with self._lock:
+            self._cache[loading_pattern.tobytes()] = result
+        return result
+
+    def evaluate(self, loading_patterns: list[np.ndarray]) -> list[LoadingPatternResult]:
+        """Evaluate the loading patterns and return the results in the order of the patterns"""
+        canonical_patterns = [
+            canonicalize_loading_pattern(loading_pattern, self._transforms)
+            for loading_pattern in loading_patterns
+        ]
+
+        to_solve: dict[bytes, np.ndarray] = {}
+        for canonical_pattern in canonical_patterns:
+            key = canonical_pattern.tobytes()
+            if key not in self._cache:
+                to_solve.setdefault(key, canonical_pattern)
+
+        logger.info(
+            f"Solving {len(to_solve)} of {len(loading_patterns)} loading patterns with {self.max_workers} workers"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._solve, to_solve.values()))
+
+        return [
+            self._cache[canonical_pattern.tobytes()] for canonical_pattern in canonical_patterns
+        ]
+
+
+def get_loading_pattern_material_maps(
+    core_geometry: CoreGeometry, loading_pattern: np.ndarray, fuel_type_materials: dict[int, int]
+) -> list[np.ndarray]:
+    """Axially uniform material maps of a loading pattern, with the XSEC material of each fuel type"""
+    material_map = np.zeros_like(loading_pattern)
+    for fuel_type, material in fuel_type_materials.items():
+        material_map[loading_pattern == fuel_type] = material
+    assert np.all(
+        (material_map > 0) == (loading_pattern > 0)
+    ), f"All fuel types must have a material ({np.unique(loading_pattern)=}, {fuel_type_materials=})"
+    return [material_map] * core_geometry.axial_nodes
+
+
+def get_core_symmetry(core_geometry: CoreGeometry, loading_pattern: np.ndarray) -> CoreSymmetry:
+    """The highest symmetry of a loading pattern that the core can be solved with"""
+    for core_symmetry in [CoreSymmetry.OCTANT, CoreSymmetry.QUARTER]:
+        if core_geometry.is_symmetric(loading_pattern, core_symmetry):
+            return core_symmetry
+    return CoreSymmetry.FULL
+
+
+def get_komodo_loading_pattern_solver(
+    core_geometry: CoreGeometry,
+    xsec_path: str,
+    case_name: str,
+    fuel_type_materials: dict[int, int],
+    komodo_cache: KomodoCache | None = None,
+    timeout: float | None = None,
+) -> LoadingPatternSolver:
+    """Get a `LoadingPatternSolver` that solves each pattern with KOMODO
+
+    Each pattern is written with `komodo_void_iteration` to a case of its own, named after the hash
+    of the pattern, and solved with the highest symmetry it has.
+    """
+
+    def loading_pattern_solver(loading_pattern: np.ndarray) -> KomodoOutput:
+        pattern_hash = hashlib.sha256(loading_pattern.tobytes()).hexdigest()[:16]
+        core_symmetry = get_core_symmetry(core_geometry, loading_pattern)
+        komodo_input_path = komodo_void_iteration(
+            core_geometry,
+            xsec_path,
+            f"{case_name}_{pattern_hash}",
+            0,
+            0,
+            core_symmetry=core_symmetry,
+            material_maps=get_loading_pattern_material_maps(
+                core_geometry, loading_pattern, fuel_type_materials
+            ),
+        )
+        return solve_komodo(
+            core_geometry,
+            komodo_input_path,
+            core_symmetry=core_symmetry,
+            komodo_cache=komodo_cache,
+            timeout=timeout,
+        )
+
+    return loading_pattern_solver
@@ -0,0 +1,233 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from cn.core.core_models import CoreGeometry
+from cn.core.core_th import CoreThConditions, CoreThResult, solve_core_th
+from cn.core.komodo.komodo_parser import KomodoOutput
+from cn.log import logger
+
+# Solves the core for a void distribution [nz, ny, nx], given the coupling iteration and the
+# tolerance the solver should converge its fission source to
+CoreSolver = Callable[[np.ndarray, int, float], KomodoOutput]
+
+
+@dataclass
+class PowerVoidSettings:
+    """Settings of the power-void coupling iteration
+
+    Parameters
+    ----------
+    relaxation : float
+        Under-relaxation factor of the void update, 1 is plain Picard iteration
+    anderson_depth : int
+        Number of previous iterations used for Anderson acceleration, 0 to only under-relax
+    void_tolerance : float
+        Converged when the largest void change of an iteration is below this
+    power_tolerance : float
+        Converged when the largest relative node power change of an iteration is below this
+    keff_tolerance : float
+        Converged when the k-eff change of an iteration is below this
+    max_iterations : int
+        Maximum number of core solves
+    min_solver_tolerance : float
+        Tightest fission source tolerance requested from the core solver
+    max_solver_tolerance : float
+        Loosest fission source tolerance requested from the core solver, used while the void is
+        far from converged
+    """
+
+    relaxation: float = 0.7
+    anderson_depth: int = 3
+    void_tolerance: float = 1.0e-3
+    power_tolerance: float = 1.0e-3
+    keff_tolerance: float = 1.0e-5
+    max_iterations: int = 30
+    min_solver_tolerance: float = 1.0e-6
+    max_solver_tolerance: float = 1.0e-3
+
+    def __post_init__(self):
+        assert 0 < self.relaxation <= 1, "Relaxation must be in (0, 1]."
+        assert self.anderson_depth >= 0, "Anderson depth must be non-negative."
+        assert self.max_iterations > 0, "Max iterations must be greater than 0."
+        assert (
+            0 < self.min_solver_tolerance <= self.max_solver_tolerance
+        ), "Solver tolerances must be positive and ordered."
+
+    def get_solver_tolerance(self, void_residual: float) -> float:
+        """Loose solves while the void changes a lot, tight solves close to convergence"""
+        return float(
+            np.clip(0.1 * void_residual, self.min_solver_tolerance, self.max_solver_tolerance)
+        )
+
+
+@dataclass
+class PowerVoidResult:
+    keff: float | None
+    power_3d: np.ndarray
+    void: np.ndarray
+    th: CoreThResult
+    converged: bool
+    # Rows of (iteration, k-eff, void residual, power residual, solver tolerance)
+    residual_history: np.ndarray = field(default_factory=lambda: np.zeros((0, 5)))
+
+    @property
+    def n_core_solves(self) -> int:
+        return len(self.residual_history)
+
+
+def get_void_material_maps(
+    core_geometry: CoreGeometry, void: np.ndarray, void_levels: list[float]
+) -> list[np.ndarray]:
+    """Map each node to the material of the closest void level (material 1 for the first level)
+
+    The core solution only changes when a node moves to another void level, so the power-void
+    iteration can not converge the void to tolerances much smaller than the level spacing.
+    """
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    void_levels_array = np.asarray(void_levels, dtype=float)
+    level_idx = np.abs(void[..., None] - void_levels_array).argmin(axis=-1)
+    return list(np.where(assembly_mask, level_idx + 1, 0))
+
+
+def _anderson_update(
+    voids: list[np.ndarray], residuals: list[np.ndarray], relaxation: float
+) -> np.ndarray:
+    """Anderson mixing of the last iterates, falls back to under-relaxation for one iterate"""
+    void, residual = voids[-1], residuals[-1]
+    if len(voids) < 2:
+        return void + relaxation * residual
+
+    delta_voids = np.stack([voids[i + 1] - voids[i] for i in range(len(voids) - 1)], axis=1)
+    delta_residuals = np.stack(
+        [residuals[i + 1] - residuals[i] for i in range(len(residuals) - 1)], axis=1
+    )
+    gamma = np.linalg.lstsq(delta_residuals, residual, rcond=None)[0]
+
+    return void + relaxation * residual - (delta_voids + relaxation * delta_residuals) @ gamma
+
+
+def couple_power_void(
+    core_geometry: CoreGeometry,
+    core_solver: CoreSolver,
+    th_conditions: CoreThConditions,
+    initial_void: np.ndarray | None = None,
+    settings: PowerVoidSettings | None = None,
+) -> PowerVoidResult:
+    """Iterate the core solver and the channel thermal-hydraulics until power and void converge
+
+    The void is the iterate. Each iteration solves the core for the current void, computes the
+    void of the resulting power with `solve_core_th` and updates the void with under-relaxation
+    and Anderson acceleration. The fission source tolerance requested from the core solver
+    follows the void residual, so the first iterations are cheap.
+
+    Parameters
+    ----------
+    core_geometry : CoreGeometry
+        The core geometry
+    core_solver : CoreSolver
+        Solves the core for a void distribution, e.g. from `get_komodo_core_solver`
+    th_conditions : CoreThConditions
+        The operating conditions of the thermal-hydraulics
+    initial_void : np.ndarray, optional
+        The void to start from as [nz, ny, nx], no void by default
+    settings : PowerVoidSettings, optional
+        The iteration settings
+
+    Returns
+    -------
+    PowerVoidResult
+        The converged (or last) power, void and k-eff with the residual history
+    """
+    if settings is None:
+        settings = PowerVoidSettings()
+
+    shape = (core_geometry.axial_nodes, core_geometry.core_size, core_geometry.core_size)
+    assembly_mask = np.broadcast_to(
+        core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool), shape
+    )
+
+    void = np.zeros(shape) if initial_void is None else np.array(initial_void, dtype=float)
+    assert void.shape == shape, f"Initial void must be [nz, ny, nx] ({void.shape=}, {shape=})"
+
+    # Iterates and residuals of the nodes in the core, for the Anderson acceleration
+    voids: list[np.ndarray] = []
+    residuals: list[np.ndarray] = []
+    residual_history = []
+
+    keff = None
+    power = None
+    solved_void = void
+    void_residual = np.inf
+    converged = False
+
+    for iteration in range(settings.max_iterations):
+        solved_void = void
+        solver_tolerance = settings.get_solver_tolerance(void_residual)
+        komodo_output = core_solver(void, iteration, solver_tolerance)
+        th = solve_core_th(core_geometry, komodo_output.power_3d, th_conditions)
+
+        residual = (th.void - void)[assembly_mask]
+        void_residual = float(np.abs(residual).max())
+        power_residual = (
+            np.inf
+            if power is None
+            else float(
+                np.abs(komodo_output.power_3d - power)[assembly_mask].max()
+                / np.abs(komodo_output.power_3d[assembly_mask]).max()
+            )
+        )
+        keff_residual = (
+            np.inf if keff is None or komodo_output.keff is None else abs(komodo_output.keff - keff)
+        )
+        keff = None if komodo_output.keff is None else float(komodo_output.keff)
+        power = komodo_output.power_3d
+
+        residual_history.append(
+            (
+                iteration,
+                np.nan if keff is None else keff,
+                void_residual,
+                power_residual,
+                solver_tolerance,
+            )
+        )
+        logger.debug(
+            f"Power-void iteration {iteration}: {keff=}, {void_residual=:.3e}, {power_residual=:.3e}, {solver_tolerance=:.1e}"
+        )
+
+        if (
+            void_residual < settings.void_tolerance
+            and power_residual < settings.power_tolerance
+            and keff_residual < settings.keff_tolerance
+        ):
+            converged = True
+            break
+
+        voids.append(void[assembly_mask])
+        residuals.append(residual)
+        voids = voids[-(settings.anderson_depth + 1) :]
+        residuals = residuals[-(settings.anderson_depth + 1) :]
+
+        void = np.zeros(shape)
+        void[assembly_mask] = np.clip(
+            _anderson_update(voids, residuals, settings.relaxation), 0.0, 1.0
+        )
+
+    if converged:
+        logger.info(f"Power-void iteration converged after {len(residual_history)} core solves")
+    else:
+        logger.warning(
+            f"Power-void iteration did not converge in {settings.max_iterations} core solves ({void_residual=:.3e})"
+        )
+
+    assert power is not None
+    return PowerVoidResult(
+        keff=keff,
+        power_3d=power,
+        void=solved_void,
+        th=th,
+        converged=converged,
+        residual_history=np.array(residual_history),
+    )
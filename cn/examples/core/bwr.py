@@ -1,19 +1,22 @@
 import numpy as np
 
 from cn.core.komodo.komodo_bwr_deplete_cycle import komodo_void_iteration, run_komodo
-from cn.core.komodo.komodo_parser import komodo_out_3d_power_map
+from cn.core.komodo.komodo_parser import read_komodo_output
+from cn.examples.config import config
+from cn.utils.profiling import PhaseProfiler
 
 large_width = 400
 np.set_printoptions(linewidth=large_width)
 
-from cn.core.core_models import CoreGeometry
+from cn.core.core_models import CoreGeometry, CoreSymmetry
 
 CASE_NAME = "TEST"
 # KOMODO_XSEC_PATH = "data/mgxs/fuels/ORCA-1/segments/pyramid/GD2O3_8x5.0/0cbfab047d85533c0ceafb474db24787/mgxs/komodo_XSEC.txt"
 KOMODO_XSEC_PATH = "data/komodo_XSEC.txt"
+CORE_SYMMETRY = CoreSymmetry.QUARTER
 
 
-def main():
+def main(komodo_xsec_path: str = KOMODO_XSEC_PATH):
     core_geometry = CoreGeometry(
         20,
         10,
@@ -25,10 +28,20 @@ def main():
     # print(core_geometry.get_core_map(empty_value=0))
     # print(core_geometry.get_assembly_count())
 
-    komodo_input_path = komodo_void_iteration(core_geometry, KOMODO_XSEC_PATH, CASE_NAME, 0, 0)
-
-    run_komodo(komodo_input_path)
-    axial_power_maps = komodo_out_3d_power_map(core_geometry, f"{komodo_input_path}_3d_power.out")
+    profiler = PhaseProfiler("core")
+    with profiler.phase("komodo_input"):
+        komodo_input_path = komodo_void_iteration(
+            core_geometry, komodo_xsec_path, CASE_NAME, 0, 0, core_symmetry=CORE_SYMMETRY
+        )
+    with profiler.phase("komodo_run"):
+        run_komodo(komodo_input_path)
+    with profiler.phase("komodo_parse"):
+        komodo_output = read_komodo_output(
+            core_geometry, komodo_input_path, core_symmetry=CORE_SYMMETRY
+        )
+    profiler.write(f"{config.core_dir}/{CASE_NAME}/profile")
+    print(f"k-eff: {komodo_output.keff} ({len(komodo_output.iterations)} outer iterations)")
+    axial_power_maps = komodo_output.power_3d
 
     sums = [np.sum(x) for x in axial_power_maps]
     print(sums)
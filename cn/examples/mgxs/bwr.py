@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 
@@ -5,6 +6,7 @@ import numpy as np
 
 from cn.examples.config import config
 from cn.log import logger
+from cn.mgxs.case_catalog import CaseCatalog
 from cn.mgxs.openmc import openmc_bwr_assembly_depletion
 from cn.mgxs.openmc.openmc_bwr_assembly_depletion import InputData, get_geometry
 from cn.models.fuel.fuel_segment import FuelSegment, MaterialMap
@@ -13,6 +15,16 @@ from cn.models.fuel.material import BurnableAbsorberMaterial, FuelMaterial
 from cn.models.mgxs.mgxs_run import MGXSRunBWR, TimeStepUnit
 from cn.models.mgxs.openmc import OpenMCSettings
 from cn.utils.map_tools import get_ba_map, get_pyramid_peaked_map
+from cn.utils.scratch import ScratchCopier
+from cn.utils.side_pool import SidePool
+
+# Extract the MGXS of each depletion step as soon as its transport is done
+INCREMENTAL_MGXS = True
+# Write the time of each phase of a case to its results, and a cProfile dump with CPROFILE
+PROFILE = True
+CPROFILE = False
+# Write the memory, CPU use and bytes written of each case to its manifest
+SAMPLE_RESOURCES = True
 
 
 def get_fuel_segment(fuel_type: FuelType, n_ba_pins: int, ba_enrichment: float) -> FuelSegment:
@@ -30,9 +42,8 @@ def get_fuel_segment(fuel_type: FuelType, n_ba_pins: int, ba_enrichment: float)
     return fuel_segment
 
 
-def main():
-    logger.info(f"MGXS directory: '{config.mgxs_dir}'")
-
+def get_input_data_list() -> list[InputData]:
+    """The inputs of the void and power cases of the example segment"""
     lattice_size = 9
     n_ba_pins = 8
     ba_enrichment = 5.0
@@ -40,8 +51,6 @@ def main():
     fuel_type = FuelType("ORCA-1", FuelGeometry(lattice_size, 1.26, 0.475, 0.525, 0.4096))
 
     fuel_segment = get_fuel_segment(fuel_type, n_ba_pins, ba_enrichment)
-    base_dir = fuel_segment.get_base_dir(config)
-    fuel_segment.save(f"{base_dir}/fuel_segment.yaml")
 
     openmc_settings = OpenMCSettings(
         particles=500,
@@ -54,9 +63,9 @@ def main():
         cross_sections=os.environ["OPENMC_CROSS_SECTIONS"],
     )
 
+    inp_list = []
     for alpha in [0.0, 0.2, 0.4, 0.6, 0.8]:
         for power in [4e6 / 400]:
-
             case_path = MGXSRunBWR.get_base_dir(alpha, power, config, fuel_segment)
 
             mgxs_run_bwr = MGXSRunBWR(
@@ -71,13 +80,49 @@ def main():
                 img_path=f"{case_path}/img",
             )
 
-            inp = InputData(
-                fuel_segment=fuel_segment,
-                openmc_settings=openmc_settings,
-                mgxs_run_bwr=mgxs_run_bwr,
+            inp_list.append(
+                InputData(
+                    fuel_segment=fuel_segment,
+                    openmc_settings=openmc_settings,
+                    mgxs_run_bwr=mgxs_run_bwr,
+                )
+            )
+
+    return inp_list
+
+
+def main():
+    logger.info(f"MGXS directory: '{config.mgxs_dir}'")
+
+    inp_list = get_input_data_list()
+    fuel_segment = inp_list[0].fuel_segment
+    fuel_segment.save(f"{fuel_segment.get_base_dir(config)}/fuel_segment.yaml")
+
+    case_catalog = CaseCatalog(config)
+
+    # Node-local directory to run OpenMC in, e.g. on tmpfs, instead of the data directory
+    scratch_dir = os.environ.get("CN_SCRATCH_DIR")
+    # Post-process each case in a side pool while the transport of the next case runs
+    with ScratchCopier() as scratch_copier, SidePool(max_workers=2) as post_process_pool:
+        for inp in inp_list:
+            openmc_bwr_assembly_depletion.run(
+                inp,
+                case_catalog,
+                scratch_dir,
+                scratch_copier,
+                post_process_pool,
+                incremental_mgxs=INCREMENTAL_MGXS,
+                profile=PROFILE,
+                cprofile=CPROFILE,
+                sample_resources=SAMPLE_RESOURCES,
             )
 
-            openmc_bwr_assembly_depletion.run(inp)
+    if SAMPLE_RESOURCES:
+        summary = openmc_bwr_assembly_depletion.get_sweep_resource_summary(inp_list)
+        summary_path = f"{fuel_segment.get_base_dir(config)}/sweep_resources.json"
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Resource summary of the sweep written to '{summary_path}'")
 
 
 if __name__ == "__main__":
@@ -1,38 +1,35 @@
 import os
 import re
 import sys
-from glob import glob
 
 import numpy as np
 from matplotlib import pyplot as plt
 
 from cn.examples.config import config
+from cn.examples.mgxs import bwr as mgxs_bwr
 from cn.log import logger
+from cn.mgxs.case_catalog import CaseCatalog
 from cn.mgxs.openmc import openmc_bwr_assembly_depletion
 from cn.mgxs.openmc.openmc_bwr_assembly_depletion import InputData
 from cn.models.mgxs.mgxs_run import MGXSRunBWR, TimeStepUnit
 
-# BASE_DIR_PATH_WILDCARD = (
-#     "data/mgxs/fuels/ORCA-1/segments/pyramid/GD2O3_8x5.0/281ff2547869a839f8d6d02687e206d5"
-# )
-BASE_DIR_PATH_WILDCARD = "data/mgxs/fuels/ORCA-1/segments/pyramid/GD2O3_8x5.0/0cb*"
-
 
 def main():
+    # The segment of the example sweep, its hash changes with the segment
+    segment_hash_pattern = mgxs_bwr.get_input_data_list()[0].fuel_segment.hash()
+
     logger.info(f"MGXS directory: '{config.mgxs_dir}'")
-    logger.info(f"Base directory wildcard: '{BASE_DIR_PATH_WILDCARD}'")
+    logger.info(f"Segment hash pattern: '{segment_hash_pattern}'")
+
+    case_catalog = CaseCatalog(config)
 
-    for base_dir_path in glob(BASE_DIR_PATH_WILDCARD):
+    for base_dir_path, case_records in case_catalog.find_by_segment(segment_hash_pattern).items():
         plt.close("all")  # Remove all existing figures
 
         logger.info(f"Base directory: '{base_dir_path}'")
 
-        inp_list = [
-            InputData.load(inp_data_path)
-            for inp_data_path in glob(f"{base_dir_path}/**/cwd/input_data.yaml", recursive=True)
-        ]
-        # Sort by void and power
-        inp_list.sort(key=lambda inp: (inp.mgxs_run_bwr.alpha, inp.mgxs_run_bwr.power))
+        # Sorted by void and power
+        inp_list = [InputData.load(case_record.input_data_path) for case_record in case_records]
 
         logger.info(f"Found {len(inp_list)} input data files")
 
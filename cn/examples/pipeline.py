@@ -0,0 +1,72 @@
+from cn.examples.config import config
+from cn.examples.core import bwr as core_bwr
+from cn.examples.mgxs import bwr as mgxs_bwr
+from cn.log import logger
+from cn.mgxs.case_catalog import CaseCatalog
+from cn.mgxs.openmc import openmc_bwr_assembly_depletion
+from cn.mgxs.openmc.openmc_h5_to_komodo import BURNUP_LIMIT, get_komodo_XSEC
+from cn.utils.pipeline import Pipeline, Stage
+
+# Rerun `main` after changing this, only the XSEC library and the core are rebuilt
+XSEC_BURNUP_LIMIT = BURNUP_LIMIT
+
+
+def get_stages() -> list[Stage]:
+    """Depletion, MGXS extraction, XSEC library and core stages of the example segment"""
+    inp_list = mgxs_bwr.get_input_data_list()
+    case_catalog = CaseCatalog(config)
+
+    stages = []
+    for inp in inp_list:
+        case_name = f"{inp.mgxs_run_bwr.alpha}_{inp.mgxs_run_bwr.power}"
+        depletion_results_path = f"{inp.mgxs_run_bwr.cwd_path}/depletion_results.h5"
+        stages.append(
+            Stage(
+                name=f"depletion_{case_name}",
+                # The MGXS are extracted by the next stage
+                run=lambda inp=inp: openmc_bwr_assembly_depletion.run(
+                    inp, case_catalog, extract_mgxs=False
+                ),
+                outputs=[depletion_results_path],
+                parameters={"input_data": inp.to_dict()},
+            )
+        )
+        stages.append(
+            Stage(
+                name=f"mgxs_{case_name}",
+                run=lambda inp=inp: openmc_bwr_assembly_depletion.extract_mgxs_results(inp),
+                inputs=[depletion_results_path],
+                outputs=[f"{inp.mgxs_run_bwr.results_path}/mgxs"],
+            )
+        )
+
+    xsec_dir = f"{inp_list[0].fuel_segment.get_base_dir(config)}/mgxs"
+    xsec_path = f"{xsec_dir}/komodo_XSEC.txt"
+    stages.append(
+        Stage(
+            name="xsec_library",
+            run=lambda: get_komodo_XSEC(inp_list, xsec_dir, XSEC_BURNUP_LIMIT),
+            inputs=[f"{inp.mgxs_run_bwr.results_path}/mgxs" for inp in inp_list],
+            outputs=[xsec_path],
+            parameters={"burnup_limit": XSEC_BURNUP_LIMIT},
+        )
+    )
+    stages.append(
+        Stage(
+            name="core",
+            run=lambda: core_bwr.main(xsec_path),
+            inputs=[xsec_path],
+            outputs=[f"{config.core_dir}/{core_bwr.CASE_NAME}"],
+        )
+    )
+    return stages
+
+
+def main():
+    pipeline = Pipeline(get_stages(), f"{config.mgxs_dir}/pipeline_state.json")
+    logger.info(f"Stale stages: {pipeline.get_stale_stages()}")
+    pipeline.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict, dataclass, fields
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from cn.log import logger
+from cn.models.config import Config
+
+if TYPE_CHECKING:
+    from cn.mgxs.openmc.openmc_bwr_assembly_depletion import InputData
+
+
+class CaseStatus(str, Enum):
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class CaseRecord:
+    # Unique key of the case, "<segment hash>/voids/<alpha>/powers/<power>"
+    case_key: str
+    segment_hash: str
+    segment_dir: str
+    alpha: float
+    power: float
+    n_steps: int
+    total_dt: float
+    dt_unit: str
+    status: CaseStatus
+    runtime: float | None  # [s]
+    input_data_path: str
+    cwd_path: str
+    results_path: str
+
+    def __post_init__(self):
+        self.status = CaseStatus(self.status)
+
+
+CASE_COLUMNS = [case_field.name for case_field in fields(CaseRecord)]
+CASE_COLUMN_TYPES = {
+    "alpha": "REAL",
+    "power": "REAL",
+    "n_steps": "INTEGER",
+    "total_dt": "REAL",
+    "runtime": "REAL",
+}
+
+
+class CaseCatalog:
+    """SQLite catalog of the MGXS runs, written by `openmc_bwr_assembly_depletion.run`
+
+    Cases are looked up by segment, void and power through an index, so scripts do not need to
+    scan the MGXS directory for input files. Every operation opens a short-lived connection, so
+    concurrent runs can write to the same catalog.
+
+    Parameters
+    ----------
+    config : Config
+        The configuration
+    path : str, optional
+        Path to the catalog, `case_catalog.sqlite` in the MGXS directory by default
+    """
+
+    def __init__(self, config: Config, path: str | None = None):
+        self.config = config
+        self.path = path if path is not None else f"{config.mgxs_dir}/case_catalog.sqlite"
+
+        path_dirname = os.path.dirname(self.path)
+        if path_dirname:
+            os.makedirs(path_dirname, exist_ok=True)
+
+        columns = [f"{column} {CASE_COLUMN_TYPES.get(column, 'TEXT')}" for column in CASE_COLUMNS]
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS cases ({columns[0]} PRIMARY KEY, {', '.join(columns[1:])})"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cases_segment ON cases (segment_hash, alpha, power)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60.0)
+
+    def get_record(
+        self, inp: "InputData", status: CaseStatus, runtime: float | None = None
+    ) -> CaseRecord:
+        mgxs_run_bwr = inp.mgxs_run_bwr
+        # The segment directory of the case as run (see `MGXSRunBWR.get_base_dir`), so cases in
+        # directories named after an older segment hash are still found
+        segment_dir = mgxs_run_bwr.cwd_path.rsplit("/voids/", 1)[0]
+        segment_hash = os.path.basename(segment_dir)
+        return CaseRecord(
+            case_key=f"{segment_hash}/voids/{mgxs_run_bwr.alpha}/powers/{mgxs_run_bwr.power}",
+            segment_hash=segment_hash,
+            segment_dir=segment_dir,
+            alpha=mgxs_run_bwr.alpha,
+            power=mgxs_run_bwr.power,
+            n_steps=len(mgxs_run_bwr.dt),
+            total_dt=float(sum(mgxs_run_bwr.dt)),
+            dt_unit=mgxs_run_bwr.dt_unit.value,
+            status=status,
+            runtime=runtime,
+            input_data_path=f"{mgxs_run_bwr.cwd_path}/input_data.yaml",
+            cwd_path=mgxs_run_bwr.cwd_path,
+            results_path=mgxs_run_bwr.results_path,
+        )
+
+    def record(self, inp: "InputData", status: CaseStatus, runtime: float | None = None):
+        """Insert or update the case of an input"""
+        case_record = self.get_record(inp, status, runtime)
+        row = {**asdict(case_record), "status": status.value}
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO cases ({', '.join(CASE_COLUMNS)}) VALUES ({', '.join('?' * len(CASE_COLUMNS))})",
+                [row[column] for column in CASE_COLUMNS],
+            )
+        logger.debug(f"Recorded case '{case_record.case_key}' as {status.value}")
+
+    def find(
+        self,
+        segment_hash: str | None = None,
+        alpha: float | None = None,
+        power: float | None = None,
+        status: CaseStatus | None = CaseStatus.DONE,
+    ) -> list[CaseRecord]:
+        """Find cases, sorted by segment, void and power
+
+        Parameters
+        ----------
+        segment_hash : str, optional
+            The hash of the segment, or the start of it followed by "*"
+        alpha : float, optional
+            The void fraction
+        power : float, optional
+            The power
+        status : CaseStatus, optional
+            The status of the cases, all cases if None
+
+        Returns
+        -------
+        list[CaseRecord]
+            The matching cases
+        """
+        conditions = []
+        parameters: list[str | float] = []
+        if segment_hash is not None:
+            # GLOB is case sensitive, so prefix patterns can use the index
+            conditions.append("segment_hash GLOB ?")
+            parameters.append(segment_hash)
+        for column, value in [("alpha", alpha), ("power", power)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if status is not None:
+            conditions.append("status = ?")
+            parameters.append(status.value)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(CASE_COLUMNS)} FROM cases{where} ORDER BY segment_hash, alpha, power",
+                parameters,
+            ).fetchall()
+        return [CaseRecord(*row) for row in rows]
+
+    def find_by_segment(
+        self, segment_hash: str, status: CaseStatus | None = CaseStatus.DONE
+    ) -> dict[str, list[CaseRecord]]:
+        """Find cases grouped by segment directory, e.g. all voids of the segments matching "0cb*" """
+        segments: dict[str, list[CaseRecord]] = {}
+        for case_record in self.find(segment_hash, status=status):
+            segments.setdefault(case_record.segment_dir, []).append(case_record)
+        return segments
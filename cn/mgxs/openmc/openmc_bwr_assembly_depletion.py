@@ -1,8 +1,13 @@
+import copy
+import json
 import os
 import pathlib
 import pickle
 import shutil
+import tempfile
+import time
 from dataclasses import dataclass
+from glob import glob
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -13,12 +18,34 @@ import openmc.model
 import openmc.stats
 
 from cn.log import logger
+from cn.mgxs.case_catalog import CaseCatalog, CaseStatus
 from cn.mgxs.openmc import openmc_geometries, openmc_materials
 from cn.models.config import Config
 from cn.models.fuel.fuel_segment import FuelSegment
 from cn.models.mgxs.mgxs_run import MGXSRunBWR
 from cn.models.mgxs.openmc import OpenMCSettings
 from cn.models.persistable import PersistableYAML
+from cn.utils.profiling import PhaseProfiler, phase
+from cn.utils.resources import (
+    ResourceSampler,
+    ResourceUsage,
+    get_output_sizes,
+    summarize_usages,
+)
+from cn.utils.scratch import ScratchCopier, copy_tree_verified
+from cn.utils.side_pool import SidePool
+
+MGXS_LIBRARY_FILENAME = "mgxs_library"
+CASE_MANIFEST_FILENAME = "case_manifest.json"
+# File name patterns of the outputs of a case, for the bytes written per category
+CASE_OUTPUT_CATEGORIES = {
+    "statepoints": ["openmc_simulation_n*.h5"],
+    "depletion_results": ["depletion_results.h5"],
+    "mgxs": ["mgxs_*.h5", f"{MGXS_LIBRARY_FILENAME}*"],
+    "plots": ["*.png"],
+    "profiles": ["*.jsonl", "*_trace.json", "*.prof"],
+    "inputs": ["*.xml", "*.yaml", "summary.h5"],
+}
 
 
 @dataclass
@@ -41,7 +68,6 @@ class InputData(PersistableYAML):
 
 
 def plot_geometry(inp: InputData, universe: openmc.Universe, colors: dict):
-
     lattice_size = inp.fuel_segment.fuel_type.geometry.lattice_size
     ba_str = inp.fuel_segment.get_ba_str()
 
@@ -72,7 +98,6 @@ def get_tallies(inp: InputData, geometry: openmc.Geometry):
 
 
 def get_geometry(inp: InputData):
-
     zircaloy2 = openmc_materials.zircaloy2()
     water = openmc_materials.water(inp.mgxs_run_bwr.alpha)
 
@@ -158,19 +183,88 @@ def get_settings(inp: InputData):
     return settings
 
 
-def run_depletion(inp: InputData, model: openmc.model.Model):
-    op = openmc.deplete.CoupledOperator(
-        model, diff_burnable_mats=False, chain_file=inp.openmc_settings.chain_file
+class CaseOperator(openmc.deplete.CoupledOperator):
+    """Depletion operator of a case, with optional MGXS extraction and profiling of each step
+
+    With an `mgxs_lib`, the MGXS of step i are written to `mgxs_path/mgxs_<i>.h5` as soon as its
+    statepoint is written, as `get_mgxs_results` does for all steps after the depletion. With a
+    `profiler`, each transport solve and MGXS extraction is timed.
+    """
+
+    def __init__(
+        self,
+        model: openmc.model.Model,
+        mgxs_lib: openmc.mgxs.Library | None = None,
+        mgxs_path: str | None = None,
+        profiler: PhaseProfiler | None = None,
+        **kwargs,
+    ):
+        super().__init__(model, **kwargs)
+        assert (mgxs_lib is None) == (mgxs_path is None), "Set both the MGXS library and path."
+        self.mgxs_lib = mgxs_lib
+        # Absolute, the depletion runs in the working directory of the case
+        self.mgxs_path = None if mgxs_path is None else os.path.abspath(mgxs_path)
+        self.profiler = profiler
+
+    def __call__(self, vec, source_rate):
+        with phase(self.profiler, "transport"):
+            return super().__call__(vec, source_rate)
+
+    def write_bos_data(self, step: int):
+        super().write_bos_data(step)
+        if self.mgxs_lib is None or openmc.deplete.comm.rank != 0:
+            return
+
+        with phase(self.profiler, "mgxs_extraction", step=step):
+            with openmc.StatePoint(f"openmc_simulation_n{step}.h5", autolink=True) as sp:
+                self.mgxs_lib.load_from_statepoint(sp)
+            self.mgxs_lib.build_hdf5_store(filename=f"mgxs_{step}.h5", directory=self.mgxs_path)
+        logger.info(f"Extracted MGXS of depletion step {step}")
+
+
+class CaseIntegrator(openmc.deplete.CECMIntegrator):
+    """CE/CM integrator that times each depletion step and depletion solve with a profiler"""
+
+    def __init__(self, *args, profiler: PhaseProfiler | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = profiler
+
+    def __call__(self, n, rates, dt, source_rate, i):
+        with phase(self.profiler, "depletion_step", step=i):
+            return super().__call__(n, rates, dt, source_rate, i)
+
+    def _timed_deplete(self, *args, **kwargs):
+        with phase(self.profiler, "depletion_solve"):
+            return super()._timed_deplete(*args, **kwargs)
+
+
+def run_depletion(
+    inp: InputData,
+    model: openmc.model.Model,
+    mgxs_lib: openmc.mgxs.Library | None = None,
+    profiler: PhaseProfiler | None = None,
+):
+    """Run the depletion of a case, extracting the MGXS of each step with `mgxs_lib` if given"""
+    op = CaseOperator(
+        model,
+        mgxs_lib,
+        None if mgxs_lib is None else os.path.join(inp.mgxs_run_bwr.results_path, "mgxs"),
+        profiler,
+        diff_burnable_mats=False,
+        chain_file=inp.openmc_settings.chain_file,
     )
-    cecm = openmc.deplete.CECMIntegrator(
+    cecm = CaseIntegrator(
         op,
         inp.mgxs_run_bwr.dt,
         inp.mgxs_run_bwr.power,
         timestep_units=inp.mgxs_run_bwr.dt_unit,
+        profiler=profiler,
     )
     os.chdir(inp.mgxs_run_bwr.cwd_path)
-    cecm.integrate()
-    os.chdir(inp.mgxs_run_bwr.original_cwd_path)
+    try:
+        cecm.integrate()
+    finally:
+        os.chdir(inp.mgxs_run_bwr.original_cwd_path)
 
 
 def get_results(
@@ -274,18 +368,264 @@ def get_mgxs_results(inp: InputData, mgxs_lib: openmc.mgxs.Library, output_path:
         mgxs_lib.build_hdf5_store(filename=f"mgxs_{sp_idx}.h5", directory=output_path)
 
 
-def run(inp: InputData):
+def extract_mgxs_results(inp: InputData, output_path: str | None = None):
+    """Extract the MGXS of a case that has run, with the MGXS library saved by `run`"""
+    mgxs_lib = openmc.mgxs.Library.load_from_file(
+        MGXS_LIBRARY_FILENAME, directory=inp.mgxs_run_bwr.cwd_path
+    )
+    get_mgxs_results(inp, mgxs_lib, output_path)
+
+
+def _get_profile_path(inp: InputData) -> str:
+    return os.path.join(inp.mgxs_run_bwr.results_path, "profile")
+
+
+def write_case_manifest(inp: InputData, resources: dict[str, ResourceUsage]):
+    """Write the resource usage of the stages of a case and the bytes it wrote per category
+
+    The manifest is written to `results_path/case_manifest.json`, the bytes are counted in the
+    working, results and image directories of the case.
+    """
+    manifest = {
+        "alpha": inp.mgxs_run_bwr.alpha,
+        "power": inp.mgxs_run_bwr.power,
+        "resources": {name: usage.to_dict() for name, usage in resources.items()},
+        "bytes_written": get_output_sizes(
+            [inp.mgxs_run_bwr.cwd_path, inp.mgxs_run_bwr.results_path, inp.mgxs_run_bwr.img_path],
+            CASE_OUTPUT_CATEGORIES,
+        ),
+    }
+    with open(os.path.join(inp.mgxs_run_bwr.results_path, CASE_MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def get_sweep_resource_summary(inp_list: list[InputData]) -> dict:
+    """Summarize the case manifests of a sweep, cases without a manifest are skipped
+
+    Returns
+    -------
+    dict
+        The number of cases, `summarize_usages` of each stage ("run", and "post_process" for
+        cases post-processed in a pool) and the total and largest bytes written per category
+    """
+    manifests = []
+    for inp in inp_list:
+        manifest_path = os.path.join(inp.mgxs_run_bwr.results_path, CASE_MANIFEST_FILENAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifests.append(json.load(f))
+    if not manifests:
+        return {"n_cases": 0}
+
+    stage_names = sorted({name for manifest in manifests for name in manifest["resources"]})
+    categories = sorted({name for manifest in manifests for name in manifest["bytes_written"]})
+    return {
+        "n_cases": len(manifests),
+        "resources": {
+            name: summarize_usages(
+                [
+                    ResourceUsage.from_dict(manifest["resources"][name])
+                    for manifest in manifests
+                    if name in manifest["resources"]
+                ]
+            )
+            for name in stage_names
+        },
+        "total_bytes_written": {
+            category: sum(manifest["bytes_written"].get(category, 0) for manifest in manifests)
+            for category in categories
+        },
+        "max_bytes_written": {
+            category: max(manifest["bytes_written"].get(category, 0) for manifest in manifests)
+            for category in categories
+        },
+    }
+
+
+def _finish_case(
+    inp: InputData,
+    cwd_path: str,
+    case_catalog: CaseCatalog | None,
+    status: CaseStatus,
+    runtime: float,
+    scratch_copier: ScratchCopier | None = None,
+):
+    """Copy a case that ran in a scratch directory back to `cwd_path` and record its status"""
+    scratch_cwd_path = inp.mgxs_run_bwr.cwd_path
+    inp.mgxs_run_bwr.cwd_path = cwd_path
+
+    def record():
+        if case_catalog is not None:
+            case_catalog.record(inp, status, runtime)
+
+    if scratch_cwd_path == cwd_path:
+        record()
+    elif scratch_copier is not None and status is CaseStatus.DONE:
+        scratch_copier.copy_back(scratch_cwd_path, cwd_path, on_done=record)
+    else:
+        # Failed cases are copied back right away, to keep what they wrote for debugging
+        copy_tree_verified(scratch_cwd_path, cwd_path)
+        record()
+
+
+def post_process_case(
+    inp: InputData,
+    cwd_path: str,
+    case_catalog: CaseCatalog | None,
+    transport_runtime: float,
+    extract_mgxs: bool = True,
+    profile: bool = False,
+    resources: dict[str, ResourceUsage] | None = None,
+):
+    """Plot the results and extract the MGXS of a case whose depletion has run
+
+    The depletion ran in `inp.mgxs_run_bwr.cwd_path`, which is copied to `cwd_path` afterwards if
+    it is a scratch directory. Used by `run` as a job of a post-processing pool. With `profile`,
+    the phases are written to `results_path/profile/post_process_*`. With the `resources` of the
+    run, the resources of the post-processing are sampled and the case manifest is written.
+    """
+    profiler = PhaseProfiler("post_process") if profile else None
+    sampler = ResourceSampler(include_children=False) if resources is not None else None
+    start_time = time.perf_counter()
+    try:
+        if sampler is not None:
+            sampler.start()
+        with phase(profiler, "plot_results"):
+            get_results(inp)
+        if extract_mgxs:
+            with phase(profiler, "mgxs_extraction"):
+                extract_mgxs_results(inp)
+        if sampler is not None:
+            write_case_manifest(inp, {**(resources or {}), "post_process": sampler.stop()})
+    except BaseException:
+        runtime = transport_runtime + time.perf_counter() - start_time
+        _finish_case(inp, cwd_path, case_catalog, CaseStatus.FAILED, runtime)
+        raise
+    finally:
+        if sampler is not None and sampler.usage is None:
+            sampler.stop()
+        if profiler is not None:
+            profiler.write(_get_profile_path(inp))
+
+    runtime = transport_runtime + time.perf_counter() - start_time
+    _finish_case(inp, cwd_path, case_catalog, CaseStatus.DONE, runtime)
+
+
+def run(
+    inp: InputData,
+    case_catalog: CaseCatalog | None = None,
+    scratch_dir: str | None = None,
+    scratch_copier: ScratchCopier | None = None,
+    post_process_pool: SidePool | None = None,
+    extract_mgxs: bool = True,
+    incremental_mgxs: bool = False,
+    profile: bool = False,
+    cprofile: bool = False,
+    sample_resources: bool = False,
+):
+    """Run the depletion of a case and extract its results
+
+    With a `case_catalog`, the case is recorded as running, and then as done (with its runtime)
+    or failed.
+
+    With a `scratch_dir` (e.g. on tmpfs or a local SSD), OpenMC runs in a directory of its own
+    below it, and `cwd_path` points there while the case runs. The finished directory is copied
+    back to `cwd_path` with integrity checks and removed, in the background with a
+    `scratch_copier` (the case is recorded as done once it is copied).
+
+    With a `post_process_pool`, `run` returns when the depletion is done and the plots, the MGXS
+    extraction and the copy from the scratch directory run as a job of the pool
+    (`post_process_case`), so the transport of the next case can start right away.
+
+    Without `extract_mgxs`, the MGXS are not extracted, e.g. when a later stage extracts them
+    with `extract_mgxs_results`. With `incremental_mgxs`, the MGXS of each depletion step are
+    extracted as soon as its transport is done (see `CaseOperator`), instead of from all
+    statepoints at the end.
+
+    With `profile`, the wall and CPU time of each phase (model build, tallies, each transport
+    step and depletion solve, MGXS extraction, plots) are written to `results_path/profile` as
+    JSON lines and a Chrome trace (see `PhaseProfiler`), and with `cprofile` also a cProfile
+    dump.
+
+    With `sample_resources`, the memory and CPU use of the case are sampled in the background
+    (`ResourceSampler`) and written with the bytes it wrote per category to
+    `results_path/case_manifest.json` (see `write_case_manifest`).
+    """
     inp.reset_paths()
     inp.save(f"{inp.mgxs_run_bwr.cwd_path}/input_data.yaml")
+    if case_catalog is not None:
+        case_catalog.record(inp, CaseStatus.RUNNING)
+
+    cwd_path = inp.mgxs_run_bwr.cwd_path
+    if scratch_dir is not None:
+        os.makedirs(scratch_dir, exist_ok=True)
+        inp.mgxs_run_bwr.cwd_path = tempfile.mkdtemp(prefix="cn_case_", dir=scratch_dir)
+        logger.info(f"Running in scratch directory '{inp.mgxs_run_bwr.cwd_path}'")
+
+    incremental_mgxs = extract_mgxs and incremental_mgxs
+    profiler = PhaseProfiler("run", cprofile=cprofile) if profile or cprofile else None
+    # OpenMC runs in this process, child processes are post-processing pool workers
+    sampler = ResourceSampler(include_children=False) if sample_resources else None
+    start_time = time.perf_counter()
+    try:
+        if sampler is not None:
+            sampler.start()
+        with phase(profiler, "model_build"):
+            geometry = get_geometry(inp)
+            settings = get_settings(inp)
+        with phase(profiler, "tally_setup"):
+            tallies = get_tallies(inp, geometry)
+            mgxs_lib = get_mgxs_tallies(inp, geometry, tallies)
+            # Saved so the MGXS can be extracted again without rerunning the depletion
+            mgxs_lib.dump_to_file(MGXS_LIBRARY_FILENAME, directory=inp.mgxs_run_bwr.cwd_path)
+
+        with phase(profiler, "model_build"):
+            model = openmc.model.Model(geometry=geometry, settings=settings, tallies=tallies)
+            model.differentiate_depletable_mats(diff_volume_method="divide equally")
+        with phase(profiler, "depletion"):
+            run_depletion(inp, model, mgxs_lib if incremental_mgxs else None, profiler)
+
+        if post_process_pool is None:
+            with phase(profiler, "plot_results"):
+                get_results(inp)
+            if extract_mgxs and not incremental_mgxs:
+                with phase(profiler, "mgxs_extraction"):
+                    get_mgxs_results(inp, mgxs_lib)
+    except BaseException:
+        runtime = time.perf_counter() - start_time
+        _finish_case(inp, cwd_path, case_catalog, CaseStatus.FAILED, runtime)
+        raise
+    finally:
+        if profiler is not None:
+            profiler.write(_get_profile_path(inp))
+        resources = None if sampler is None else {"run": sampler.stop()}
+
+    runtime = time.perf_counter() - start_time
+    if post_process_pool is not None:
+        # The job gets a copy, the input is only pickled when the job is sent to a worker
+        post_process_pool.submit(
+            post_process_case,
+            copy.deepcopy(inp),
+            cwd_path,
+            case_catalog,
+            runtime,
+            extract_mgxs=extract_mgxs and not incremental_mgxs,
+            profile=profile or cprofile,
+            resources=resources,
+        )
+        inp.mgxs_run_bwr.cwd_path = cwd_path
+    else:
+        if resources is not None:
+            write_case_manifest(inp, resources)
+        _finish_case(inp, cwd_path, case_catalog, CaseStatus.DONE, runtime, scratch_copier)
 
-    geometry = get_geometry(inp)
-    settings = get_settings(inp)
-    tallies = get_tallies(inp, geometry)
-    mgxs_lib = get_mgxs_tallies(inp, geometry, tallies)
 
-    model = openmc.model.Model(geometry=geometry, settings=settings, tallies=tallies)
-    model.differentiate_depletable_mats(diff_volume_method="divide equally")
-    run_depletion(inp, model)
+def add_existing_cases(case_catalog: CaseCatalog, base_dir_path: str):
+    """Add the cases below a directory that were run before the catalog, once
 
-    get_results(inp)
-    get_mgxs_results(inp, mgxs_lib)
+    Cases with depletion results are recorded as done, without a runtime.
+    """
+    for inp_data_path in glob(f"{base_dir_path}/**/cwd/input_data.yaml", recursive=True):
+        inp = InputData.load(inp_data_path)
+        has_results = os.path.exists(f"{inp.mgxs_run_bwr.cwd_path}/depletion_results.h5")
+        case_catalog.record(inp, CaseStatus.DONE if has_results else CaseStatus.FAILED)
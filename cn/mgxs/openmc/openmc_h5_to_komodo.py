@@ -14,15 +14,33 @@ N_GROUPS = 2
 BURNUP_LIMIT = 80  # MWd/kgU, don't use data after this burnup
 
 
-def construct_komodo_input_data(inp: InputData, mat_count: dict[str, int]):
+def construct_komodo_input_data(
+    inp: InputData,
+    mat_count: dict[str, int],
+    burnup_limit: float = BURNUP_LIMIT,
+    allow_partial: bool = False,
+):
+    """KOMODO XSEC lines of the exposures of a case
+
+    With `allow_partial`, a case whose depletion is still running (its MGXS are written step by
+    step by `CaseOperator`) uses the exposures written so far. Without it, a missing MGXS file
+    raises.
+    """
     assert N_GROUPS == inp.mgxs_run_bwr.N_groups
 
     exposures: list[float] = np.cumsum([0] + inp.mgxs_run_bwr.dt, dtype=float)  # type: ignore - Add 0 to the beginning of the list and find cumulative sum of dt lsit to get exposures
     cross_sections = {}
 
     for i in range(0, len(exposures)):
+        mgxs_path = os.path.join(inp.mgxs_run_bwr.results_path, f"mgxs/mgxs_{i}.h5")
+        if allow_partial and not os.path.exists(mgxs_path):
+            assert i > 0, f"No MGXS found for case ({mgxs_path=})"
+            logger.warning(f"MGXS of exposure {exposures[i]} not written yet, using {i} exposures")
+            exposures = exposures[:i]
+            break
+
         logger.debug(f"Loading data for exposure: {exposures[i]} {inp.mgxs_run_bwr.dt_unit.value}")
-        with h5py.File(os.path.join(inp.mgxs_run_bwr.results_path, f"mgxs/mgxs_{i}.h5"), "r") as f:
+        with h5py.File(mgxs_path, "r") as f:
             universes = f["universe"]  # type: ignore
             universe_keys = list(universes.keys())  # type: ignore
             assert len(universe_keys) == 1
@@ -37,8 +55,8 @@ def construct_komodo_input_data(inp: InputData, mat_count: dict[str, int]):
 
     # Loop through each exposure
     for exposure in exposures:
-        if exposure > BURNUP_LIMIT:
-            logger.debug(f"Exposure {exposure} > {BURNUP_LIMIT} (BURNUP_LIMIT), skipping")
+        if exposure > burnup_limit:
+            logger.debug(f"Exposure {exposure} > {burnup_limit} (burnup limit), skipping")
             continue
         mat_count["count"] += 1
 
@@ -72,14 +90,21 @@ def construct_komodo_input_data(inp: InputData, mat_count: dict[str, int]):
     return "\n".join(all_lines), xs_for_exps
 
 
-def get_komodo_XSEC(inp_list: list[InputData], xsec_path: str):
+def get_komodo_XSEC(
+    inp_list: list[InputData],
+    xsec_path: str,
+    burnup_limit: float = BURNUP_LIMIT,
+    allow_partial: bool = False,
+):
     mat_count = {"count": 0}
 
     all_lines = []
     xs_for_exps_list = []
 
     for inp in inp_list:
-        lines, xs_for_exps = construct_komodo_input_data(inp, mat_count)
+        lines, xs_for_exps = construct_komodo_input_data(
+            inp, mat_count, burnup_limit, allow_partial
+        )
         all_lines.append(lines)
         xs_for_exps_list.append(xs_for_exps)
 
@@ -0,0 +1,162 @@
+import os
+from dataclasses import dataclass
+
+import openmc
+import openmc.lib
+
+from cn.log import logger
+from cn.mgxs.openmc import openmc_materials
+from cn.mgxs.openmc.openmc_bwr_assembly_depletion import (
+    InputData,
+    get_geometry,
+    get_mgxs_tallies,
+    get_settings,
+    get_tallies,
+)
+
+
+@dataclass
+class BranchResult:
+    alpha: float
+    keff: float
+    keff_std: float
+    statepoint_path: str
+
+
+class OpenMCSession:
+    """An `openmc.lib` session of a segment that solves several states without re-initializing
+
+    The model of the input (with the MGXS tallies) is exported and `openmc.lib` is initialized
+    once, which loads the nuclear data once. Between solves, the water density and the material
+    compositions are changed in memory. Only nuclides that were in the model at initialization
+    can be given a density.
+
+    `openmc.lib` is global to the process, so there can only be one open session per worker
+    process. Depletion runs (`run`) initialize `openmc.lib` themselves and can not run inside a
+    session.
+
+    Parameters
+    ----------
+    inp : InputData
+        The case the model is made from
+    directory : str
+        Directory for the model XML files and the statepoints of the solves
+    threads : int, optional
+        Number of OpenMP threads, the OpenMC default if None
+    """
+
+    def __init__(self, inp: InputData, directory: str, threads: int | None = None):
+        assert not openmc.lib.is_initialized, "Only one OpenMC session can be open per process."
+        self.inp = inp
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        geometry = get_geometry(inp)
+        tallies = get_tallies(inp, geometry)
+        self.mgxs_lib = get_mgxs_tallies(inp, geometry, tallies)
+        settings = get_settings(inp)
+        # The summary is written next to the statepoints, so they can be linked to it
+        settings.output = {"path": os.path.abspath(directory)}
+        model = openmc.model.Model(geometry=geometry, settings=settings, tallies=tallies)
+        model.export_to_xml(directory)
+
+        self.water_id = next(
+            material.id
+            for material in geometry.get_all_materials().values()
+            if material.name == "Water"
+        )
+        self.n_solves = 0
+
+        args = [directory] if threads is None else ["-s", str(threads), directory]
+        openmc.lib.init(args=args, output=False)
+        logger.info(f"Initialized OpenMC session in '{directory}'")
+
+    def set_densities(self, material_id: int, nuclide_densities: dict[str, float]):
+        """Set the nuclide densities [atom/b-cm] of a material in memory"""
+        openmc.lib.materials[material_id].set_densities(
+            list(nuclide_densities), list(nuclide_densities.values())
+        )
+
+    def set_void(self, alpha: float, P: float = 7.0):
+        """Set the density of the water to that of a void fraction, as `openmc_materials.water`"""
+        water = openmc_materials.water(alpha, P)
+        self.set_densities(self.water_id, water.get_nuclide_atom_densities())
+
+    def set_compositions(self, materials: list[openmc.Material]):
+        """Set the compositions of materials with the ids of the model, e.g. of a depletion step"""
+        for material in materials:
+            self.set_densities(material.id, material.get_nuclide_atom_densities())
+
+    def solve(self, statepoint_name: str) -> tuple[float, float, str]:
+        """Run the current state and write its statepoint
+
+        Returns
+        -------
+        tuple[float, float, str]
+            k-eff, its standard deviation and the path to the statepoint
+        """
+        openmc.lib.reset()
+        openmc.lib.run(output=False)
+        keff, keff_std = openmc.lib.keff()
+
+        statepoint_path = os.path.join(self.directory, f"{statepoint_name}.h5")
+        openmc.lib.statepoint_write(statepoint_path)
+        self.n_solves += 1
+        return float(keff), float(keff_std), statepoint_path
+
+    def write_mgxs(self, statepoint_path: str, output_path: str, filename: str):
+        """Write the MGXS of a solve to `output_path/filename`, as `get_mgxs_results`"""
+        self.mgxs_lib.load_from_statepoint(openmc.StatePoint(statepoint_path, autolink=True))
+        self.mgxs_lib.build_hdf5_store(filename=filename, directory=output_path)
+
+    def close(self):
+        openmc.lib.finalize()
+        logger.info(f"Finalized OpenMC session after {self.n_solves} solves")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def run_void_branches(
+    inp: InputData,
+    alphas: list[float],
+    directory: str,
+    materials: list[openmc.Material] | None = None,
+    threads: int | None = None,
+) -> list[BranchResult]:
+    """Solve the segment of a case at several void fractions in one OpenMC session
+
+    Parameters
+    ----------
+    inp : InputData
+        The case, its void is the nominal state of the model
+    alphas : list[float]
+        The void fractions of the branches
+    directory : str
+        Directory for the model and the statepoints of the branches
+    materials : list[openmc.Material], optional
+        Compositions to solve the branches at, e.g. `Results.export_to_materials` of a depletion
+        step. Their nuclides must be in the model
+    threads : int, optional
+        Number of OpenMP threads
+
+    Returns
+    -------
+    list[BranchResult]
+        k-eff and the statepoint of each branch, with the MGXS of each branch written to
+        `directory/mgxs/mgxs_branch_<alpha>.h5`
+    """
+    results = []
+    with OpenMCSession(inp, directory, threads) as session:
+        if materials is not None:
+            session.set_compositions(materials)
+        for alpha in alphas:
+            session.set_void(alpha)
+            keff, keff_std, statepoint_path = session.solve(f"statepoint_branch_{alpha}")
+            session.write_mgxs(statepoint_path, f"{directory}/mgxs", f"mgxs_branch_{alpha}.h5")
+            logger.info(f"Void branch {alpha}: keff={keff:.5f} +/- {keff_std:.5f}")
+            results.append(BranchResult(alpha, keff, keff_std, statepoint_path))
+    return results
@@ -1,5 +1,6 @@
 import hashlib
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field
 
 import numpy as np
 
@@ -35,6 +36,10 @@ class FuelSegment(PersistableYAML):
     fuel_type: FuelType
     fuel_map: MaterialMap
     ba_map: MaterialMap | None
+    # Cache of `hash`, segments must not be modified after they are created
+    _hash: str | None = field(
+        default=None, init=False, repr=False, compare=False, metadata={"serialize": "omit"}
+    )
 
     def __post_init__(self):
         assert isinstance(
@@ -64,4 +69,12 @@ class FuelSegment(PersistableYAML):
         return f"{config.mgxs_dir}/fuels/{self.fuel_type.name}/segments/{self.name}/{self.get_ba_str()}/{self.hash()}"
 
     def hash(self) -> str:
-        return hashlib.md5(str(self.to_yaml()).encode("utf-8")).hexdigest()
+        """Hash of the content of the segment, from the raw bytes of the maps
+
+        Segments saved before the maps were saved as binary are in directories named after the
+        hash of their YAML text, those directories are still found through the case catalog.
+        """
+        if self._hash is None:
+            content = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+            self._hash = hashlib.md5(content.encode("utf-8")).hexdigest()
+        return self._hash
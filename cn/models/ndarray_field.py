@@ -1,3 +1,4 @@
+import base64
 from dataclasses import field
 
 import numpy as np
@@ -7,5 +8,25 @@ def ndarray_to_list(arr: np.ndarray) -> list:
     return arr.tolist()
 
 
-def ndarray_field():
-    return field(metadata={"serialize": lambda x: ndarray_to_list(x), "deserialize": np.array})
+def ndarray_to_binary(arr: np.ndarray) -> dict:
+    """Serialize an array as its raw bytes in base64, with a dtype and shape header"""
+    arr = np.ascontiguousarray(arr)
+    return {
+        "dtype": arr.dtype.str,
+        "shape": list(arr.shape),
+        "data": base64.b64encode(arr.tobytes()).decode("ascii"),
+    }
+
+
+def ndarray_from_value(value: dict | list) -> np.ndarray:
+    """Deserialize an array saved with `ndarray_to_binary`, or as nested lists by older versions"""
+    if isinstance(value, dict):
+        data = base64.b64decode(value["data"])
+        return np.frombuffer(data, dtype=np.dtype(value["dtype"])).reshape(value["shape"]).copy()
+    return np.array(value)
+
+
+def ndarray_field(binary: bool = True):
+    """Dataclass field of an array, saved as binary or as nested lists (human readable)"""
+    serialize = ndarray_to_binary if binary else ndarray_to_list
+    return field(metadata={"serialize": serialize, "deserialize": ndarray_from_value})
@@ -0,0 +1,189 @@
+import json
+import os
+import platform
+import statistics
+import timeit
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Callable
+
+from cn.log import logger
+
+
+@dataclass
+class Benchmark:
+    """A function to time with a problem size
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmarked function
+    setup : Callable[[], Callable[[], Any]]
+        Builds the inputs (not timed) and returns the function to time
+    params : dict[str, Any]
+        Problem size, part of the key of the benchmark
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        if not self.params:
+            return self.name
+        params = ",".join(f"{name}={value}" for name, value in self.params.items())
+        return f"{self.name}[{params}]"
+
+
+@dataclass
+class BenchmarkResult:
+    key: str
+    # Number of calls per repeat, and the time per call of each repeat [s]
+    n_calls: int
+    times: list[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+
+def run_benchmark(benchmark: Benchmark, repeats: int = 5, min_time: float = 0.2) -> BenchmarkResult:
+    """Time a benchmark, calling it enough times per repeat to take at least `min_time` [s]"""
+    assert repeats > 0, "Repeats must be greater than 0."
+    timer = timeit.Timer(benchmark.setup())
+
+    n_calls = 1
+    while (repeat_time := timer.timeit(n_calls)) < min_time:
+        n_calls = max(n_calls + 1, int(n_calls * 1.2 * min_time / max(repeat_time, 1e-9)))
+
+    times = [repeat_time / n_calls for repeat_time in timer.repeat(repeats, n_calls)]
+    return BenchmarkResult(key=benchmark.key, n_calls=n_calls, times=times)
+
+
+def save_results(results: list[BenchmarkResult], path: str):
+    """Save results as a baseline, with the machine they were run on"""
+    path_dirname = os.path.dirname(path)
+    if path_dirname:
+        os.makedirs(path_dirname, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "machine": {
+                    "node": platform.node(),
+                    "processor": platform.processor() or platform.machine(),
+                    "python": platform.python_version(),
+                },
+                "results": [asdict(result) for result in results],
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_results(path: str) -> dict[str, BenchmarkResult]:
+    """Load results saved with `save_results`, keyed on benchmark key"""
+    with open(path) as f:
+        data = json.load(f)
+    return {result["key"]: BenchmarkResult(**result) for result in data["results"]}
+
+
+class ComparisonStatus(str, Enum):
+    FASTER = "faster"
+    SLOWER = "slower"
+    UNCHANGED = "unchanged"
+    NEW = "new"
+
+
+@dataclass
+class Comparison:
+    key: str
+    status: ComparisonStatus
+    # Fastest time per call of the results and the baseline [s]
+    time: float
+    baseline_time: float | None = None
+
+    @property
+    def ratio(self) -> float | None:
+        """Time relative to the baseline, above 1 is slower"""
+        if self.baseline_time is None:
+            return None
+        return self.time / self.baseline_time
+
+
+def compare_results(
+    results: list[BenchmarkResult], baseline: dict[str, BenchmarkResult], threshold: float = 0.1
+) -> list[Comparison]:
+    """Compare the fastest repeats of results to a baseline
+
+    The fastest repeat is the least disturbed by other load on the machine. A benchmark is slower
+    or faster if it changed by more than `threshold` (relative) and by more than the spread
+    (median - min) of the baseline repeats, so noisy benchmarks are not flagged for noise.
+    """
+    comparisons = []
+    for result in results:
+        baseline_result = baseline.get(result.key)
+        if baseline_result is None:
+            comparisons.append(Comparison(result.key, ComparisonStatus.NEW, result.min))
+            continue
+
+        change = result.min - baseline_result.min
+        noise = baseline_result.median - baseline_result.min
+        status = ComparisonStatus.UNCHANGED
+        if abs(change) > threshold * baseline_result.min and abs(change) > noise:
+            status = ComparisonStatus.SLOWER if change > 0 else ComparisonStatus.FASTER
+        comparisons.append(
+            Comparison(result.key, status, result.min, baseline_time=baseline_result.min)
+        )
+    return comparisons
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in [("s", 1.0), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def format_report(comparisons: list[Comparison]) -> str:
+    """Markdown table of comparisons, slower benchmarks first"""
+    order = [
+        ComparisonStatus.SLOWER,
+        ComparisonStatus.FASTER,
+        ComparisonStatus.NEW,
+        ComparisonStatus.UNCHANGED,
+    ]
+    lines = [
+        "| Benchmark | Baseline | Current | Ratio | Status |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    for comparison in sorted(comparisons, key=lambda c: (order.index(c.status), c.key)):
+        baseline = (
+            "-" if comparison.baseline_time is None else _format_time(comparison.baseline_time)
+        )
+        ratio = "-" if comparison.ratio is None else f"{comparison.ratio:.2f}"
+        lines.append(
+            f"| {comparison.key} | {baseline} | {_format_time(comparison.time)} | {ratio}"
+            f" | {comparison.status.value} |"
+        )
+
+    n_slower = sum(comparison.status is ComparisonStatus.SLOWER for comparison in comparisons)
+    lines.append("")
+    lines.append(f"{n_slower} of {len(comparisons)} benchmarks are slower than the baseline")
+    return "\n".join(lines)
+
+
+def run_benchmarks(
+    benchmarks: list[Benchmark], repeats: int = 5, min_time: float = 0.2
+) -> list[BenchmarkResult]:
+    """Run benchmarks with `run_benchmark`, logging the fastest time per call of each"""
+    results = []
+    for benchmark in benchmarks:
+        result = run_benchmark(benchmark, repeats, min_time)
+        logger.info(f"{result.key}: {_format_time(result.min)} ({result.n_calls} calls/repeat)")
+        results.append(result)
+    return results
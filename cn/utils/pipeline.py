@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from typing import Any, Callable
+
+from cn.log import logger
+
+
+@dataclass
+class Stage:
+    """A step of a pipeline that makes its outputs from its inputs
+
+    Parameters
+    ----------
+    name : str
+        Unique name of the stage
+    run : Callable[[], None]
+        Makes the outputs
+    inputs : list[str]
+        Files or directories the stage reads. A stage depends on the stages with outputs that
+        contain (or are) its inputs
+    outputs : list[str]
+        Files or directories the stage writes
+    parameters : dict[str, Any]
+        JSON serializable parameters of the stage (e.g. a burnup limit), the stage is stale when
+        they change
+    """
+
+    name: str
+    run: Callable[[], None]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    parameters: dict[str, Any] = field(default_factory=dict)
+
+    def get_parameters_hash(self) -> str:
+        return hashlib.sha256(json.dumps(self.parameters, sort_keys=True).encode()).hexdigest()
+
+
+def _contains(directory: str, path: str) -> bool:
+    directory, path = os.path.normpath(directory), os.path.normpath(path)
+    return path == directory or path.startswith(directory + os.sep)
+
+
+class Pipeline:
+    """Stages that run in dependency order, rerunning only the stale ones
+
+    A stage is stale when it has not run, its parameters changed, the content of an input changed
+    since it ran, or an output is missing or was changed. Stages run in topological order and
+    staleness is decided just before a stage runs, so a stage whose upstream stage reran with
+    identical outputs is not rerun.
+
+    Content hashes are cached in the state file by modification time and size, so unchanged
+    files are not read again.
+
+    Parameters
+    ----------
+    stages : list[Stage]
+        The stages
+    state_path : str
+        JSON file with the hashes of the inputs and outputs of the last run of each stage
+    """
+
+    def __init__(self, stages: list[Stage], state_path: str):
+        names = [stage.name for stage in stages]
+        assert len(set(names)) == len(names), f"Stage names must be unique ({names=})"
+
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.dependencies = {
+            stage.name: {
+                upstream.name
+                for upstream in stages
+                if upstream is not stage
+                and any(
+                    _contains(output, input_path)
+                    for output in upstream.outputs
+                    for input_path in stage.inputs
+                )
+            }
+            for stage in stages
+        }
+        self.order = list(TopologicalSorter(self.dependencies).static_order())
+
+        self._state: dict[str, dict] = {"files": {}, "stages": {}}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                self._state = json.load(f)
+
+    def _save_state(self):
+        state_dirname = os.path.dirname(self.state_path)
+        if state_dirname:
+            os.makedirs(state_dirname, exist_ok=True)
+        with open(self.state_path, "w") as f:
+            json.dump(self._state, f, indent=2, sort_keys=True)
+
+    def _get_file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        cached = self._state["files"].get(path)
+        if cached is not None and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return cached[2]
+
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(chunk)
+        file_hash = sha256.hexdigest()
+        self._state["files"][path] = [stat.st_mtime_ns, stat.st_size, file_hash]
+        return file_hash
+
+    def get_hash(self, path: str) -> str | None:
+        """Hash of the content of a file or directory, None if it does not exist"""
+        if os.path.isfile(path):
+            return self._get_file_hash(path)
+        if not os.path.isdir(path):
+            return None
+
+        sha256 = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                sha256.update(os.path.relpath(file_path, path).encode())
+                sha256.update(self._get_file_hash(file_path).encode())
+        return sha256.hexdigest()
+
+    def get_stale_reason(self, name: str) -> str | None:
+        """Why a stage is stale, None if it is up to date with its inputs"""
+        stage = self.stages[name]
+        stage_state = self._state["stages"].get(name)
+        if stage_state is None:
+            return "not run before"
+        if stage_state["parameters"] != stage.get_parameters_hash():
+            return "parameters changed"
+        for input_path in stage.inputs:
+            if stage_state["inputs"].get(input_path) != self.get_hash(input_path):
+                return f"input '{input_path}' changed"
+        for output in stage.outputs:
+            output_hash = self.get_hash(output)
+            if output_hash is None:
+                return f"output '{output}' is missing"
+            if stage_state["outputs"].get(output) != output_hash:
+                return f"output '{output}' changed"
+        return None
+
+    def get_stale_stages(self) -> list[str]:
+        """The stages a run would run, in order (stages downstream of a stale stage included)"""
+        stale: list[str] = []
+        for name in self.order:
+            if self.dependencies[name] & set(stale) or self.get_stale_reason(name) is not None:
+                stale.append(name)
+        return stale
+
+    def run(self, force: list[str] | None = None) -> list[str]:
+        """Run the stale stages (and the `force` stages) in dependency order
+
+        Returns
+        -------
+        list[str]
+            The names of the stages that ran
+        """
+        force = [] if force is None else force
+        assert set(force) <= set(self.stages), f"Unknown stages to force ({force=})"
+
+        ran = []
+        for name in self.order:
+            stage = self.stages[name]
+            reason = "forced" if name in force else self.get_stale_reason(name)
+            if reason is None:
+                logger.debug(f"Stage '{name}' is up to date")
+                continue
+
+            logger.info(f"Running stage '{name}' ({reason})")
+            input_hashes = {input_path: self.get_hash(input_path) for input_path in stage.inputs}
+            start_time = time.perf_counter()
+            stage.run()
+
+            output_hashes = {output: self.get_hash(output) for output in stage.outputs}
+            missing = [
+                output for output, output_hash in output_hashes.items() if output_hash is None
+            ]
+            assert not missing, f"Stage '{name}' did not write its outputs ({missing=})"
+
+            self._state["stages"][name] = {
+                "parameters": stage.get_parameters_hash(),
+                "inputs": input_hashes,
+                "outputs": output_hashes,
+                "runtime": time.perf_counter() - start_time,
+            }
+            self._save_state()
+            ran.append(name)
+
+        self._save_state()
+        return ran
@@ -0,0 +1,129 @@
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+
+def _get_cpu_time() -> float:
+    """CPU time of the process (all threads) and its finished child processes, e.g. KOMODO"""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+@dataclass
+class PhaseRecord:
+    name: str
+    # Wall time from the creation of the profiler to the start of the phase [s]
+    start: float
+    wall_time: float
+    cpu_time: float
+    # Number of enclosing phases
+    depth: int
+    thread_id: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class PhaseProfiler:
+    """Record the wall and CPU time of the phases of a run
+
+    Phases are timed with `phase` and can be nested. The records can be written as JSON lines
+    (`write_jsonl`) or as a Chrome trace (`write_chrome_trace`, open it in `chrome://tracing` or
+    Perfetto). CPU time includes all threads of the process and the child processes that finished
+    during the phase, so it can be larger than the wall time.
+
+    Parameters
+    ----------
+    name : str
+        Name of the profiled run, used for the file names of `write`
+    cprofile : bool, optional
+        Also run `cProfile` while an outermost phase runs, written by `write` as `<name>.prof`
+    """
+
+    def __init__(self, name: str, cprofile: bool = False):
+        self.name = name
+        self.records: list[PhaseRecord] = []
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self._start_time = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **args) -> Iterator[None]:
+        """Time the body of the `with` statement as a phase, `args` are stored with the record"""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        if depth == 0 and self.cprofile is not None:
+            self.cprofile.enable()
+
+        start_time = time.perf_counter()
+        start_cpu_time = _get_cpu_time()
+        try:
+            yield
+        finally:
+            record = PhaseRecord(
+                name=name,
+                start=start_time - self._start_time,
+                wall_time=time.perf_counter() - start_time,
+                cpu_time=_get_cpu_time() - start_cpu_time,
+                depth=depth,
+                thread_id=threading.get_ident(),
+                args=args,
+            )
+            if depth == 0 and self.cprofile is not None:
+                self.cprofile.disable()
+            self._local.depth = depth
+            with self._lock:
+                self.records.append(record)
+
+    def get_totals(self) -> dict[str, dict[str, float]]:
+        """Number of calls, wall and CPU time of each phase name, summed over its records"""
+        totals: dict[str, dict[str, float]] = {}
+        for record in self.records:
+            total = totals.setdefault(record.name, {"count": 0, "wall_time": 0.0, "cpu_time": 0.0})
+            total["count"] += 1
+            total["wall_time"] += record.wall_time
+            total["cpu_time"] += record.cpu_time
+        return totals
+
+    def write_jsonl(self, path: str):
+        """Write one JSON object per phase record, in the order the phases finished"""
+        with open(path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(asdict(record)) + "\n")
+
+    def write_chrome_trace(self, path: str):
+        """Write the phase records as complete events of the Chrome trace event format"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": record.name,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.wall_time * 1e6,
+                "pid": pid,
+                "tid": record.thread_id,
+                "args": {**record.args, "cpu_time": record.cpu_time},
+            }
+            for record in self.records
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def write(self, directory: str):
+        """Write `<name>_phases.jsonl`, `<name>_trace.json` and `<name>.prof` (with cProfile)"""
+        os.makedirs(directory, exist_ok=True)
+        self.write_jsonl(os.path.join(directory, f"{self.name}_phases.jsonl"))
+        self.write_chrome_trace(os.path.join(directory, f"{self.name}_trace.json"))
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(os.path.join(directory, f"{self.name}.prof"))
+
+
+def phase(profiler: PhaseProfiler | None, name: str, **args) -> contextlib.AbstractContextManager:
+    """`profiler.phase`, or a context that does nothing if there is no profiler"""
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.phase(name, **args)
@@ -0,0 +1,246 @@
+import fnmatch
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+@dataclass
+class ResourceUsage:
+    # Largest and average sampled resident set size [B]
+    peak_rss: int
+    mean_rss: float
+    # CPU time of all threads (and sampled child processes) [s]
+    cpu_time: float
+    wall_time: float
+    n_samples: int
+
+    @property
+    def cpu_utilization(self) -> float:
+        """Average number of cores used"""
+        return self.cpu_time / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "peak_rss": self.peak_rss,
+            "mean_rss": self.mean_rss,
+            "cpu_time": self.cpu_time,
+            "wall_time": self.wall_time,
+            "n_samples": self.n_samples,
+            "cpu_utilization": self.cpu_utilization,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ResourceUsage":
+        return cls(
+            peak_rss=d["peak_rss"],
+            mean_rss=d["mean_rss"],
+            cpu_time=d["cpu_time"],
+            wall_time=d["wall_time"],
+            n_samples=d["n_samples"],
+        )
+
+
+def _read_proc_stat(pid: int) -> list[str]:
+    with open(f"/proc/{pid}/stat") as f:
+        # The fields after the command name, which is in parentheses and can contain spaces
+        return f.read().rsplit(")", 1)[1].split()
+
+
+def _get_children_from_proc(pid: int) -> list[int]:
+    parents: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            parents.setdefault(int(_read_proc_stat(int(entry))[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+
+    children, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            children.append(child)
+            stack.append(child)
+    return children
+
+
+def _sample_from_proc(pid: int, include_children: bool) -> tuple[int, float]:
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    pids = [pid] + (_get_children_from_proc(pid) if include_children else [])
+
+    rss, cpu_ticks = 0, 0
+    for i, sampled_pid in enumerate(pids):
+        try:
+            with open(f"/proc/{sampled_pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+            fields = _read_proc_stat(sampled_pid)
+        except OSError:
+            if i == 0:
+                raise
+            # A child exited between listing and reading it
+            continue
+        rss += resident_pages * page_size
+        # utime and stime, and cutime and cstime of waited-for children
+        cpu_ticks += sum(int(value) for value in fields[11:15])
+    return rss, cpu_ticks / clock_ticks
+
+
+def _sample_from_psutil(pid: int, include_children: bool) -> tuple[int, float]:
+    process = psutil.Process(pid)  # type: ignore
+    processes = [process] + (process.children(recursive=True) if include_children else [])
+
+    rss, cpu_time = 0, 0.0
+    for i, sampled_process in enumerate(processes):
+        try:
+            with sampled_process.oneshot():
+                sampled_rss = sampled_process.memory_info().rss
+                cpu_times = sampled_process.cpu_times()
+        except psutil.NoSuchProcess:  # type: ignore
+            if i == 0:
+                raise ProcessLookupError(pid)
+            continue
+        rss += sampled_rss
+        cpu_time += cpu_times.user + cpu_times.system
+        cpu_time += getattr(cpu_times, "children_user", 0.0)
+        cpu_time += getattr(cpu_times, "children_system", 0.0)
+    return rss, cpu_time
+
+
+def sample_process(pid: int, include_children: bool = True) -> tuple[int, float]:
+    """Resident set size [B] and CPU time [s] of a process, with psutil if it is installed
+
+    Raises
+    ------
+    OSError
+        If the process does not exist (`ProcessLookupError`)
+    """
+    if psutil is not None:
+        return _sample_from_psutil(pid, include_children)
+    return _sample_from_proc(pid, include_children)
+
+
+class ResourceSampler:
+    """Sample the memory and CPU time of a process in a background thread
+
+    Uses psutil if it is installed, and `/proc` otherwise. The CPU time is the difference between
+    the first and the last sample, so child processes that exit without being waited for by the
+    sampled process are only counted up to their last sample.
+
+    Parameters
+    ----------
+    pid : int, optional
+        The process to sample, this process by default
+    interval : float, optional
+        Time between samples [s]
+    include_children : bool, optional
+        Include the child processes (recursively) in the samples
+    """
+
+    def __init__(
+        self, pid: int | None = None, interval: float = 1.0, include_children: bool = True
+    ):
+        assert interval > 0, "Interval must be greater than 0."
+        self.pid = os.getpid() if pid is None else pid
+        self.interval = interval
+        self.include_children = include_children
+        self.usage: ResourceUsage | None = None
+
+        self._samples: list[tuple[int, float]] = []
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start_time = 0.0
+
+    def _sample(self):
+        try:
+            self._samples.append(sample_process(self.pid, self.include_children))
+        except OSError:
+            # The process exited, its last sample is kept
+            pass
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "ResourceSampler":
+        self._start_time = time.perf_counter()
+        self._sample()
+        self._thread.start()
+        return self
+
+    def stop(self) -> ResourceUsage:
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+        wall_time = time.perf_counter() - self._start_time
+
+        rss = [sample[0] for sample in self._samples]
+        self.usage = ResourceUsage(
+            peak_rss=max(rss, default=0),
+            mean_rss=sum(rss) / len(rss) if rss else 0.0,
+            cpu_time=self._samples[-1][1] - self._samples[0][1] if self._samples else 0.0,
+            wall_time=wall_time,
+            n_samples=len(self._samples),
+        )
+        return self.usage
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def get_output_sizes(directories: list[str], categories: dict[str, list[str]]) -> dict[str, int]:
+    """Bytes in the files below directories, per category
+
+    A file belongs to the first category with a pattern that matches its name, and to "other" if
+    none does. Missing directories are skipped, and directories inside other directories of the
+    list are only counted once.
+    """
+    directories = [os.path.abspath(directory) for directory in directories]
+    top_directories = {
+        directory
+        for directory in directories
+        if not any(
+            other != directory and os.path.commonpath([other, directory]) == other
+            for other in directories
+        )
+    }
+
+    sizes = {category: 0 for category in categories}
+    sizes["other"] = 0
+    for directory in sorted(top_directories):
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                category = next(
+                    (
+                        category
+                        for category, patterns in categories.items()
+                        if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns)
+                    ),
+                    "other",
+                )
+                sizes[category] += os.path.getsize(os.path.join(dirpath, filename))
+    return sizes
+
+
+def summarize_usages(usages: list[ResourceUsage]) -> dict[str, float]:
+    """Peak and average memory and CPU utilization over runs, e.g. the cases of a sweep"""
+    assert len(usages) > 0, "There must be at least one usage to summarize"
+    return {
+        "n_runs": len(usages),
+        "max_peak_rss": max(usage.peak_rss for usage in usages),
+        "mean_peak_rss": sum(usage.peak_rss for usage in usages) / len(usages),
+        "mean_rss": sum(usage.mean_rss for usage in usages) / len(usages),
+        "max_cpu_utilization": max(usage.cpu_utilization for usage in usages),
+        "mean_cpu_utilization": sum(usage.cpu_utilization for usage in usages) / len(usages),
+        "total_cpu_time": sum(usage.cpu_time for usage in usages),
+        "total_wall_time": sum(usage.wall_time for usage in usages),
+    }
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from cn.log import logger
+
+
+def _get_file_hash(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def copy_tree_verified(source_dir: str, target_dir: str):
+    """Copy a directory into another, verify the copies and remove the source
+
+    Every file is compared to its copy by size and SHA-256 before the source is removed, so the
+    source is kept if anything went wrong.
+
+    Raises
+    ------
+    IOError
+        If a copy does not match its source
+    """
+    for dirpath, _, filenames in os.walk(source_dir):
+        target_dirpath = os.path.join(target_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(target_dirpath, exist_ok=True)
+        for filename in filenames:
+            source_path = os.path.join(dirpath, filename)
+            target_path = os.path.join(target_dirpath, filename)
+            shutil.copy2(source_path, target_path)
+
+            if os.path.getsize(source_path) != os.path.getsize(target_path) or _get_file_hash(
+                source_path
+            ) != _get_file_hash(target_path):
+                raise IOError(f"Copy of '{source_path}' to '{target_path}' does not match")
+
+    shutil.rmtree(source_dir)
+    logger.debug(f"Copied '{source_dir}' to '{target_dir}'")
+
+
+class ScratchCopier:
+    """Copy finished scratch directories back to the data tree in the background
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Maximum number of concurrent copies
+    """
+
+    def __init__(self, max_workers: int = 1):
+        assert max_workers > 0, "Max workers must be greater than 0."
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures: list[Future] = []
+        self._lock = threading.Lock()
+
+    def copy_back(
+        self, scratch_dir: str, target_dir: str, on_done: Callable[[], None] | None = None
+    ) -> Future:
+        """Copy a scratch directory to its target with `copy_tree_verified`, then call `on_done`"""
+
+        def copy():
+            copy_tree_verified(scratch_dir, target_dir)
+            if on_done is not None:
+                on_done()
+
+        future = self._executor.submit(copy)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Wait for all copies, raising the first error"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
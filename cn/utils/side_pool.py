@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+
+def _lower_priority(niceness: int):
+    os.nice(niceness)
+
+
+class SidePool:
+    """A small pool of low-priority worker processes for jobs that run beside the main work
+
+    Workers are spawned (not forked), so they do not inherit the state of OpenMC or of running
+    threads, and are niced so they only use the CPU the main work leaves idle. Jobs and their
+    arguments must be picklable.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Number of worker processes
+    niceness : int, optional
+        Increment of the niceness of the workers
+    """
+
+    def __init__(self, max_workers: int = 1, niceness: int = 10):
+        assert max_workers > 0, "Max workers must be greater than 0."
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_priority,
+            initargs=(niceness,),
+        )
+        self._futures: list[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, job: Callable[..., Any], *args, **kwargs) -> Future:
+        future = self._executor.submit(job, *args, **kwargs)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def wait(self) -> list[Any]:
+        """Wait for all jobs and return their results, raising the first error"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        return [future.result() for future in futures]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
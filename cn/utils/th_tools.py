@@ -1,3 +1,7 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
 from iapws import IAPWS95
 
 
@@ -39,3 +43,109 @@ def get_vapor_quality_from_void_fraction(
     x = alpha / (alpha + (1 - alpha) * rho_l / rho_g * 1 / slip_ratio)
 
     return x
+
+
+@dataclass(frozen=True)
+class SaturationProperties:
+    """Properties of saturated water and steam at a pressure"""
+
+    P: float  # Pressure [MPa]
+    T: float  # Saturation temperature [K]
+    rho_l: float  # Density of saturated liquid [kg/m3]
+    rho_g: float  # Density of saturated vapor [kg/m3]
+    h_l: float  # Enthalpy of saturated liquid [kJ/kg]
+    h_g: float  # Enthalpy of saturated vapor [kJ/kg]
+
+    @property
+    def h_fg(self) -> float:
+        """Latent heat of vaporization [kJ/kg]"""
+        return self.h_g - self.h_l
+
+
+@lru_cache(maxsize=None)
+def get_saturation_properties(P: float) -> SaturationProperties:
+    """Get the saturation properties at a pressure
+
+    IAPWS95 is slow, so the properties are cached per pressure.
+
+    Args
+    ----
+    P: float
+        The pressure (MPa)
+
+    Returns
+    -------
+    SaturationProperties
+        The saturation properties
+    """
+    sat_liquid = IAPWS95(P=P, x=0)
+    sat_vapor = IAPWS95(P=P, x=1)
+
+    return SaturationProperties(
+        P=P,
+        T=sat_liquid.T,
+        rho_l=sat_liquid.rho,
+        rho_g=sat_vapor.rho,
+        h_l=sat_liquid.h,
+        h_g=sat_vapor.h,
+    )
+
+
+def get_void_fraction_from_vapor_quality(
+    x: np.ndarray, rho_l: float, rho_g: float, slip_ratio: float = 1
+) -> np.ndarray:
+    """Get the void fraction from the vapor quality with a slip ratio model
+    Inverse of `get_vapor_quality_from_void_fraction`, works on arrays.
+
+    Args
+    ----
+    x: np.ndarray
+        The vapor quality
+    rho_l: float
+        Density of saturated liquid (kg/m3)
+    rho_g: float
+        Density of saturated vapor (kg/m3)
+    slip_ratio: float
+        Ratio of the vapor velocity to the liquid velocity
+
+    Returns
+    -------
+    np.ndarray
+        The void fraction, alpha
+    """
+    x = np.asarray(x, dtype=float)
+    return x / (x + (1 - x) * rho_g / rho_l * slip_ratio)
+
+
+def get_void_fraction_drift_flux(
+    x: np.ndarray,
+    rho_l: float,
+    rho_g: float,
+    G: np.ndarray,
+    C0: float = 1.13,
+    V_gj: float = 0.24,
+) -> np.ndarray:
+    """Get the void fraction from the vapor quality with the Zuber-Findlay drift flux model
+
+    Args
+    ----
+    x: np.ndarray
+        The vapor quality
+    rho_l: float
+        Density of saturated liquid (kg/m3)
+    rho_g: float
+        Density of saturated vapor (kg/m3)
+    G: np.ndarray
+        The mass flux (kg/m2/s)
+    C0: float
+        The distribution parameter
+    V_gj: float
+        The drift velocity (m/s)
+
+    Returns
+    -------
+    np.ndarray
+        The void fraction, alpha
+    """
+    x = np.asarray(x, dtype=float)
+    return x / (C0 * (x + (1 - x) * rho_g / rho_l) + rho_g * V_gj / G)
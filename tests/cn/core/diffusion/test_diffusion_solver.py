@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.diffusion.diffusion_solver import solve_diffusion
+from cn.core.komodo.komodo_bwr_input_builder import (
+    KomodoBoundaries,
+    KomodoBoundaryCondition,
+)
+from cn.core.komodo.komodo_xsec import KomodoXsec
+
+
+@pytest.fixture
+def xsec():
+    return KomodoXsec(
+        sigtr=np.array([[0.22, 0.8], [0.21, 0.75]]),
+        siga=np.array([[0.01, 0.1], [0.012, 0.12]]),
+        nu_sigf=np.array([[0.007, 0.14], [0.006, 0.12]]),
+        sigf=np.array([[0.003, 0.06], [0.0025, 0.05]]),
+        chi=np.array([[1.0, 0.0], [1.0, 0.0]]),
+        sigs=np.array([[[0.0, 0.02], [0.0, 0.0]], [[0.0, 0.018], [0.0, 0.0]]]),
+    )
+
+
+def test_infinite_medium_keff(xsec: KomodoXsec):
+    core_geometry = CoreGeometry(4, 3, 15.0, 20.0, [4, 4, 4, 4])
+    material_maps = [np.ones((4, 4), dtype=int)] * 3
+    reflective = KomodoBoundaries(*[KomodoBoundaryCondition.REFLECTIVE] * 6)
+
+    komodo_output = solve_diffusion(core_geometry, material_maps, xsec, boundaries=reflective)
+
+    # Two group infinite medium multiplication factor, no up-scattering
+    sigr = xsec.get_sigr()[0]
+    k_inf = (xsec.nu_sigf[0, 0] + xsec.nu_sigf[0, 1] * xsec.sigs[0, 0, 1] / sigr[1]) / sigr[0]
+    assert komodo_output.keff == pytest.approx(k_inf, rel=1e-6)
+    np.testing.assert_allclose(komodo_output.power_3d, 1.0, rtol=1e-6)
+
+
+@pytest.mark.parametrize("core_layout", [[3, 5, 5, 5, 3], [2, 4, 4, 2]])
+def test_symmetric_solutions_match_full_core(xsec: KomodoXsec, core_layout: list[int]):
+    core_geometry = CoreGeometry(len(core_layout), 3, 15.0, 20.0, core_layout)
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    # Octant symmetric loading with a different material in the corners of the reduced core
+    core_map[0, :] = np.where(core_map[0, :] > 0, 2, 0)
+    core_map[-1, :] = core_map[0, :]
+    core_map[:, 0] = core_map[0, :]
+    core_map[:, -1] = core_map[0, :]
+    material_maps = [core_map] * 3
+
+    full = solve_diffusion(core_geometry, material_maps, xsec, CoreSymmetry.FULL)
+    for core_symmetry in [CoreSymmetry.QUARTER, CoreSymmetry.OCTANT]:
+        reduced = solve_diffusion(core_geometry, material_maps, xsec, core_symmetry)
+        assert reduced.keff == pytest.approx(full.keff, rel=1e-6)
+        np.testing.assert_allclose(reduced.power_3d, full.power_3d, rtol=1e-4, atol=1e-8)
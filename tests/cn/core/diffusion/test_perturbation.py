@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.diffusion.diffusion_solver import solve_diffusion
+from cn.core.diffusion.perturbation import get_reference_state, screen_perturbations
+from cn.core.komodo.komodo_xsec import KomodoXsec
+
+BASE_XSEC = {
+    "sigtr": np.array([0.22, 0.8]),
+    "siga": np.array([0.01, 0.1]),
+    "nu_sigf": np.array([0.007, 0.14]),
+    "sigf": np.array([0.003, 0.06]),
+    "chi": np.array([1.0, 0.0]),
+    "sigs": np.array([[0.0, 0.02], [0.0, 0.0]]),
+}
+
+
+def get_perturbed_xsec(perturbations: list[dict[str, float]]) -> KomodoXsec:
+    """Material 1 is the base, material i + 2 scales the cross sections of perturbation i"""
+    materials = [BASE_XSEC] + [
+        {name: values * (1 + perturbation.get(name, 0.0)) for name, values in BASE_XSEC.items()}
+        for perturbation in perturbations
+    ]
+    return KomodoXsec(**{name: np.stack([m[name] for m in materials]) for name in BASE_XSEC})
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(6, 4, 15.0, 20.0, [4, 6, 6, 6, 6, 4])
+
+
+@pytest.mark.parametrize("name", ["siga", "nu_sigf", "sigtr", "sigs"])
+def test_estimate_is_first_order(core_geometry: CoreGeometry, name: str):
+    xsec = get_perturbed_xsec([{name: 1e-3}])
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    reference_state = get_reference_state(core_geometry, [core_map] * 4, xsec)
+
+    candidate = core_map.copy()
+    candidate[1, 1] = candidate[2, 3] = 2
+    estimated_keff = reference_state.estimate_keffs([[candidate] * 4])[0]
+    keff = solve_diffusion(core_geometry, [candidate] * 4, xsec).keff
+
+    assert estimated_keff - reference_state.keff == pytest.approx(
+        keff - reference_state.keff, rel=1e-2
+    )
+
+
+def test_reference_state_is_saved(core_geometry: CoreGeometry, tmp_path):
+    xsec = get_perturbed_xsec([{"siga": 1e-3}])
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    reference_path = str(tmp_path / "reference.npz")
+
+    solved = get_reference_state(
+        core_geometry, [core_map] * 4, xsec, CoreSymmetry.QUARTER, reference_path=reference_path
+    )
+    loaded = get_reference_state(
+        core_geometry, [core_map] * 4, xsec, CoreSymmetry.QUARTER, reference_path=reference_path
+    )
+
+    assert loaded.keff == solved.keff
+    np.testing.assert_array_equal(loaded.adjoint_flux, solved.adjoint_flux)
+    np.testing.assert_array_equal(loaded.material_worths, solved.material_worths)
+
+
+def test_reference_state_is_solved_again_for_other_inputs(core_geometry: CoreGeometry, tmp_path):
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    perturbed_map = core_map.copy()
+    perturbed_map[2, 2] = 2
+    reference_path = str(tmp_path / "reference.npz")
+
+    # Same shapes as the saved solution, but other cross sections or material maps
+    inputs = [
+        ([perturbed_map] * 4, get_perturbed_xsec([{"siga": 1e-3}])),
+        ([perturbed_map] * 4, get_perturbed_xsec([{"siga": 1e-1}])),
+        ([core_map] * 4, get_perturbed_xsec([{"siga": 1e-1}])),
+    ]
+    for material_maps, xsec in inputs:
+        reference_state = get_reference_state(
+            core_geometry, material_maps, xsec, reference_path=reference_path
+        )
+        assert reference_state.keff == get_reference_state(core_geometry, material_maps, xsec).keff
+
+    assert len({get_reference_state(core_geometry, *inp).keff for inp in inputs}) == 3
+
+
+def test_screening_solves_the_best_candidates(core_geometry: CoreGeometry):
+    # Materials with a larger fission cross section are worth more
+    xsec = get_perturbed_xsec([{"nu_sigf": eps} for eps in [-2e-3, 1e-3, 3e-3, 2e-3]])
+    core_map = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    reference_state = get_reference_state(core_geometry, [core_map] * 4, xsec, CoreSymmetry.OCTANT)
+
+    candidates = []
+    for material in [2, 3, 4, 5]:
+        candidate = core_map.copy()
+        candidate[2:4, 2:4] = material
+        candidates.append([candidate] * 4)
+
+    def forward_solver(material_maps: list[np.ndarray]):
+        return solve_diffusion(core_geometry, material_maps, xsec, CoreSymmetry.OCTANT)
+
+    screening = screen_perturbations(reference_state, candidates, forward_solver, 2)
+
+    assert screening.n_forward_solves == 2
+    assert set(screening.solutions) == {2, 3}
+    for candidate, komodo_output in screening.solutions.items():
+        assert komodo_output.keff == pytest.approx(screening.estimated_keffs[candidate], abs=1e-5)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry
+from cn.core.core_state_store import CoreStateStore
+from cn.core.core_th import CoreThConditions
+from cn.core.diffusion.diffusion_solver import get_diffusion_core_solver
+from cn.core.komodo.komodo_bwr_deplete_cycle import (
+    deplete_cycle,
+    get_node_burnup_increment,
+)
+from cn.core.komodo.komodo_xsec_library import KomodoXsecLibrary
+
+VOIDS = np.array([0.0, 0.4, 0.8])
+EXPOSURES = np.array([0.0, 20.0, 40.0])
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 6, 15.0, 60.0, [2, 4, 4, 2])
+
+
+@pytest.fixture
+def library():
+    # Less moderation with more void, less fission with more exposure
+    density = 1 - VOIDS[:, None, None]
+    depletion = 1 - 0.01 * EXPOSURES[None, :, None]
+    ones = np.ones((len(VOIDS), len(EXPOSURES), 1))
+    table = np.concatenate(
+        [
+            np.stack(
+                [0.2 + 0.05 * density * ones, 0.01 * ones, 0.007 * depletion * ones]
+                + [0.003 * depletion * ones, ones, 0 * ones, 0.01 + 0.015 * density * ones],
+                axis=-1,
+            ),
+            np.stack(
+                [0.7 + 0.2 * density * ones, 0.1 * ones, 0.14 * depletion * ones]
+                + [0.06 * depletion * ones, 0 * ones, 0 * ones, 0 * ones],
+                axis=-1,
+            ),
+        ],
+        axis=2,
+    )
+    return KomodoXsecLibrary(VOIDS, EXPOSURES, table)
+
+
+def test_get_node_burnup_increment(core_geometry: CoreGeometry):
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    power = np.where(assembly_mask, np.linspace(0.5, 1.5, 6)[:, None, None], 0.0)
+
+    increment = get_node_burnup_increment(core_geometry, power, 2.0)
+
+    assert increment[:, assembly_mask].mean() == pytest.approx(2.0)
+    assert np.all(increment[:, ~assembly_mask] == 0)
+    assert increment[-1, 1, 1] == pytest.approx(3.0)
+
+
+def test_deplete_cycle(core_geometry: CoreGeometry, library: KomodoXsecLibrary, tmp_path):
+    segment = np.zeros((6, 4, 4), dtype=int)
+
+    def core_solver_factory(case_step: int, exposure: np.ndarray):
+        return get_diffusion_core_solver(core_geometry, [library], segment, exposure)
+
+    with CoreStateStore.create(str(tmp_path / "history.h5"), core_geometry) as core_state_store:
+        result = deplete_cycle(
+            core_geometry,
+            core_solver_factory,
+            CoreThConditions(core_power=12 * 4.0e6, core_flow=12 * 15.0),
+            cycle_burnups=[0.0, 5.0, 10.0],
+            initial_exposure=np.zeros((6, 4, 4)),
+            core_state_store=core_state_store,
+        )
+
+    assert np.all(np.diff(result.keffs) < 0)
+    assert np.all(result.n_core_solves > 1)
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    assert result.final_exposure[:, assembly_mask].mean() == pytest.approx(10.0)
+
+    with CoreStateStore(str(tmp_path / "history.h5")) as core_state_store:
+        assert len(core_state_store) == 3
+        np.testing.assert_allclose(core_state_store.get_history("keff"), result.keffs)
+        np.testing.assert_allclose(core_state_store.get_history("cycle_burnup"), [0, 5, 10])
+        assert core_state_store.get_radial("exposure", 0, 3).max() == 0
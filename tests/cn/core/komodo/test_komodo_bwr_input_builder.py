@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.komodo.komodo_bwr_input_builder import (
+    KomodoInputBuilder,
+    KomodoMode,
+    run_length_encode,
+)
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 5, 12.0, 20.0, [2, 4, 4, 2])
+
+
+def test_run_length_encode():
+    assert run_length_encode([1, 1, 1, 2, 2, 1]) == ["3*1", "2*2", "1*1"]
+    assert run_length_encode([]) == []
+
+
+def test_set_geom_writes_unique_planes_once(core_geometry: CoreGeometry):
+    plane_1 = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    plane_2 = core_geometry.get_core_map(fill_value=2, empty_value=0)
+
+    komodo_input_builder = KomodoInputBuilder()
+    komodo_input_builder.set_geom(core_geometry, [plane_1, plane_1, plane_2, plane_2, plane_1])
+
+    komodo_input = komodo_input_builder.build()
+    geom_lines = komodo_input.splitlines()
+    assert geom_lines[9] == "2"
+    assert geom_lines[10] == "2*1 2*2 1*1"
+    assert komodo_input.count("! Material map (planar type)") == 2
+
+    material_map_idx = geom_lines.index("! Material map (planar type) 2")
+    planar_map = np.loadtxt(geom_lines[material_map_idx + 1 : material_map_idx + 5], dtype=int)
+    np.testing.assert_array_equal(planar_map, plane_2.astype(int))
+
+
+def test_write_matches_build(core_geometry: CoreGeometry, tmp_path):
+    komodo_input_builder = KomodoInputBuilder()
+    komodo_input_builder.set_mode(KomodoMode.FORWARD)
+    komodo_input_builder.set_geom(
+        core_geometry,
+        [core_geometry.get_core_map(fill_value=1, empty_value=0)] * core_geometry.axial_nodes,
+    )
+    komodo_input_builder.set_outp()
+
+    komodo_input_path = tmp_path / "komodo.inp"
+    komodo_input_builder.write(str(komodo_input_path))
+
+    assert komodo_input_path.read_text() == komodo_input_builder.build()
+
+
+def test_set_crod_and_bcon(core_geometry: CoreGeometry):
+    bank_map = np.zeros((4, 4), dtype=int)
+    bank_map[1:3, 1:3] = 1
+    xsec_changes = np.zeros((2, 2, 6))
+    xsec_changes[:, 1, 1] = 0.01
+
+    komodo_input_builder = KomodoInputBuilder()
+    komodo_input_builder.set_crod(
+        core_geometry,
+        bank_map,
+        [12.0],
+        0.0,
+        5.0,
+        20,
+        xsec_changes,
+        core_symmetry=CoreSymmetry.QUARTER,
+    )
+    komodo_input_builder.set_bcon(500.0, 0.0, xsec_changes)
+
+    komodo_input = komodo_input_builder.build()
+    crod_lines = komodo_input.split("%CROD\n")[1].splitlines()
+    assert crod_lines[1] == "1 20"
+    assert crod_lines[5] == "12.0"
+    # Bank map of the south-east quadrant
+    assert crod_lines[7:9] == ["1 0", "0 0"]
+    assert crod_lines[10] == "2"
+    assert komodo_input.count("! MAT") == 4
+    assert "%BCON\n" in komodo_input
+
+    with pytest.raises(AssertionError):
+        komodo_input_builder.set_crod(core_geometry, bank_map, [25.0], 0.0, 5.0, 20, xsec_changes)
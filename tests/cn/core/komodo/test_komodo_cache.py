@@ -0,0 +1,116 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from cn.core.komodo.komodo_cache import KomodoCache, get_hashable_komodo_input
+from cn.core.komodo.komodo_parser import KomodoOutput
+
+
+def get_komodo_input(case_name: str, xsec_path: str, material: int = 1) -> str:
+    return f"""\
+! Case card
+%CASE
+{case_name}
+CASE {case_name}, STEP 0, ITERATION 0
+
+! XSEC CARD
+%XSEC
+FILE {xsec_path}
+
+! Geometry control card
+%GEOM
+1 1 1
+{material}
+"""
+
+
+@pytest.fixture
+def xsec_path(tmp_path):
+    xsec_path = tmp_path / "komodo_XSEC.txt"
+    xsec_path.write_text("2 1\n1 2 3 4 5 6 7\n")
+    return str(xsec_path)
+
+
+def get_komodo_output(keff: float) -> KomodoOutput:
+    return KomodoOutput(keff=keff, iterations=np.zeros((0, 4)), node_maps={"3d_power": np.ones(3)})
+
+
+def test_get_hashable_komodo_input(xsec_path: str):
+    hashable_input, xsec_paths = get_hashable_komodo_input(get_komodo_input("A", xsec_path))
+
+    assert xsec_paths == [xsec_path]
+    assert "CASE A" not in hashable_input
+    assert xsec_path not in hashable_input
+    assert "%GEOM" in hashable_input
+
+
+def test_komodo_cache_hit_ignores_case_name(xsec_path: str, tmp_path):
+    komodo_cache = KomodoCache(str(tmp_path / "cache"))
+
+    assert komodo_cache.get(get_komodo_input("A", xsec_path)) is None
+    komodo_cache.put(get_komodo_input("A", xsec_path), get_komodo_output(1.1))
+
+    komodo_output = komodo_cache.get(get_komodo_input("B", xsec_path))
+    assert komodo_output is not None
+    assert komodo_output.keff == 1.1
+    np.testing.assert_array_equal(komodo_output.power_3d, np.ones(3))
+
+    assert komodo_cache.get(get_komodo_input("A", xsec_path, material=2)) is None
+
+
+def test_komodo_cache_misses_on_changed_xsec(xsec_path: str, tmp_path):
+    komodo_cache = KomodoCache(str(tmp_path / "cache"))
+    komodo_cache.put(get_komodo_input("A", xsec_path), get_komodo_output(1.1))
+
+    with open(xsec_path, "a") as f:
+        f.write("1 2 3 4 5 6 7\n")
+
+    assert komodo_cache.get(get_komodo_input("A", xsec_path)) is None
+
+
+def test_komodo_cache_evicts_least_recently_used(xsec_path: str, tmp_path):
+    komodo_cache = KomodoCache(str(tmp_path / "cache"), max_entries=2)
+
+    for material in [1, 2]:
+        komodo_input = get_komodo_input("A", xsec_path, material=material)
+        komodo_cache.put(komodo_input, get_komodo_output(material))
+        entry_path = os.path.join(
+            komodo_cache.cache_dir, f"{komodo_cache.get_key(komodo_input)}.pkl"
+        )
+        os.utime(entry_path, (material, material))
+
+    komodo_cache.put(get_komodo_input("A", xsec_path, material=3), get_komodo_output(3))
+
+    assert komodo_cache.get(get_komodo_input("A", xsec_path, material=1)) is None
+    assert komodo_cache.get(get_komodo_input("A", xsec_path, material=2)) is not None
+    assert komodo_cache.get(get_komodo_input("A", xsec_path, material=3)) is not None
+
+
+def test_komodo_cache_concurrent_put(xsec_path: str, tmp_path):
+    komodo_cache = KomodoCache(str(tmp_path / "cache"))
+    komodo_input = get_komodo_input("A", xsec_path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                lambda keff: komodo_cache.put(komodo_input, get_komodo_output(keff)), range(8)
+            )
+        )
+
+    assert komodo_cache.get(komodo_input) is not None
+    assert [name for name in os.listdir(komodo_cache.cache_dir) if name.endswith(".tmp")] == []
+
+
+def test_komodo_cache_removes_unreadable_entries(xsec_path: str, tmp_path):
+    komodo_cache = KomodoCache(str(tmp_path / "cache"))
+    komodo_input = get_komodo_input("A", xsec_path)
+    komodo_cache.put(komodo_input, get_komodo_output(1.1))
+
+    entry_path = os.path.join(komodo_cache.cache_dir, f"{komodo_cache.get_key(komodo_input)}.pkl")
+    with open(entry_path, "r+b") as f:
+        f.truncate(10)
+
+    assert komodo_cache.get(komodo_input) is None
+    assert not os.path.exists(entry_path)
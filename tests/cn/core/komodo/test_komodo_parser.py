@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry
+from cn.core.komodo.komodo_parser import (
+    komodo_out_3d_power_map,
+    read_komodo_main_output,
+    read_komodo_output,
+)
+
+MAIN_OUTPUT = """\
+  ==============================================================================
+                          CALCULATION RESULTS
+    Itr     k-eff     Fis.Src Error   Inner Error
+  ----------------------------------------------------
+      1    1.012345    1.00000E+00    2.00000E-01
+      2    1.023456    1.00000E-02    2.00000E-03
+      3    1.023457    1.00000E-06    2.00000E-07
+
+  MULTIPLICATION EFFECTIVE (K-EFF) =  1.023457
+"""
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 3, 12.0, 20.0, [2, 4, 4, 2])
+
+
+def write_node_map_out(path, core_geometry: CoreGeometry, node_maps: np.ndarray):
+    lines = ["  Output of a node-wise map"]
+    for z_idx, node_map in enumerate(node_maps):
+        lines.append(f"    z = {z_idx + 1}")
+        lines.append("          " + " ".join(f"{i + 1:>7}" for i in range(core_geometry.core_size)))
+        for row_idx, row in enumerate(node_map):
+            values = " ".join(f"{value:7.4f}" for value in row if value != 0)
+            lines.append(f"{row_idx + 1:>8} {values}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_read_komodo_output(core_geometry: CoreGeometry, tmp_path):
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    rng = np.random.default_rng(0)
+    power = np.where(assembly_mask, rng.uniform(0.5, 1.5, (3, 4, 4)), 0.0).round(4)
+
+    komodo_input_path = tmp_path / "komodo.inp"
+    (tmp_path / "komodo.inp.out").write_text(MAIN_OUTPUT)
+    write_node_map_out(tmp_path / "komodo.inp_3d_power.out", core_geometry, power)
+    (tmp_path / "komodo.inp_axial_power.out").write_text("  Axial power\n 1 0.9\n 2 1.2\n 3 0.9\n")
+
+    komodo_output = read_komodo_output(core_geometry, str(komodo_input_path))
+
+    assert komodo_output.keff == pytest.approx(1.023457)
+    assert komodo_output.iterations.shape == (3, 4)
+    np.testing.assert_allclose(komodo_output.iterations[:, 1], [1.012345, 1.023456, 1.023457])
+    np.testing.assert_allclose(komodo_output.power_3d, power)
+    np.testing.assert_allclose(komodo_output.other_outputs["axial_power"], [1, 0.9, 2, 1.2, 3, 0.9])
+
+    power_maps = komodo_out_3d_power_map(core_geometry, str(tmp_path / "komodo.inp_3d_power.out"))
+    assert len(power_maps) == 3
+    np.testing.assert_allclose(power_maps[1], power[1])
+
+
+def test_read_komodo_main_output_without_keff_line(tmp_path):
+    komodo_out_path = tmp_path / "komodo.inp.out"
+    komodo_out_path.write_text(MAIN_OUTPUT.split("  MULTIPLICATION")[0])
+
+    keff, iterations = read_komodo_main_output(str(komodo_out_path))
+
+    assert keff == pytest.approx(1.023457)
+    assert len(iterations) == 3
+
+
+def test_read_komodo_output_falls_back_for_group_blocks(core_geometry: CoreGeometry, tmp_path):
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    power = np.where(assembly_mask, 1.0, 0.0) * np.ones((3, 4, 4))
+    # One block per group and axial node
+    flux = np.concatenate([power, 2 * power])
+
+    komodo_input_path = tmp_path / "komodo.inp"
+    write_node_map_out(tmp_path / "komodo.inp_3d_power.out", core_geometry, power)
+    write_node_map_out(tmp_path / "komodo.inp_3d_flux.out", core_geometry, flux)
+
+    komodo_output = read_komodo_output(core_geometry, str(komodo_input_path))
+
+    np.testing.assert_allclose(komodo_output.power_3d, power)
+    assert "3d_flux" not in komodo_output.node_maps
+    assert komodo_output.other_outputs["3d_flux"].size > 2 * 12 * 3
@@ -0,0 +1,117 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from cn.core.komodo.komodo_runner import KomodoRunPool, KomodoRunStatus
+
+# Stand-in for the KOMODO executable, behaving according to the input contents
+FAKE_KOMODO = f"""\
+#!{sys.executable}
+import sys
+import time
+
+komodo_input_path = sys.argv[1]
+komodo_input = open(komodo_input_path).read()
+if "SLEEP" in komodo_input:
+    time.sleep(10)
+if "BUSY" in komodo_input:
+    memory = bytearray(100_000_000)
+    end_time = time.perf_counter() + 0.5
+    while time.perf_counter() < end_time:
+        pass
+if "FAIL" in komodo_input:
+    print("ERROR IN INPUT")
+    sys.exit(1)
+print("a warning", file=sys.stderr)
+with open(komodo_input_path + ".out", "w") as f:
+    f.write("  MULTIPLICATION EFFECTIVE (K-EFF) =  1.000000\\n")
+print("KOMODO EXIT NORMALLY")
+"""
+
+
+@pytest.fixture
+def fake_komodo(tmp_path):
+    fake_komodo_path = tmp_path / "komodo"
+    fake_komodo_path.write_text(FAKE_KOMODO)
+    fake_komodo_path.chmod(fake_komodo_path.stat().st_mode | stat.S_IEXEC)
+    return str(fake_komodo_path)
+
+
+def write_input(tmp_path, name: str, content: str) -> str:
+    komodo_input_path = tmp_path / "inputs" / f"{name}.inp"
+    komodo_input_path.parent.mkdir(exist_ok=True)
+    komodo_input_path.write_text(content)
+    return str(komodo_input_path)
+
+
+def test_komodo_run_pool(fake_komodo: str, tmp_path):
+    komodo_input_paths = [
+        write_input(tmp_path, "ok_1", "FORWARD"),
+        write_input(tmp_path, "fail", "FAIL"),
+        write_input(tmp_path, "ok_2", "FORWARD"),
+        write_input(tmp_path, "sleep", "SLEEP"),
+    ]
+
+    komodo_run_pool = KomodoRunPool(
+        max_workers=4,
+        timeout=2,
+        komodo_executable=fake_komodo,
+        work_dir=str(tmp_path / "runs"),
+    )
+    results = komodo_run_pool.run(komodo_input_paths)
+
+    assert [result.status for result in results] == [
+        KomodoRunStatus.SUCCESS,
+        KomodoRunStatus.FAILED,
+        KomodoRunStatus.SUCCESS,
+        KomodoRunStatus.TIMEOUT,
+    ]
+    assert results[0].work_dir != results[2].work_dir
+    assert os.path.exists(f"{results[0].run_input_path}.out")
+    with open(results[0].stderr_path) as f:
+        assert "a warning" in f.read()
+    assert results[1].returncode == 1
+    assert results[3].runtime < 10
+
+
+def test_komodo_run_pool_missing_executable(tmp_path):
+    komodo_run_pool = KomodoRunPool(max_workers=1, komodo_executable=str(tmp_path / "missing"))
+
+    result = komodo_run_pool.run_one(write_input(tmp_path, "case", "FORWARD"))
+
+    assert result.status is KomodoRunStatus.FAILED
+    assert result.work_dir == str(tmp_path / "inputs" / "case")
+
+
+def test_komodo_run_pool_keeps_foreign_directories(fake_komodo: str, tmp_path):
+    komodo_input_path = write_input(tmp_path, "case", "FORWARD")
+    foreign_file = tmp_path / "inputs" / "case" / "results.txt"
+    foreign_file.parent.mkdir()
+    foreign_file.write_text("not from KOMODO")
+
+    komodo_run_pool = KomodoRunPool(max_workers=1, komodo_executable=fake_komodo)
+    with pytest.raises(FileExistsError):
+        komodo_run_pool.run_one(komodo_input_path)
+    assert foreign_file.exists()
+
+    foreign_file.unlink()
+    assert komodo_run_pool.run_one(komodo_input_path).success
+    # Reruns replace the directories the pool created itself
+    assert komodo_run_pool.run_one(komodo_input_path).success
+
+
+def test_komodo_run_pool_samples_resources(fake_komodo: str, tmp_path):
+    komodo_run_pool = KomodoRunPool(
+        max_workers=1, komodo_executable=fake_komodo, sample_resources=True
+    )
+
+    result = komodo_run_pool.run_one(write_input(tmp_path, "busy", "BUSY"))
+
+    assert result.success
+    assert result.resources is not None
+    assert result.resources.n_samples > 1
+    assert result.resources.peak_rss > 100_000_000
+    assert result.resources.cpu_utilization > 0.5
+    assert komodo_run_pool.run_one(write_input(tmp_path, "ok", "FORWARD")).resources is not None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.komodo.komodo_bwr_input_builder import (
+    KomodoBoundaries,
+    KomodoBoundaryCondition,
+    KomodoInputBuilder,
+)
+from cn.core.komodo.komodo_parser import komodo_out_3d_power_map
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(5, 2, 12.0, 20.0, [3, 5, 5, 5, 3])
+
+
+def write_3d_power_out(path, blocks: list[list[list[float]]]):
+    lines = []
+    for z_idx, block in enumerate(blocks):
+        lines.append(f"    z = {z_idx + 1}")
+        lines.append("          1       2       3")
+        for row_idx, row in enumerate(block):
+            lines.append(f"{row_idx + 1:>6}  " + " ".join(f"{value:.3f}" for value in row))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_boundaries_for_quarter_symmetry():
+    boundaries = KomodoBoundaries.for_symmetry(CoreSymmetry.QUARTER)
+
+    assert boundaries.west is KomodoBoundaryCondition.REFLECTIVE
+    assert boundaries.north is KomodoBoundaryCondition.REFLECTIVE
+    assert boundaries.east is KomodoBoundaryCondition.ZERO_INCOMING_CURRENT
+    assert boundaries.south is KomodoBoundaryCondition.ZERO_INCOMING_CURRENT
+
+
+def test_set_geom_quarter_core(core_geometry: CoreGeometry):
+    komodo_input_builder = KomodoInputBuilder()
+    komodo_input_builder.set_geom(
+        core_geometry,
+        material_maps=[core_geometry.get_core_map(fill_value=1, empty_value=0)]
+        * core_geometry.axial_nodes,
+        core_symmetry=CoreSymmetry.QUARTER,
+    )
+
+    geom_lines = komodo_input_builder.build().splitlines()
+    assert geom_lines[2] == "3 3 2"
+    assert geom_lines[3] == "1*6.0 2*12.0"
+    assert geom_lines[-1].split() == ["1", "2", "2", "1", "1", "1"]
+
+
+def test_komodo_out_3d_power_map_unfolds_quarter_core(core_geometry: CoreGeometry, tmp_path):
+    # The south-east quadrant has 3, 3 and 2 assemblies per row
+    block = [[1.0, 1.1, 1.2], [1.1, 1.0, 0.9], [1.2, 0.9]]
+    komodo_out_path = tmp_path / "komodo.inp_3d_power.out"
+    write_3d_power_out(komodo_out_path, [block, block])
+
+    power_maps = komodo_out_3d_power_map(
+        core_geometry, str(komodo_out_path), core_symmetry=CoreSymmetry.QUARTER
+    )
+
+    assert len(power_maps) == core_geometry.axial_nodes
+    np.testing.assert_allclose(power_maps[0][2], [1.2, 1.1, 1.0, 1.1, 1.2])
+    np.testing.assert_allclose(power_maps[0][0], [0.0, 0.9, 1.2, 0.9, 0.0])
+    np.testing.assert_allclose(power_maps[0], power_maps[0][::-1])
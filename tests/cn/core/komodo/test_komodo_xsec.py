@@ -0,0 +1,39 @@
+import numpy as np
+
+from cn.core.komodo.komodo_xsec import KomodoXsec
+
+XSEC = """\
+2  2    ! Number of groups and number of materials
+! sigtr    siga    nu*sigf   sigf     chi     sigs_g1  sigs_g2
+0.222222 0.010000 0.007000 0.003000 1.000000 0.000000 0.020000
+0.833333 0.100000 0.140000 0.060000 0.000000 0.000000 0.000000 ! UO2 0.0 GWd/tHM
+0.222222 0.012000 0.006000 0.002500 1.000000 0.000000 0.018000
+0.833333 0.110000 0.130000 0.055000 0.000000 0.001000 0.000000 ! UO2 10.0 GWd/tHM
+"""
+
+
+def test_read_komodo_xsec(tmp_path):
+    xsec_path = tmp_path / "komodo_XSEC.txt"
+    xsec_path.write_text(XSEC)
+
+    xsec = KomodoXsec.read(str(xsec_path))
+
+    assert xsec.n_materials == 2
+    assert xsec.n_groups == 2
+    np.testing.assert_allclose(xsec.siga, [[0.01, 0.1], [0.012, 0.11]])
+    np.testing.assert_allclose(xsec.sigs[1], [[0.0, 0.018], [0.001, 0.0]])
+    assert xsec.material_comments == ["UO2 0.0 GWd/tHM", "UO2 10.0 GWd/tHM"]
+    np.testing.assert_allclose(xsec.get_sigr(), [[0.03, 0.1], [0.03, 0.111]])
+
+
+def test_komodo_xsec_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    table = rng.uniform(0.0, 1.0, (3, 2, 7)).round(6)
+    xsec = KomodoXsec.from_table(table, ["A", "B", "C"])
+
+    xsec_path = tmp_path / "xsec" / "komodo_XSEC.txt"
+    xsec.write(str(xsec_path))
+    xsec_read = KomodoXsec.read(str(xsec_path))
+
+    np.testing.assert_allclose(xsec_read.to_table(), table)
+    assert xsec_read.material_comments == ["A", "B", "C"]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.komodo.komodo_bwr_input_builder import KomodoInputBuilder
+from cn.core.komodo.komodo_xsec import KomodoXsec
+from cn.core.komodo.komodo_xsec_library import KomodoXsecLibrary, quantize_node_xsec
+
+VOIDS = [0.0, 0.4, 0.8]
+EXPOSURES = [0.0, 10.0, 20.0, 40.0]
+
+
+@pytest.fixture
+def library():
+    rng = np.random.default_rng(0)
+    table = rng.uniform(0.01, 1.0, (len(VOIDS), len(EXPOSURES), 2, 7)).round(6)
+    return KomodoXsecLibrary(np.array(VOIDS), np.array(EXPOSURES), table)
+
+
+def test_from_xsec(library: KomodoXsecLibrary):
+    # Materials in the order and with the comments of get_komodo_XSEC
+    material_comments = [
+        f"MAT {idx + 1}: {void} void, exposure: {exposure} MWd/kg, power: 40.0 W"
+        for idx, (void, exposure) in enumerate(
+            (void, exposure) for void in VOIDS for exposure in EXPOSURES
+        )
+    ]
+    xsec = KomodoXsec.from_table(library.table.reshape(-1, 2, 7), material_comments)
+
+    library_read = KomodoXsecLibrary.from_xsec(xsec)
+
+    np.testing.assert_allclose(library_read.voids, VOIDS)
+    np.testing.assert_allclose(library_read.exposures, EXPOSURES)
+    np.testing.assert_allclose(library_read.table, library.table)
+
+
+def test_interpolate(library: KomodoXsecLibrary):
+    np.testing.assert_allclose(library.interpolate(0.4, 10.0), library.table[1, 1])
+    np.testing.assert_allclose(
+        library.interpolate(0.2, 30.0),
+        library.table[:2, 2:].mean(axis=(0, 1)),
+    )
+    # Clamped outside the grid
+    np.testing.assert_allclose(library.interpolate(0.9, 50.0), library.table[-1, -1])
+
+    void = np.full((3, 4, 4), 0.6)
+    assert library.interpolate(void, 5.0).shape == (3, 4, 4, 2, 7)
+
+
+def test_get_node_xsec(library: KomodoXsecLibrary):
+    core_geometry = CoreGeometry(4, 3, 15.0, 20.0, [2, 4, 4, 2])
+    axial_void = np.array([0.0, 0.3, 0.6])[:, None, None]
+    void = np.broadcast_to(axial_void, (3, 4, 4)).copy()
+    exposure = np.full((3, 4, 4), 15.0)
+    exposure[:, 1:3, 1:3] = 5.0
+
+    xsec, material_maps = library.get_node_xsec(core_geometry, void, exposure)
+
+    # Two exposures at three voids
+    assert xsec.n_materials == 6
+    material_map_3d = np.array(material_maps)
+    assert material_map_3d[0, 0, 0] == 0
+    node_table = xsec.to_table()[material_map_3d[1, 1, 2] - 1]
+    np.testing.assert_allclose(node_table, library.interpolate(0.3, 5.0), atol=1e-6)
+
+    komodo_input_builder = KomodoInputBuilder()
+    komodo_input_builder.set_geom(core_geometry, material_maps, core_symmetry=CoreSymmetry.OCTANT)
+
+
+def test_quantize_node_xsec(library: KomodoXsecLibrary):
+    core_geometry = CoreGeometry(4, 6, 15.0, 20.0, [2, 4, 4, 2])
+    rng = np.random.default_rng(1)
+    # Nodes close to a few void and exposure states
+    void = np.linspace(0.0, 0.75, 6)[:, None, None] + rng.uniform(0.0, 0.01, (6, 4, 4))
+    exposure = rng.choice([5.0, 25.0], (1, 4, 4)) + rng.uniform(0.0, 0.5, (6, 4, 4))
+    segment = np.zeros((6, 4, 4), dtype=int)
+    segment[3:] = 1
+    libraries = [library, KomodoXsecLibrary(library.voids, library.exposures, 2 * library.table)]
+
+    xsec, material_maps = quantize_node_xsec(
+        core_geometry, libraries, segment, void, exposure, xs_tolerance=0.05
+    )
+
+    material_map_3d = np.array(material_maps)
+    assembly_mask = material_map_3d > 0
+    assert xsec.n_materials < np.count_nonzero(assembly_mask) / 2
+    node_table = np.where(
+        segment[..., None, None] == 0,
+        library.interpolate(void, exposure),
+        2 * library.interpolate(void, exposure),
+    )[assembly_mask]
+    scale = np.abs(node_table).max(axis=0)
+    material_table = xsec.to_table()[material_map_3d[assembly_mask] - 1]
+    assert np.all(np.abs(material_table - node_table) <= 0.05 * scale + 1e-12)
+
+    xsec_bounded, _ = quantize_node_xsec(
+        core_geometry, libraries, segment, void, exposure, xs_tolerance=0.05, max_materials=5
+    )
+    assert xsec_bounded.n_materials <= 5
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+
+
+@pytest.fixture
+def even_core_geometry():
+    return CoreGeometry(6, 4, 12.0, 20.0, [2, 4, 6, 6, 4, 2])
+
+
+@pytest.fixture
+def odd_core_geometry():
+    return CoreGeometry(5, 4, 12.0, 20.0, [3, 5, 5, 5, 3])
+
+
+@pytest.mark.parametrize("core_symmetry", [CoreSymmetry.QUARTER, CoreSymmetry.OCTANT])
+@pytest.mark.parametrize("core_geometry_name", ["even_core_geometry", "odd_core_geometry"])
+def test_reduce_and_unfold_map(
+    request: pytest.FixtureRequest, core_geometry_name: str, core_symmetry: CoreSymmetry
+):
+    core_geometry: CoreGeometry = request.getfixturevalue(core_geometry_name)
+    assert core_geometry.supports_symmetry(core_symmetry)
+
+    reduced_size = core_geometry.get_reduced_size(core_symmetry)
+    # Octant symmetric values, given by the distance from the core center
+    center = (core_geometry.core_size - 1) / 2
+    i, j = np.indices((core_geometry.core_size, core_geometry.core_size))
+    core_map = np.abs(i - center) + np.abs(j - center) + np.abs(i - center) * np.abs(j - center)
+
+    reduced_map = core_geometry.reduce_map(core_map, core_symmetry, empty_value=-1.0)
+    assert reduced_map.shape == (reduced_size, reduced_size)
+    if core_symmetry is CoreSymmetry.OCTANT:
+        assert np.all(reduced_map[np.tril_indices(reduced_size, k=-1)] == -1.0)
+
+    np.testing.assert_array_equal(core_geometry.unfold_map(reduced_map, core_symmetry), core_map)
+
+
+def test_reduce_map_rejects_asymmetric_map(even_core_geometry: CoreGeometry):
+    core_map = even_core_geometry.get_core_map(empty_value=-1)
+
+    with pytest.raises(AssertionError):
+        even_core_geometry.reduce_map(core_map, CoreSymmetry.QUARTER)
+
+
+def test_supports_symmetry():
+    core_geometry = CoreGeometry(4, 1, 12.0, 20.0, [2, 4, 4, 4])
+
+    assert core_geometry.supports_symmetry(CoreSymmetry.FULL)
+    assert not core_geometry.supports_symmetry(CoreSymmetry.QUARTER)
+    assert not core_geometry.supports_symmetry(CoreSymmetry.OCTANT)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry
+from cn.core.core_state_store import CoreStateStore
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 5, 15.0, 20.0, [2, 4, 4, 2])
+
+
+def test_core_state_store(core_geometry: CoreGeometry, tmp_path):
+    path = str(tmp_path / "core_states.h5")
+    rng = np.random.default_rng(0)
+    states = [
+        {
+            "power": rng.uniform(size=(5, 4, 4)),
+            "exposure": np.full((5, 4, 4), 2.0 * step),
+            "void": rng.uniform(size=(5, 4, 4)),
+            "keff": 1.0 - 0.01 * step,
+            "cycle_burnup": 2.0 * step,
+        }
+        for step in range(10)
+    ]
+
+    with CoreStateStore.create(path, core_geometry, chunk_steps=4) as core_state_store:
+        for state in states[:6]:
+            core_state_store.append(**state)
+        with pytest.raises(AssertionError):
+            core_state_store.append(power=states[0]["power"])
+
+    # Appending to an existing store
+    with CoreStateStore(path, "a") as core_state_store:
+        for state in states[6:]:
+            core_state_store.append(**state)
+
+    with CoreStateStore(path) as core_state_store:
+        assert len(core_state_store) == 10
+        assert core_state_store["power"].chunks == (4, 5, 4, 4)
+        np.testing.assert_allclose(
+            core_state_store.get_axial("power", 3, 1, 2), states[3]["power"][:, 1, 2]
+        )
+        np.testing.assert_allclose(core_state_store.get_radial("void", 7, 4), states[7]["void"][4])
+        np.testing.assert_allclose(
+            core_state_store.get_history("exposure", 2, 1, 1), 2.0 * np.arange(10)
+        )
+        np.testing.assert_allclose(
+            core_state_store.get_history("keff"), [s["keff"] for s in states]
+        )
+        np.testing.assert_allclose(
+            core_state_store["power"][2:5, 0], [s["power"][0] for s in states[2:5]]
+        )
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry
+from cn.core.core_th import CoreThConditions, VoidModel, solve_core_th
+from cn.utils.th_tools import get_saturation_properties
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 10, 15.0, 36.0, [2, 4, 4, 2])
+
+
+def test_solve_core_th_energy_balance(core_geometry: CoreGeometry):
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    axial_shape = np.sin(np.linspace(0.1, np.pi - 0.1, 10))[:, None, None]
+    power = np.where(assembly_mask, axial_shape * np.ones((10, 4, 4)), 0.0)
+    conditions = CoreThConditions(core_power=12 * 4.0e6, core_flow=12 * 15.0)
+
+    th = solve_core_th(core_geometry, power, conditions)
+
+    saturation = get_saturation_properties(conditions.pressure)
+    inlet_enthalpy = saturation.h_l - conditions.inlet_subcooling
+    # Each channel gets 4 MW with 15 kg/s, the top node is half way through its enthalpy rise
+    top_node_rise = 4.0e3 / 15.0 * (1 - axial_shape[-1, 0, 0] / 2 / axial_shape.sum())
+    np.testing.assert_allclose(th.enthalpy[-1][assembly_mask], inlet_enthalpy + top_node_rise)
+    assert np.all(th.void[~np.broadcast_to(assembly_mask, th.void.shape)] == 0)
+
+    # Void starts once the coolant is saturated and increases along the channels
+    assert th.quality[0][assembly_mask].max() == 0
+    assert th.void[-1][assembly_mask].min() > 0.5
+    assert np.all(np.diff(th.void, axis=0) >= 0)
+
+
+def test_solve_core_th_void_models(core_geometry: CoreGeometry):
+    power = core_geometry.get_core_map(fill_value=1.0, empty_value=0.0).astype(float)
+    power = np.repeat(power[None], 10, axis=0)
+    homogeneous = solve_core_th(
+        core_geometry,
+        power,
+        CoreThConditions(12 * 4.0e6, 12 * 15.0, void_model=VoidModel.SLIP, slip_ratio=1),
+    )
+    drift_flux = solve_core_th(
+        core_geometry,
+        power,
+        CoreThConditions(12 * 4.0e6, 12 * 15.0, drift_flux_C0=1, drift_flux_V_gj=0),
+    )
+
+    # Without slip and drift the models agree
+    np.testing.assert_allclose(drift_flux.void, homogeneous.void)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from cn.core.critical_search import critical_search
+
+
+def get_keff_solver(offset: float = 0.0):
+    solved_parameters = []
+
+    def keff_solver(parameter: float) -> float:
+        # k-eff of a rod bank withdrawn `parameter` steps out of 48
+        solved_parameters.append(parameter)
+        return 0.95 + offset + 0.1 * (1 - np.cos(np.pi * parameter / 48)) / 2
+
+    return keff_solver, solved_parameters
+
+
+def test_critical_search():
+    keff_solver, solved_parameters = get_keff_solver()
+
+    result = critical_search(keff_solver, 12.0, initial_step=4.0, bounds=(0, 48))
+
+    assert result.converged
+    assert result.keff == pytest.approx(1.0, abs=1e-5)
+    assert keff_solver(result.parameter) == pytest.approx(1.0, abs=1e-5)
+    assert result.n_solves == len(solved_parameters) - 1 <= 6
+    assert [step.parameter for step in result.steps] == solved_parameters[:-1]
+    assert result.steps[0].method == "initial"
+
+
+def test_critical_search_seeded_from_previous_state_point():
+    keff_solver, _ = get_keff_solver()
+    previous = critical_search(keff_solver, 12.0, initial_step=4.0, bounds=(0, 48))
+
+    # The core lost some reactivity since the previous state point
+    keff_solver, solved_parameters = get_keff_solver(offset=-0.005)
+    result = critical_search(
+        keff_solver, previous.parameter, initial_slope=previous.slope, bounds=(0, 48)
+    )
+
+    assert result.converged
+    assert result.parameter > previous.parameter
+    assert result.n_solves <= 4
+    assert result.steps[1].method == "slope"
+
+
+def test_critical_search_out_of_bounds():
+    keff_solver, _ = get_keff_solver(offset=-0.2)
+
+    result = critical_search(keff_solver, 24.0, initial_step=4.0, bounds=(0, 48), max_solves=8)
+
+    assert not result.converged
+    assert result.parameter == 48
+    assert result.n_solves <= 8
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry, CoreSymmetry
+from cn.core.diffusion.diffusion_solver import solve_diffusion
+from cn.core.komodo.komodo_xsec import KomodoXsec
+from cn.core.loading_pattern import (
+    LoadingPatternEvaluator,
+    canonicalize_loading_pattern,
+    get_core_symmetry,
+    get_loading_pattern,
+    get_loading_pattern_material_maps,
+    get_symmetry_transforms,
+    rank_loading_patterns,
+)
+
+FUEL_TYPE_MATERIALS = {1: 1, 2: 2}
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(6, 3, 15.0, 20.0, [2, 4, 6, 6, 4, 2])
+
+
+@pytest.fixture
+def xsec():
+    # Fuel type 2 is fresher than fuel type 1
+    return KomodoXsec(
+        sigtr=np.array([[0.22, 0.8], [0.22, 0.8]]),
+        siga=np.array([[0.01, 0.1], [0.011, 0.11]]),
+        nu_sigf=np.array([[0.006, 0.12], [0.008, 0.16]]),
+        sigf=np.array([[0.0025, 0.05], [0.0033, 0.066]]),
+        chi=np.array([[1.0, 0.0], [1.0, 0.0]]),
+        sigs=np.array([[[0.0, 0.02], [0.0, 0.0]], [[0.0, 0.02], [0.0, 0.0]]]),
+    )
+
+
+def test_canonicalize_loading_pattern(core_geometry: CoreGeometry):
+    transforms = get_symmetry_transforms(core_geometry)
+    assert len(transforms) == 8
+
+    rng = np.random.default_rng(0)
+    loading_pattern = get_loading_pattern(
+        core_geometry, list(rng.integers(1, 3, core_geometry.get_assembly_count()))
+    )
+    canonical_pattern = canonicalize_loading_pattern(loading_pattern, transforms)
+    for transform in transforms:
+        np.testing.assert_array_equal(
+            canonicalize_loading_pattern(transform(loading_pattern), transforms), canonical_pattern
+        )
+
+    # A core that is only symmetric under reflections in the center planes
+    rectangular_core = CoreGeometry(4, 3, 15.0, 20.0, [2, 2, 2, 2])
+    assert len(get_symmetry_transforms(rectangular_core)) == 4
+
+
+def test_get_core_symmetry(core_geometry: CoreGeometry):
+    loading_pattern = core_geometry.get_core_map(fill_value=1, empty_value=0)
+    assert get_core_symmetry(core_geometry, loading_pattern) is CoreSymmetry.OCTANT
+    loading_pattern[2, 1] = loading_pattern[3, 1] = loading_pattern[2, 4] = 2
+    loading_pattern[3, 4] = 2
+    assert get_core_symmetry(core_geometry, loading_pattern) is CoreSymmetry.QUARTER
+    loading_pattern[0, 2] = 2
+    assert get_core_symmetry(core_geometry, loading_pattern) is CoreSymmetry.FULL
+
+
+def test_loading_pattern_evaluator(core_geometry: CoreGeometry, xsec: KomodoXsec):
+    solved_patterns = []
+
+    def loading_pattern_solver(loading_pattern: np.ndarray):
+        solved_patterns.append(loading_pattern)
+        material_maps = get_loading_pattern_material_maps(
+            core_geometry, loading_pattern, FUEL_TYPE_MATERIALS
+        )
+        return solve_diffusion(core_geometry, material_maps, xsec)
+
+    evaluator = LoadingPatternEvaluator(core_geometry, loading_pattern_solver, max_workers=2)
+
+    loading_pattern = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(np.int64)
+    loading_pattern[0, 2] = 2
+    fresh_center = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(np.int64)
+    fresh_center[2:4, 2:4] = 2
+    loading_patterns = [
+        loading_pattern,
+        np.rot90(loading_pattern),
+        loading_pattern.T,
+        fresh_center,
+    ]
+
+    results = evaluator.evaluate(loading_patterns)
+
+    assert len(solved_patterns) == evaluator.n_solved == 2
+    assert results[0] is results[1] is results[2]
+    assert results[3].power_peaking > results[0].power_peaking
+
+    # Solved patterns are cached for later generations
+    results_next_generation = evaluator.evaluate([np.flipud(fresh_center), loading_pattern])
+    assert len(solved_patterns) == 2
+    assert results_next_generation[0] is results[3]
+
+    ranked = rank_loading_patterns(results[2:])
+    assert ranked[0] is results[0]
+    ranked = rank_loading_patterns(results[2:], min_keff=results[3].keff)
+    assert ranked[0] is results[3]
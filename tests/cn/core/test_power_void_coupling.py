@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from cn.core.core_models import CoreGeometry
+from cn.core.core_th import CoreThConditions
+from cn.core.diffusion.diffusion_solver import solve_diffusion
+from cn.core.komodo.komodo_xsec import KomodoXsec
+from cn.core.power_void_coupling import (
+    PowerVoidSettings,
+    couple_power_void,
+    get_void_material_maps,
+)
+
+VOID_LEVELS = list(np.linspace(0.0, 0.9, 10))
+
+
+@pytest.fixture
+def core_geometry():
+    return CoreGeometry(4, 8, 15.0, 45.0, [2, 4, 4, 2])
+
+
+def get_xsec(void: np.ndarray) -> KomodoXsec:
+    # Less moderation and absorption in the coolant with more void
+    density = 1 - void[:, None]
+    ones = np.ones_like(density)
+    return KomodoXsec(
+        sigtr=np.hstack([0.2 + 0.05 * density, 0.7 + 0.2 * density]),
+        siga=np.hstack([0.01 * ones, 0.09 + 0.01 * density]),
+        nu_sigf=np.hstack([0.007 * ones, 0.14 * ones]),
+        sigf=np.hstack([0.003 * ones, 0.06 * ones]),
+        chi=np.hstack([ones, 0 * ones]),
+        sigs=np.stack(
+            [np.hstack([0 * ones, 0.01 + 0.015 * density]), np.hstack([0 * ones, 0 * ones])],
+            axis=1,
+        ),
+    )
+
+
+def get_diffusion_core_solver(core_geometry: CoreGeometry):
+    """Core solver with one material per node, so the cross sections follow the void smoothly"""
+    assembly_mask = core_geometry.get_core_map(fill_value=1, empty_value=0).astype(bool)
+    shape = (core_geometry.axial_nodes, *assembly_mask.shape)
+    inside = np.broadcast_to(assembly_mask, shape)
+    material_map_3d = np.zeros(shape, dtype=int)
+    material_map_3d[inside] = np.arange(np.count_nonzero(inside)) + 1
+
+    def core_solver(void: np.ndarray, case_iteration: int, solver_tolerance: float):
+        return solve_diffusion(
+            core_geometry,
+            list(material_map_3d),
+            get_xsec(void[inside]),
+            fission_source_tolerance=solver_tolerance,
+        )
+
+    return core_solver
+
+
+def test_get_void_material_maps(core_geometry: CoreGeometry):
+    void = np.full((8, 4, 4), 0.43)
+    void[-1] = 0.9
+
+    material_maps = get_void_material_maps(core_geometry, void, VOID_LEVELS)
+
+    assert len(material_maps) == 8
+    assert material_maps[0][1, 1] == 5
+    assert material_maps[-1][1, 1] == 10
+    assert material_maps[0][0, 0] == 0
+
+
+@pytest.mark.parametrize("anderson_depth", [0, 3])
+def test_couple_power_void(core_geometry: CoreGeometry, anderson_depth: int):
+    th_conditions = CoreThConditions(core_power=12 * 4.0e6, core_flow=12 * 15.0)
+    settings = PowerVoidSettings(
+        anderson_depth=anderson_depth, void_tolerance=1e-4, power_tolerance=1e-4
+    )
+
+    result = couple_power_void(
+        core_geometry, get_diffusion_core_solver(core_geometry), th_conditions, settings=settings
+    )
+
+    assert result.converged
+    assert result.n_core_solves == len(result.residual_history) < settings.max_iterations
+    assert result.residual_history[-1, 2] < 1e-4
+    # The void is converged for the power of the last solve
+    np.testing.assert_allclose(result.th.void, result.void, atol=1e-4)
+    # Void pushes the power to the bottom of the core
+    axial_power = result.power_3d.sum(axis=(1, 2))
+    assert axial_power[:4].sum() > axial_power[4:].sum()
+
+
+def test_anderson_acceleration_reduces_core_solves(core_geometry: CoreGeometry):
+    th_conditions = CoreThConditions(core_power=12 * 5.0e6, core_flow=12 * 12.0)
+    n_core_solves = {}
+    for anderson_depth in [0, 3]:
+        settings = PowerVoidSettings(
+            relaxation=1.0,
+            anderson_depth=anderson_depth,
+            void_tolerance=1e-6,
+            power_tolerance=1e-6,
+            max_iterations=60,
+            min_solver_tolerance=1e-9,
+        )
+        result = couple_power_void(
+            core_geometry,
+            get_diffusion_core_solver(core_geometry),
+            th_conditions,
+            settings=settings,
+        )
+        assert result.converged
+        n_core_solves[anderson_depth] = result.n_core_solves
+
+    assert n_core_solves[3] < n_core_solves[0] / 2
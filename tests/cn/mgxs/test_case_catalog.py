@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cn.mgxs.case_catalog import CaseCatalog, CaseStatus
+from cn.models.config import Config
+from cn.models.fuel.fuel_segment import FuelSegment, MaterialMap
+from cn.models.fuel.fuel_type import FuelGeometry, FuelType
+from cn.models.fuel.material import FuelMaterial
+from cn.models.mgxs.mgxs_run import MGXSRunBWR, TimeStepUnit
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(mgxs_dir=str(tmp_path / "mgxs"), core_dir=str(tmp_path / "core"))
+
+
+def get_inp(config: Config, enrichment: float, alpha: float, power: float):
+    """Input data of a case, the catalog only uses the segment and the run"""
+    fuel_type = FuelType("ORCA-1", FuelGeometry(2, 1.26, 0.475, 0.525, 0.4096))
+    fuel_segment = FuelSegment(
+        "flat", fuel_type, MaterialMap(FuelMaterial.UO2, np.full((2, 2), enrichment)), None
+    )
+    case_path = MGXSRunBWR.get_base_dir(alpha, power, config, fuel_segment)
+    mgxs_run_bwr = MGXSRunBWR(
+        alpha=alpha,
+        power=power,
+        dt=[0.5, 0.5, 1.0],
+        dt_unit=TimeStepUnit.MWd_kg,
+        N_groups=2,
+        original_cwd_path=".",
+        cwd_path=f"{case_path}/cwd",
+        results_path=f"{case_path}/results",
+        img_path=f"{case_path}/img",
+    )
+    return SimpleNamespace(fuel_segment=fuel_segment, mgxs_run_bwr=mgxs_run_bwr)
+
+
+def test_find_cases_of_a_segment(config: Config):
+    case_catalog = CaseCatalog(config)
+    for enrichment in [4.0, 4.5]:
+        for alpha in [0.4, 0.0, 0.8]:
+            inp = get_inp(config, enrichment, alpha, 1e4)
+            case_catalog.record(inp, CaseStatus.RUNNING)  # type: ignore
+            if alpha != 0.8:
+                case_catalog.record(inp, CaseStatus.DONE, runtime=12.5)  # type: ignore
+
+    segment_hash = get_inp(config, 4.0, 0.0, 1e4).fuel_segment.hash()
+    case_records = case_catalog.find(segment_hash)
+
+    assert [case_record.alpha for case_record in case_records] == [0.0, 0.4]
+    assert all(case_record.status is CaseStatus.DONE for case_record in case_records)
+    assert case_records[0].runtime == 12.5
+    assert case_records[0].n_steps == 3 and case_records[0].total_dt == 2.0
+    assert case_records[0].input_data_path.endswith("/voids/0.0/powers/10000.0/cwd/input_data.yaml")
+
+    assert len(case_catalog.find(segment_hash, alpha=0.8, status=CaseStatus.RUNNING)) == 1
+    assert len(case_catalog.find(status=None)) == 6
+
+
+def test_find_by_segment_hash_prefix(config: Config):
+    case_catalog = CaseCatalog(config)
+    inp = get_inp(config, 4.0, 0.2, 1e4)
+    case_catalog.record(inp, CaseStatus.DONE)  # type: ignore
+
+    segment_hash = inp.fuel_segment.hash()
+    segments = CaseCatalog(config).find_by_segment(f"{segment_hash[:3]}*")
+
+    assert list(segments) == [inp.fuel_segment.get_base_dir(config)]
+    assert case_catalog.find_by_segment("xyz*") == {}
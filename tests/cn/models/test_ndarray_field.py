@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from cn.models.fuel.fuel_segment import FuelSegment, MaterialMap
+from cn.models.fuel.fuel_type import FuelGeometry, FuelType
+from cn.models.fuel.material import BurnableAbsorberMaterial, FuelMaterial
+from cn.models.ndarray_field import ndarray_from_value, ndarray_to_binary
+
+
+@pytest.mark.parametrize(
+    "arr", [np.arange(12.0).reshape(3, 4) / 7, np.arange(6, dtype=np.int32), np.zeros((2, 0, 3))]
+)
+def test_binary_round_trip(arr: np.ndarray):
+    loaded = ndarray_from_value(ndarray_to_binary(arr))
+
+    assert loaded.dtype == arr.dtype
+    np.testing.assert_array_equal(loaded, arr)
+
+
+def test_binary_round_trip_of_non_contiguous_array():
+    arr = np.arange(16.0).reshape(4, 4).T
+    np.testing.assert_array_equal(ndarray_from_value(ndarray_to_binary(arr)), arr)
+
+
+@pytest.fixture
+def fuel_segment():
+    return FuelSegment(
+        name="pyramid",
+        fuel_type=FuelType("ORCA-1", FuelGeometry(2, 1.26, 0.475, 0.525, 0.4096)),
+        fuel_map=MaterialMap(FuelMaterial.UO2, np.array([[4.5, 4.0], [4.0, 3.5]])),
+        ba_map=MaterialMap(BurnableAbsorberMaterial.GD2O3, np.array([[0.0, 5.0], [5.0, 0.0]])),
+    )
+
+
+def test_fuel_segment_save_and_load(fuel_segment: FuelSegment, tmp_path):
+    fuel_segment.save(tmp_path / "fuel_segment.yaml")
+    loaded = FuelSegment.load(tmp_path / "fuel_segment.yaml")
+
+    np.testing.assert_array_equal(loaded.fuel_map.map_values, fuel_segment.fuel_map.map_values)
+    assert loaded.ba_map is not None and fuel_segment.ba_map is not None
+    np.testing.assert_array_equal(loaded.ba_map.map_values, fuel_segment.ba_map.map_values)
+    assert loaded.hash() == fuel_segment.hash()
+
+
+def test_fuel_segment_loads_maps_saved_as_lists(fuel_segment: FuelSegment, tmp_path):
+    # Format of files saved before the maps were saved as binary
+    (tmp_path / "fuel_segment.yaml").write_text(
+        """ba_map: null
+fuel_map:
+  map_values:
+  - - 4.5
+    - 4.0
+  - - 4.0
+    - 3.5
+  material: UO2
+fuel_type:
+  geometry:
+    clad_ir: 0.525
+    clad_or: 0.4096
+    fuel_or: 0.475
+    lattice_pitch: 1.26
+    lattice_size: 2
+  name: ORCA-1
+name: pyramid
+"""
+    )
+    loaded = FuelSegment.load(tmp_path / "fuel_segment.yaml")
+
+    np.testing.assert_array_equal(loaded.fuel_map.map_values, fuel_segment.fuel_map.map_values)
+    fuel_segment.ba_map = None
+    assert loaded.hash() == FuelSegment.from_dict(fuel_segment.to_dict()).hash()
+
+
+def test_fuel_segment_hash_depends_on_maps(fuel_segment: FuelSegment):
+    other = FuelSegment.from_dict(fuel_segment.to_dict())
+    other.fuel_map.map_values = other.fuel_map.map_values + 0.1
+
+    assert len(fuel_segment.hash()) == 32
+    assert FuelSegment.from_dict(other.to_dict()).hash() != fuel_segment.hash()
@@ -0,0 +1,72 @@
+import time
+
+from cn.utils.benchmark import (
+    Benchmark,
+    BenchmarkResult,
+    ComparisonStatus,
+    compare_results,
+    format_report,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+
+def test_run_benchmark_excludes_setup():
+    setup_calls = []
+
+    def setup():
+        setup_calls.append(1)
+        time.sleep(0.05)
+        return lambda: sum(range(100))
+
+    benchmark = Benchmark("sum", setup, {"n": 100})
+    result = run_benchmark(benchmark, repeats=3, min_time=0.01)
+
+    assert result.key == "sum[n=100]"
+    assert len(setup_calls) == 1
+    assert len(result.times) == 3
+    assert result.n_calls > 1
+    assert result.min < 0.01
+
+
+def test_save_and_load_results(tmp_path):
+    results = [BenchmarkResult("a[n=1]", 10, [1.0, 2.0, 3.0])]
+    save_results(results, str(tmp_path / "baselines" / "baseline.json"))
+
+    loaded = load_results(str(tmp_path / "baselines" / "baseline.json"))
+
+    assert loaded == {"a[n=1]": results[0]}
+    assert loaded["a[n=1]"].median == 2.0
+
+
+def test_compare_results():
+    baseline = {
+        "same": BenchmarkResult("same", 1, [1.00, 1.01]),
+        "slower": BenchmarkResult("slower", 1, [1.0, 1.0]),
+        "faster": BenchmarkResult("faster", 1, [1.0, 1.0]),
+        # Changed by 20 %, but the baseline repeats spread more
+        "noisy": BenchmarkResult("noisy", 1, [1.0, 1.5, 2.0]),
+    }
+    results = [
+        BenchmarkResult("same", 1, [1.05, 1.2]),
+        BenchmarkResult("slower", 1, [1.5, 1.6]),
+        BenchmarkResult("faster", 1, [0.5, 0.6]),
+        BenchmarkResult("noisy", 1, [1.2, 1.3]),
+        BenchmarkResult("new", 1, [1.0]),
+    ]
+
+    comparisons = {c.key: c for c in compare_results(results, baseline, threshold=0.1)}
+
+    assert comparisons["same"].status is ComparisonStatus.UNCHANGED
+    assert comparisons["slower"].status is ComparisonStatus.SLOWER
+    assert comparisons["slower"].ratio == 1.5
+    assert comparisons["faster"].status is ComparisonStatus.FASTER
+    assert comparisons["noisy"].status is ComparisonStatus.UNCHANGED
+    assert comparisons["new"].status is ComparisonStatus.NEW
+    assert comparisons["new"].ratio is None
+
+    report = format_report(list(comparisons.values()))
+    lines = report.splitlines()
+    assert lines[2].startswith("| slower | 1 s | 1.5 s | 1.50 | slower |")
+    assert lines[-1] == "1 of 5 benchmarks are slower than the baseline"
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from cn.utils.pipeline import Pipeline, Stage
+
+
+@pytest.fixture
+def paths(tmp_path):
+    os.makedirs(tmp_path / "mgxs")
+    return {
+        "source": str(tmp_path / "source.txt"),
+        "mgxs": str(tmp_path / "mgxs"),
+        "library": str(tmp_path / "library.txt"),
+        "state": str(tmp_path / "state.json"),
+    }
+
+
+def get_pipeline(paths: dict[str, str], runs: list[str], burnup_limit: float = 80) -> Pipeline:
+    def transport():
+        runs.append("transport")
+        with open(paths["source"]) as source, open(f"{paths['mgxs']}/mgxs_0.txt", "w") as f:
+            f.write(source.read().upper())
+
+    def library():
+        runs.append("library")
+        with open(f"{paths['mgxs']}/mgxs_0.txt") as mgxs, open(paths["library"], "w") as f:
+            f.write(f"{mgxs.read()} {burnup_limit}")
+
+    # Declared out of order, the order comes from the inputs and outputs
+    return Pipeline(
+        [
+            Stage(
+                "library",
+                library,
+                inputs=[paths["mgxs"]],
+                outputs=[paths["library"]],
+                parameters={"burnup_limit": burnup_limit},
+            ),
+            Stage("transport", transport, inputs=[paths["source"]], outputs=[paths["mgxs"]]),
+        ],
+        paths["state"],
+    )
+
+
+def test_runs_stale_stages_in_order(paths: dict[str, str]):
+    with open(paths["source"], "w") as f:
+        f.write("fuel")
+
+    runs: list[str] = []
+    pipeline = get_pipeline(paths, runs)
+    assert pipeline.get_stale_stages() == ["transport", "library"]
+    assert pipeline.run() == ["transport", "library"]
+
+    # Up to date, also with a new pipeline from the saved state
+    pipeline = get_pipeline(paths, runs)
+    assert pipeline.get_stale_stages() == []
+    assert pipeline.run() == []
+    assert runs == ["transport", "library"]
+
+
+def test_parameter_change_only_reruns_downstream(paths: dict[str, str]):
+    with open(paths["source"], "w") as f:
+        f.write("fuel")
+    get_pipeline(paths, []).run()
+
+    runs: list[str] = []
+    pipeline = get_pipeline(paths, runs, burnup_limit=60)
+    assert pipeline.get_stale_reason("library") == "parameters changed"
+    assert pipeline.run() == ["library"]
+    with open(paths["library"]) as f:
+        assert f.read() == "FUEL 60"
+
+
+def test_input_change_reruns_downstream(paths: dict[str, str]):
+    with open(paths["source"], "w") as f:
+        f.write("fuel")
+    get_pipeline(paths, []).run()
+
+    with open(paths["source"], "w") as f:
+        f.write("other fuel")
+    pipeline = get_pipeline(paths, [])
+    assert pipeline.get_stale_stages() == ["transport", "library"]
+    assert pipeline.run() == ["transport", "library"]
+
+
+def test_identical_upstream_output_does_not_rerun_downstream(paths: dict[str, str]):
+    with open(paths["source"], "w") as f:
+        f.write("fuel")
+    get_pipeline(paths, []).run()
+
+    pipeline = get_pipeline(paths, [])
+    assert pipeline.run(force=["transport"]) == ["transport"]
+
+
+def test_missing_output_is_rebuilt(paths: dict[str, str]):
+    with open(paths["source"], "w") as f:
+        f.write("fuel")
+    get_pipeline(paths, []).run()
+
+    os.remove(paths["library"])
+    pipeline = get_pipeline(paths, [])
+    assert pipeline.get_stale_reason("library") == f"output '{paths['library']}' is missing"
+    assert pipeline.run() == ["library"]
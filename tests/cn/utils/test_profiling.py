@@ -0,0 +1,78 @@
+import json
+import pstats
+import subprocess
+import sys
+
+import pytest
+
+from cn.utils.profiling import PhaseProfiler, phase
+
+
+def busy(n: int = 200_000) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_nested_phases_are_recorded():
+    profiler = PhaseProfiler("test")
+    with profiler.phase("outer", case=1):
+        for step in range(2):
+            with profiler.phase("inner", step=step):
+                busy()
+
+    inner_0, inner_1, outer = profiler.records
+    assert [record.name for record in profiler.records] == ["inner", "inner", "outer"]
+    assert (inner_0.depth, inner_1.depth, outer.depth) == (1, 1, 0)
+    assert inner_1.args == {"step": 1} and outer.args == {"case": 1}
+    assert outer.start <= inner_0.start <= inner_1.start
+    assert outer.wall_time >= inner_0.wall_time + inner_1.wall_time
+    assert outer.cpu_time > 0
+
+    totals = profiler.get_totals()
+    assert totals["inner"]["count"] == 2
+    assert totals["inner"]["wall_time"] == pytest.approx(inner_0.wall_time + inner_1.wall_time)
+
+
+def test_failed_phase_is_recorded():
+    profiler = PhaseProfiler("test")
+    with pytest.raises(ValueError):
+        with profiler.phase("fails"):
+            raise ValueError()
+
+    assert [record.name for record in profiler.records] == ["fails"]
+    with profiler.phase("next"):
+        pass
+    assert profiler.records[-1].depth == 0
+
+
+def test_cpu_time_includes_child_processes():
+    profiler = PhaseProfiler("test")
+    with profiler.phase("child"):
+        subprocess.run([sys.executable, "-c", "sum(i * i for i in range(3_000_000))"], check=True)
+
+    (record,) = profiler.records
+    assert record.cpu_time > 0.5 * record.wall_time
+
+
+def test_write(tmp_path):
+    profiler = PhaseProfiler("case", cprofile=True)
+    with profiler.phase("transport", step=0):
+        busy()
+    profiler.write(str(tmp_path / "profile"))
+
+    with open(tmp_path / "profile" / "case_phases.jsonl") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0]["name"] == "transport" and lines[0]["args"] == {"step": 0}
+
+    with open(tmp_path / "profile" / "case_trace.json") as f:
+        (event,) = json.load(f)["traceEvents"]
+    assert event["ph"] == "X" and event["name"] == "transport"
+    assert event["dur"] == pytest.approx(lines[0]["wall_time"] * 1e6)
+
+    stats = pstats.Stats(str(tmp_path / "profile" / "case.prof"))
+    assert any(function[2] == "busy" for function in stats.stats)  # type: ignore
+
+
+def test_phase_without_profiler():
+    with phase(None, "nothing"):
+        result = busy(10)
+    assert result == 285
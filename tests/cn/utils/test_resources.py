@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from cn.utils import resources
+from cn.utils.resources import (
+    ResourceSampler,
+    ResourceUsage,
+    get_output_sizes,
+    sample_process,
+    summarize_usages,
+)
+
+BUSY_CHILD = """\
+import time
+memory = bytearray(150_000_000)
+end_time = time.perf_counter() + 0.6
+while time.perf_counter() < end_time:
+    pass
+"""
+
+
+@pytest.fixture(params=["proc", "psutil"])
+def backend(request, monkeypatch):
+    if request.param == "proc":
+        monkeypatch.setattr(resources, "psutil", None)
+    elif resources.psutil is None:
+        pytest.skip("psutil is not installed")
+    return request.param
+
+
+def test_sample_process(backend):
+    memory = bytearray(50_000_000)
+    rss, cpu_time = sample_process(os.getpid(), include_children=False)
+    assert rss > len(memory)
+    assert cpu_time > 0
+
+    with pytest.raises(OSError):
+        sample_process(2**22 + 1)
+
+
+def test_sampler_includes_children(backend):
+    with ResourceSampler(interval=0.05) as sampler:
+        subprocess.run([sys.executable, "-c", BUSY_CHILD], check=True)
+
+    usage = sampler.usage
+    assert usage is not None
+    assert usage.n_samples > 5
+    assert usage.peak_rss > 150_000_000
+    assert usage.mean_rss < usage.peak_rss
+    # CPU times are counted in clock ticks
+    assert 0.5 < usage.cpu_utilization < os.cpu_count() + 0.5  # type: ignore
+
+
+def test_sampler_keeps_last_sample_of_exited_process(backend):
+    p = subprocess.Popen([sys.executable, "-c", BUSY_CHILD])
+    sampler = ResourceSampler(p.pid, interval=0.05).start()
+    p.wait()
+    usage = sampler.stop()
+
+    assert usage.peak_rss > 150_000_000
+    assert usage.cpu_time > 0.3
+
+
+def test_get_output_sizes(tmp_path):
+    (tmp_path / "results" / "mgxs").mkdir(parents=True)
+    (tmp_path / "openmc_simulation_n0.h5").write_bytes(b"0" * 100)
+    (tmp_path / "openmc_simulation_n1.h5").write_bytes(b"0" * 50)
+    (tmp_path / "results" / "mgxs" / "mgxs_0.h5").write_bytes(b"0" * 10)
+    (tmp_path / "results" / "keff.png").write_bytes(b"0" * 5)
+    (tmp_path / "notes.txt").write_bytes(b"0" * 1)
+
+    sizes = get_output_sizes(
+        # The results are inside the first directory and are only counted once
+        [str(tmp_path), str(tmp_path / "results"), str(tmp_path / "missing")],
+        {"statepoints": ["openmc_simulation_n*.h5"], "mgxs": ["mgxs_*.h5"], "plots": ["*.png"]},
+    )
+
+    assert sizes == {"statepoints": 150, "mgxs": 10, "plots": 5, "other": 1}
+
+
+def test_summarize_usages():
+    usages = [
+        ResourceUsage(peak_rss=100, mean_rss=50.0, cpu_time=8.0, wall_time=2.0, n_samples=3),
+        ResourceUsage(peak_rss=300, mean_rss=150.0, cpu_time=2.0, wall_time=2.0, n_samples=3),
+    ]
+    assert ResourceUsage.from_dict(usages[0].to_dict()) == usages[0]
+
+    summary = summarize_usages(usages)
+
+    assert summary["n_runs"] == 2
+    assert summary["max_peak_rss"] == 300
+    assert summary["mean_peak_rss"] == 200
+    assert summary["mean_rss"] == 100
+    assert summary["max_cpu_utilization"] == 4
+    assert summary["mean_cpu_utilization"] == 2.5
+    assert summary["total_cpu_time"] == 10
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from cn.utils.scratch import ScratchCopier, copy_tree_verified
+
+
+def write_case(scratch_dir: str):
+    os.makedirs(f"{scratch_dir}/mgxs")
+    with open(f"{scratch_dir}/depletion_results.h5", "wb") as f:
+        f.write(os.urandom(3 << 20))
+    with open(f"{scratch_dir}/mgxs/mgxs_0.h5", "wb") as f:
+        f.write(b"mgxs")
+
+
+def test_copy_tree_verified(tmp_path):
+    scratch_dir, target_dir = str(tmp_path / "scratch"), str(tmp_path / "cwd")
+    write_case(scratch_dir)
+    os.makedirs(target_dir)
+    with open(f"{target_dir}/input_data.yaml", "w") as f:
+        f.write("input")
+    with open(f"{scratch_dir}/depletion_results.h5", "rb") as f:
+        depletion_results = f.read()
+
+    copy_tree_verified(scratch_dir, target_dir)
+
+    assert not os.path.exists(scratch_dir)
+    assert sorted(os.listdir(target_dir)) == ["depletion_results.h5", "input_data.yaml", "mgxs"]
+    with open(f"{target_dir}/depletion_results.h5", "rb") as f:
+        assert f.read() == depletion_results
+    with open(f"{target_dir}/mgxs/mgxs_0.h5", "rb") as f:
+        assert f.read() == b"mgxs"
+
+
+def test_scratch_copier_copies_in_the_background(tmp_path):
+    done = []
+    with ScratchCopier(max_workers=2) as scratch_copier:
+        for case in range(3):
+            write_case(str(tmp_path / f"scratch_{case}"))
+            scratch_copier.copy_back(
+                str(tmp_path / f"scratch_{case}"),
+                str(tmp_path / f"cwd_{case}"),
+                on_done=lambda case=case: done.append(case),
+            )
+
+    assert sorted(done) == [0, 1, 2]
+    for case in range(3):
+        assert os.path.exists(tmp_path / f"cwd_{case}" / "mgxs" / "mgxs_0.h5")
+        assert not os.path.exists(tmp_path / f"scratch_{case}")
+
+
+def test_scratch_copier_raises_copy_errors(tmp_path):
+    write_case(str(tmp_path / "scratch"))
+    # The target is a file, so the copy fails and the scratch directory is kept
+    (tmp_path / "cwd").write_text("")
+
+    scratch_copier = ScratchCopier()
+    scratch_copier.copy_back(str(tmp_path / "scratch"), str(tmp_path / "cwd"))
+    with pytest.raises(OSError):
+        scratch_copier.wait()
+    assert os.path.exists(tmp_path / "scratch" / "depletion_results.h5")
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from cn.utils.side_pool import SidePool
+
+
+def test_jobs_run_in_low_priority_workers():
+    with SidePool(max_workers=2, niceness=5) as side_pool:
+        pids = [side_pool.submit(os.getpid) for _ in range(4)]
+        niceness = side_pool.submit(os.nice, 0)
+
+        assert os.getpid() not in {future.result() for future in pids}
+        assert niceness.result() == os.nice(0) + 5
+
+
+def test_wait_raises_job_errors():
+    with SidePool() as side_pool:
+        side_pool.submit(os.stat, "/path/that/does/not/exist")
+        with pytest.raises(FileNotFoundError):
+            side_pool.wait()